@@ -0,0 +1,5 @@
+"""
+Нагрузочные замеры сервисов.
+
+Запуск из каталога 'main': python -m benchmarks.<имя модуля>
+"""
@@ -0,0 +1,177 @@
+"""
+Замер времени форматирования измерений для графиков
+(dashboard.services.meterings.formatters): поэлементная обработка
+(прежняя реализация) и колоночная обработка (dashboard.services.meterings.columnar).
+
+Перед замером проверяется совпадение результатов.
+База данных и VictoriaMetrics не требуются.
+
+Запуск из каталога 'main':
+    python -m benchmarks.chart_formatting [кол-во точек] [кол-во повторов]
+"""
+import gc
+import os
+import random
+import sys
+from datetime import datetime
+from time import perf_counter
+
+
+def _count_error(errors: dict, ex: Exception):
+    errors[str(ex)] = errors.get(str(ex), 0) + 1
+
+
+def legacy_get_meterings_by_codes(meterings: list, round_float, get_tz, ndigit: int):
+    """Поэлементная реализация formatters.get_meterings_by_codes"""
+    result = {}
+    errors = {}
+    local_tz = get_tz()
+    for record in meterings:
+        try:
+            code = record[0]
+            timestamp = datetime.fromtimestamp(record[1], local_tz).replace(tzinfo=None)
+            value = round_float(record[2], ndigit)
+        except Exception as ex:
+            _count_error(errors, ex)
+        else:
+            if code not in result:
+                result[code] = []
+            result[code].append([timestamp, value])
+    return result
+
+
+def legacy_get_forecast_meterings(meterings: list, round_float, get_tz, ndigit: int):
+    """Поэлементная реализация formatters.get_forecast_meterings"""
+    result = []
+    errors = {}
+    for record in meterings:
+        try:
+            timestamp = datetime.fromtimestamp(record[0], get_tz()).replace(tzinfo=None)
+            value = round_float(record[1], ndigit)
+        except Exception as ex:
+            _count_error(errors, ex)
+        else:
+            result.append([timestamp, value])
+    return result
+
+
+def legacy_get_meterings_by_timestamp(meterings: list, round_float, ndigit: int):
+    """Поэлементная реализация formatters.get_meterings_by_timestamp"""
+    result = {}
+    errors = {}
+    for record in meterings:
+        try:
+            code = record[0]
+            timestamp = record[1]
+            value = round_float(record[2], ndigit)
+        except Exception as ex:
+            _count_error(errors, ex)
+        else:
+            if timestamp not in result:
+                result[timestamp] = {}
+            result[timestamp][code] = value
+    return result
+
+
+def legacy_get_meterings_by_codes_synchronized_time(sgn_codes_to_out_key: dict, meterings: list,
+                                                    round_float, get_tz, ndigit: int):
+    """
+    Поэлементная реализация formatters.get_meterings_by_codes_synchronized_time
+    (словарь измерений по штампам времени, без логирования отсутствующих значений)
+    """
+    result = {"dates": []}
+    for out_key in sgn_codes_to_out_key.values():
+        result[out_key] = []
+    meterings_by_timestamp = legacy_get_meterings_by_timestamp(meterings, round_float, ndigit)
+    for timestamp, meterings in meterings_by_timestamp.items():
+        date = datetime.fromtimestamp(timestamp, get_tz()).replace(tzinfo=None)
+        data_in_timestamp = {}
+        for code, out_key in sgn_codes_to_out_key.items():
+            if code in meterings:
+                data_in_timestamp[out_key] = meterings[code]
+        if len(data_in_timestamp) < len(sgn_codes_to_out_key):
+            continue
+        result["dates"].append(date)
+        for out_key, value in data_in_timestamp.items():
+            result[out_key].append(value)
+    return result
+
+
+def make_series(meterings: list):
+    """Ряды в формате MeteringsManager.get_meterings_columnar"""
+    from array import array
+    from itertools import groupby
+    from dashboard.services.commons.series import SignalSeries
+
+    return [SignalSeries(code, array("q", (record[1] for record in records)),
+                         array("d", (record[2] for record in records)))
+            for code, records in ((code, list(group)) for code, group in groupby(meterings, key=lambda r: r[0]))]
+
+
+def make_meterings(count: int, signals: int = 4):
+    """Измерения в формате MeteringsManager.get_meterings: [(signal, timestamp, value), ...]"""
+    start = 1_672_531_200
+    per_signal = count // signals
+    return [(f"sgn_{n}", start + i*60, random.uniform(-1000, 1000))
+            for n in range(signals) for i in range(per_signal)]
+
+
+def measure(func, repeats: int):
+    """Минимальное время выполнения из 'repeats' запусков"""
+    times = []
+    for _ in range(repeats):
+        gc.collect()
+        start = perf_counter()
+        func()
+        times.append(perf_counter() - start)
+    return min(times)
+
+
+def main(count: int, repeats: int):
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "main.settings")
+    os.environ.setdefault("SECRET_KEY", "benchmark")
+    os.environ.setdefault("KAFKA_SYNC", "false")
+    os.environ.setdefault("LEVEL_LOG", "INFO")
+
+    import django
+    django.setup()
+
+    from main.settings import ROUND_NDIGIT
+    from dashboard.services.meterings import formatters
+    from dashboard.utils.number import Numeric
+    from dashboard.utils.time_func import get_tz
+
+    meterings = make_meterings(count)
+    forecast = [[ts, value] for _, ts, value in meterings]
+    # у каждого сигнала пропущена часть точек, как в истории анализов газов
+    sparse_meterings = [record for record in meterings if random.random() > 0.1]
+    sparse_series = make_series(sparse_meterings)
+    codes_to_out_key = {series.signal: series.signal.upper() for series in sparse_series}
+    cases = (
+        ("get_meterings_by_codes",
+         lambda: legacy_get_meterings_by_codes(meterings, Numeric.round_float, get_tz, ROUND_NDIGIT),
+         lambda: formatters.get_meterings_by_codes(meterings)),
+        ("get_forecast_meterings",
+         lambda: legacy_get_forecast_meterings(forecast, Numeric.round_float, get_tz, ROUND_NDIGIT),
+         lambda: formatters.get_forecast_meterings("forecast", forecast)),
+        ("get_meterings_by_timestamp",
+         lambda: legacy_get_meterings_by_timestamp(meterings, Numeric.round_float, ROUND_NDIGIT),
+         lambda: formatters.get_meterings_by_timestamp(meterings)),
+        ("get_meterings_by_codes_synchronized_time",
+         lambda: legacy_get_meterings_by_codes_synchronized_time(
+             codes_to_out_key, sparse_meterings, Numeric.round_float, get_tz, ROUND_NDIGIT),
+         lambda: formatters.get_meterings_by_codes_synchronized_time(codes_to_out_key, sparse_series)),
+    )
+    for name, legacy, current in cases:
+        if legacy() != current():
+            raise AssertionError(f"{name}: результаты реализаций различаются")
+        legacy_time = measure(legacy, repeats)
+        current_time = measure(current, repeats)
+        print(f"{name:>28}: поэлементно {legacy_time:.3f} с, "
+              f"по столбцам {current_time:.3f} с, "
+              f"ускорение x{legacy_time / current_time:.1f} ({len(meterings)} точек)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000,
+         int(sys.argv[2]) if len(sys.argv) > 2 else 5)
@@ -0,0 +1,69 @@
+"""
+Замер времени выполнения запросов страницы графиков
+(dashboard.services.meterings.use_cases.get_meterings_for_charts):
+последовательно и параллельно через run_concurrently.
+
+Используется заглушка VictoriaMetrics с искусственной задержкой,
+поэтому база данных и VictoriaMetrics не требуются.
+
+Запуск из каталога 'main':
+    python -m benchmarks.charts_fanout [задержка, с] [кол-во повторов]
+"""
+import os
+import sys
+from time import perf_counter, time
+
+from benchmarks.stub_vm import start_stub_server
+
+
+def main(latency: float, repeats: int):
+    server = start_stub_server(latency)
+    address = f"http://127.0.0.1:{server.server_port}"
+    os.environ["VM_ADDRESS"] = address
+    os.environ["VML_ADDRESS"] = address
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "main.settings")
+    os.environ.setdefault("SECRET_KEY", "benchmark")
+    os.environ.setdefault("KAFKA_SYNC", "false")
+    os.environ.setdefault("LEVEL_LOG", "INFO")
+
+    import django
+    django.setup()
+
+    from dashboard.services.commons.asset_desc import AssetDesc
+    from dashboard.services.commons.meterings_manager import MeteringsManager
+    from dashboard.utils.async_func import run_concurrently
+
+    asset = AssetDesc(id=1, guid="00000000-0000-0000-0000-000000000001", name="benchmark")
+    date_end = time()
+    date_start = date_end - 7 * 86400
+    calls = (
+        (MeteringsManager.get_last_meterings_by_codes_sync,
+         {"asset": asset, "codes": ["limit_1", "limit_2", "forecast_1"]}),
+        (MeteringsManager.get_meterings,
+         {"asset_id": asset, "code_by_sources": {"": ["sgn_1", "sgn_2", "sgn_3"]},
+          "date_start": date_start, "date_end": date_end, "is_reduced": True}),
+        (MeteringsManager.get_meterings,
+         {"asset_id": asset, "code_by_sources": {"": ["off_sgn_1"]},
+          "date_start": date_start, "date_end": date_end, "is_reduced": False}),
+    )
+
+    def sequential():
+        return [func(**kwargs) for func, kwargs in calls]
+
+    def concurrent():
+        return run_concurrently(calls)
+
+    # прогрев пула соединений и потоков
+    concurrent()
+    for name, func in (("последовательно", sequential), ("параллельно", concurrent)):
+        start = perf_counter()
+        for _ in range(repeats):
+            func()
+        print(f"{name:>16}: {(perf_counter() - start) / repeats:.3f} с на запрос "
+              f"(задержка заглушки {latency} с, запросов к VM: {len(calls)})")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main(float(sys.argv[1]) if len(sys.argv) > 1 else 0.2,
+         int(sys.argv[2]) if len(sys.argv) > 2 else 5)
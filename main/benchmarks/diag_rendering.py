@@ -0,0 +1,124 @@
+"""
+Замер времени перевода диаг. сообщений по шаблонам
+(localization.services.translation.diag_msg): разбор JSON и str.format
+для каждой записи (прежняя реализация) и скомпилированные шаблоны
+с запоминанием переводов одинаковых сообщений.
+
+Перед замером проверяется совпадение результатов.
+База данных не требуется: шаблоны языка задаются вместо словаря хранилища переводов.
+
+Запуск из каталога 'main':
+    python -m benchmarks.diag_rendering [кол-во записей] [кол-во повторов]
+"""
+import gc
+import json
+import os
+import random
+import sys
+from time import perf_counter
+
+
+def legacy_get_translation(templates: dict, template_ids: str, params: str):
+    """Прежняя реализация DiagMsgTralslation.get_translation (без логирования)"""
+    result = []
+    if template_ids:
+        try:
+            template_ids = json.loads(template_ids)
+        except Exception:
+            return ""
+        if params:
+            try:
+                params = json.loads(params)
+            except Exception:
+                params = []
+        for i, id in enumerate(template_ids):
+            template = templates.get(id)
+            if not isinstance(template, str):
+                template = None
+            if params and 0 <= i < len(params):
+                template_params = params[i]
+                if not isinstance(template_params, list | tuple):
+                    template_params = [template_params]
+            else:
+                template_params = None
+            if template_params and template:
+                try:
+                    template = template.format(
+                        **{f"param{n}": value for n, value in enumerate(template_params, 1)})
+                except Exception:
+                    pass
+            if template:
+                result.append(template)
+    return " ".join(result)
+
+
+def make_templates(count: int = 300):
+    """Шаблоны разных видов, в т.ч. с форматом, преобразованием и ошибками"""
+    kinds = (
+        "Превышение уровня {param1} сигнала {param2}",
+        "Температура {param1:.1f} °C выше предела {param2!r}",
+        "Сообщение без параметров {{служебное}}",
+        "Параметр {param3} отсутствует",
+        "Индекс {param1[0]} списка",
+        "Значение {param1:>{param2}}",
+        "Некорректный шаблон {param1",
+    )
+    return {num: f"{kinds[num % len(kinds)]} #{num}" for num in range(1, count + 1)}
+
+
+def make_records(count: int, templates: dict, distinct: int = 2000):
+    """Записи диаг. сообщений: 'distinct' различных сообщений, повторяющихся в записях"""
+    ids = list(templates)
+    messages = []
+    for _ in range(distinct):
+        msg_ids = random.sample(ids, random.randint(1, 3))
+        params = [[round(random.uniform(0, 100), 3), random.randint(1, 9)] for _ in msg_ids]
+        messages.append({"message_ids": json.dumps(msg_ids), "param_groups": json.dumps(params)})
+    return [random.choice(messages) for _ in range(count)]
+
+
+def measure(func, repeats: int):
+    """Минимальное время выполнения из 'repeats' запусков"""
+    times = []
+    for _ in range(repeats):
+        gc.collect()
+        start = perf_counter()
+        func()
+        times.append(perf_counter() - start)
+    return min(times)
+
+
+def main(count: int, repeats: int):
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "main.settings")
+    os.environ.setdefault("SECRET_KEY", "benchmark")
+    os.environ.setdefault("KAFKA_SYNC", "false")
+    os.environ.setdefault("LEVEL_LOG", "CRITICAL")
+
+    import django
+    django.setup()
+
+    from localization.services.translation import diag_msg
+    from localization.services.translation.store import TranslationStore
+
+    templates = make_templates()
+    TranslationStore.get_all = classmethod(lambda cls, name, lang: templates)
+    records = make_records(count, templates)
+
+    def legacy():
+        return [legacy_get_translation(templates, rec["message_ids"], rec["param_groups"]) for rec in records]
+
+    def compiled():
+        return diag_msg.DiagMsgTralslation((), "ru").get_translations(records)
+
+    if legacy() != compiled():
+        raise AssertionError("Результаты перевода не совпадают")
+    legacy_time = measure(legacy, repeats)
+    compiled_time = measure(compiled, repeats)
+    print(f"{count} записей: str.format {legacy_time:.3f} с, "
+          f"скомпилированные шаблоны {compiled_time:.3f} с, "
+          f"ускорение x{legacy_time / compiled_time:.1f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000,
+         int(sys.argv[2]) if len(sys.argv) > 2 else 5)
@@ -0,0 +1,104 @@
+"""
+Заглушка HTTP API VictoriaMetrics / VictoriaLogs с искусственной задержкой ответа.
+
+Поддерживаются запросы:
+- /api/v1/query - последние значения (vector) для всех сигналов из 'signal=~"..."';
+- /prometheus/api/v1/query_range - ряды min/max/tmin/tmax (matrix) с шагом 'step';
+- /select/logsql/query - пустой ответ.
+"""
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+_asset_re = re.compile(r'asset=~?"([^"]*)"')
+_signal_re = re.compile(r'signal=~"([^"]*)"')
+
+
+class StubVMHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    latency = 0.0
+    points_limit = 2048
+
+    def log_message(self, format, *args):
+        pass
+
+    def _params(self):
+        url = urlparse(self.path)
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            params.update({k: v[0] for k, v in parse_qs(self.rfile.read(length).decode()).items()})
+        return url.path, params
+
+    def _send(self, body: bytes, content_type: str = "application/json"):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    @staticmethod
+    def _labels(query: str):
+        assets = (m.group(1).split("|") if (m := _asset_re.search(query)) else ["asset"])
+        signals = (m.group(1).split("|") if (m := _signal_re.search(query)) else [])
+        return assets, [s for s in signals if s]
+
+    def _instant(self, params):
+        assets, signals = self._labels(params.get("query", ""))
+        now = int(time.time())
+        result = []
+        for asset in assets:
+            for signal in signals:
+                for name, value in (("v_ts", now), ("v_vl", 1.5)):
+                    result.append({"metric": {"__name__": name, "asset": asset, "signal": signal},
+                                   "value": [now, str(value)]})
+        return {"status": "success", "data": {"resultType": "vector", "result": result}}
+
+    def _range(self, params):
+        assets, signals = self._labels(params.get("query", ""))
+        start = int(params["start"]) // 1000
+        end = int(params["end"]) // 1000
+        step = max(int(params.get("step", "60s").rstrip("s")), 1)
+        stamps = list(range(start, end + 1, step))[-self.points_limit:]
+        result = []
+        for asset in assets:
+            for signal in signals:
+                # значения и метки времени зависят только от момента вычисления
+                for name, func in (("max", lambda ts: float(ts % 97)),
+                                   ("min", lambda ts: -float(ts % 89)),
+                                   ("tmax", lambda ts: ts),
+                                   ("tmin", lambda ts: ts - step // 2)):
+                    values = [[ts, str(func(ts))] for ts in stamps]
+                    result.append({"metric": {"__name__": name, "asset": asset, "signal": signal},
+                                   "values": values})
+        return {"status": "success", "data": {"resultType": "matrix", "result": result}}
+
+    def _handle(self):
+        path, params = self._params()
+        time.sleep(self.latency)
+        if path == "/api/v1/query":
+            self._send(json.dumps(self._instant(params)).encode())
+        elif path == "/prometheus/api/v1/query_range":
+            self._send(json.dumps(self._range(params)).encode())
+        else:
+            self._send(b"", "application/stream+json")
+
+    do_GET = _handle
+    do_POST = _handle
+
+
+def start_stub_server(latency: float = 0.2) -> ThreadingHTTPServer:
+    """
+    Запустить заглушку в фоновом потоке на свободном порту.
+
+    Адрес сервера: f"http://127.0.0.1:{server.server_port}".
+    """
+    handler = type("StubVMHandlerWithLatency", (StubVMHandler,), {"latency": latency})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
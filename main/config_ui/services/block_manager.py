@@ -1,6 +1,7 @@
 import logging
 
 from dataclasses import dataclass
+from itertools import chain
 from typing import Iterable
 
 from config_ui.models import (
@@ -193,6 +194,22 @@ class DataLinks:
         result.pop(0, None)
         return result
 
+    def get_dict_by_windows(self):
+        """
+        Получить словарь соответствия окон (period, last_date) ссылкам.
+
+        Ссылки без периода или без времени последнего измерения не включаются.
+        """
+        result: dict[tuple[float, float], set[DataLink]] = dict()
+        for link in self.links:
+            if not link.period or not link.last_date:
+                continue
+            window = (link.period, link.last_date)
+            if window not in result:
+                result[window] = set()
+            result[window].add(link)
+        return result
+
     def set_last_date(self, last_timestamp_by_codes: dict[str, float]):
         for link in self.links:
             if timestamp := last_timestamp_by_codes.get(link.code):
@@ -301,15 +318,43 @@ class BlockManager:
             result = template
         return result
 
+    def get_linked_codes(self, codes: Iterable[str]):
+        """
+        Получить коды сигналов (последних значений и периодов) панелей и блоков,
+        ссылающихся на сигналы 'codes'.
+        """
+        codes = set(codes)
+        result = set()
+        for item in chain(self.__panels, self.__blocks):
+            item_codes = self.__get_template_codes(item.template)
+            if item_codes & codes:
+                result.update(item_codes)
+        return result
+
     @runtime_in_log
     def get_data_to_page(self, signals_precision: dict,
                          last_data: dict = None, period_data: dict = None,
-                         asset: dict = None, units: dict = None, back_labels: dict = None):
-        """Получить отформатированные данные"""
+                         asset: dict = None, units: dict = None, back_labels: dict = None,
+                         codes: Iterable[str] | None = None):
+        """
+        Получить отформатированные данные.
+
+        Если заданы коды сигналов 'codes', возвращаются только блоки, ссылающиеся
+        на эти сигналы, и панели, ссылающиеся на них или содержащие такие блоки.
+        """
+        if codes is not None:
+            codes = set(codes)
+            blocks = [block for block in self.__blocks if self.__get_template_codes(block.template) & codes]
+            block_panel_ids = {block.panel_id for block in blocks}
+            panels = [panel for panel in self.__panels
+                      if panel.id in block_panel_ids or self.__get_template_codes(panel.template) & codes]
+        else:
+            panels = self.__panels
+            blocks = self.__blocks
         self.add_data(signals_precision, last_data, period_data, asset, units, back_labels)
         result = {}
         outer_locations = []
-        for panel in self.__panels:
+        for panel in panels:
             outer_locations.append(
                 {
                     "i": str(panel.location_id),
@@ -318,7 +363,7 @@ class BlockManager:
                 }
             )
         inner_locations = []
-        for block in self.__blocks:
+        for block in blocks:
             inner_locations.append(
                 {
                     "i": str(block.location_id),
@@ -327,14 +372,14 @@ class BlockManager:
                 }
             )
         blocks_by_panel_id: dict[int, list[BlockDesc]] = {}
-        for block in self.__blocks:
+        for block in blocks:
             panel_id = block.panel_id
             if panel_id not in blocks_by_panel_id:
                 blocks_by_panel_id[panel_id] = []
             blocks_by_panel_id[panel_id].append(block)
 
         data = []
-        for panel in self.__panels:
+        for panel in panels:
             panel_data = panel.template
             panel_data["id"] = panel.location_id
             panel_blocks = blocks_by_panel_id.get(panel.id, [])
@@ -450,6 +495,20 @@ class BlockManager:
         for panel in self.__panels:
             self.__set_links_from_template(panel.template)
 
+    def __get_template_codes(self, template) -> set[str]:
+        """Получить коды сигналов ссылок шаблона на последние значения и периоды"""
+        result = set()
+        if isinstance(template, str):
+            if (link := self.__get_data_link(template)) and (link.is_last() or link.is_period()):
+                result.add(link.code)
+        elif isinstance(template, (tuple, list)):
+            for elem in template:
+                result.update(self.__get_template_codes(elem))
+        elif isinstance(template, dict):
+            for elem in template.values():
+                result.update(self.__get_template_codes(elem))
+        return result
+
     def __set_links_from_template(self, template):
         """Установить ссылки из шаблона"""
         if isinstance(template, str):
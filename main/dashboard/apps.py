@@ -5,3 +5,7 @@ class DashboardConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'dashboard'
     verbose_name = 'Диагностика'
+
+    def ready(self):
+        from dashboard.signals import connect_signals
+        connect_signals()
@@ -0,0 +1,42 @@
+import logging
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from dashboard.services.commons.meterings_manager import MeteringsManager
+from dashboard.services.commons.rollup import SignalsRollupManager
+from main.settings import ROLLUP_INTERVAL, ROLLUP_PERIODS
+
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = ("Расчет агрегатов значений сигналов вкладок графиков по интервалам ROLLUP_PERIODS "
+            "для запросов графиков за длительные периоды")
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--loop", action="store_true",
+            help="Выполнять расчет периодически (каждые ROLLUP_INTERVAL сек.)")
+
+    def handle(self, *args, **options):
+        if not ROLLUP_PERIODS:
+            self.stdout.write("Агрегаты значений сигналов отключены (ROLLUP_PERIODS не задан)")
+            return
+        while True:
+            started = time.monotonic()
+            try:
+                result = SignalsRollupManager.materialize(MeteringsManager.query_rollup)
+            except Exception:
+                logger.exception("Ошибка расчета агрегатов значений сигналов")
+            else:
+                self.stdout.write(
+                    "Сохранено агрегатов: " + ", ".join(f"{period} сек. - {count}" for period, count in result.items())
+                    + f" ({time.monotonic() - started:.1f} сек.)")
+            finally:
+                close_old_connections()
+            if not options["loop"]:
+                return
+            time.sleep(max(ROLLUP_INTERVAL - (time.monotonic() - started), 0))
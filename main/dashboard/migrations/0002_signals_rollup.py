@@ -0,0 +1,61 @@
+# Generated by Django 4.2.20 on 2026-10-18 15:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SignalsRollup',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('asset', models.CharField(max_length=200, verbose_name='Идентификатор оборудования')),
+                ('signal', models.CharField(max_length=200, verbose_name='Код сигнала')),
+                ('period', models.IntegerField(verbose_name='Длительность интервала, сек.')),
+                ('timestamp', models.BigIntegerField(verbose_name='Окончание интервала')),
+                ('min_value', models.FloatField(verbose_name='Минимум')),
+                ('max_value', models.FloatField(verbose_name='Максимум')),
+                ('tmin', models.BigIntegerField(verbose_name='Время минимума')),
+                ('tmax', models.BigIntegerField(verbose_name='Время максимума')),
+                ('avg_value', models.FloatField(blank=True, null=True, verbose_name='Среднее')),
+                ('last_value', models.FloatField(blank=True, null=True, verbose_name='Последнее значение')),
+                ('tlast', models.BigIntegerField(blank=True, null=True, verbose_name='Время последнего значения')),
+            ],
+            options={
+                'verbose_name': 'Агрегат значений сигнала',
+                'verbose_name_plural': 'Сигналы. Агрегаты значений',
+                'db_table': 'signals_rollup',
+                'managed': True,
+            },
+        ),
+        migrations.CreateModel(
+            name='SignalsRollupState',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('asset', models.CharField(max_length=200, verbose_name='Идентификатор оборудования')),
+                ('signal', models.CharField(max_length=200, verbose_name='Код сигнала')),
+                ('period', models.IntegerField(verbose_name='Длительность интервала, сек.')),
+                ('start', models.BigIntegerField(verbose_name='Начало агрегированного периода')),
+                ('end', models.BigIntegerField(verbose_name='Окончание агрегированного периода')),
+            ],
+            options={
+                'verbose_name': 'Период агрегатов значений сигнала',
+                'verbose_name_plural': 'Сигналы. Периоды агрегатов значений',
+                'db_table': 'signals_rollup_state',
+                'managed': True,
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='signalsrollupstate',
+            constraint=models.UniqueConstraint(fields=('asset', 'period', 'signal'), name='unique_signals_rollup_state'),
+        ),
+        migrations.AddConstraint(
+            model_name='signalsrollup',
+            constraint=models.UniqueConstraint(fields=('asset', 'period', 'signal', 'timestamp'), name='unique_signals_rollup'),
+        ),
+    ]
@@ -981,3 +981,53 @@ class GeoMapSetting(AssistMixin, models.Model):
 
     def __str__(self) -> str:
         return f"{self.default_zoom}, [{self.center_x}, {self.center_y}] {self.description}"
+
+
+class SignalsRollup(models.Model):
+    id = models.BigAutoField(primary_key=True)
+    asset = models.CharField(max_length=200, verbose_name='Идентификатор оборудования')
+    signal = models.CharField(max_length=200, verbose_name='Код сигнала')
+    period = models.IntegerField(verbose_name='Длительность интервала, сек.')
+    timestamp = models.BigIntegerField(verbose_name='Окончание интервала')
+    min_value = models.FloatField(verbose_name='Минимум')
+    max_value = models.FloatField(verbose_name='Максимум')
+    tmin = models.BigIntegerField(verbose_name='Время минимума')
+    tmax = models.BigIntegerField(verbose_name='Время максимума')
+    avg_value = models.FloatField(blank=True, null=True, verbose_name='Среднее')
+    last_value = models.FloatField(blank=True, null=True, verbose_name='Последнее значение')
+    tlast = models.BigIntegerField(blank=True, null=True, verbose_name='Время последнего значения')
+
+    class Meta:
+        managed = True
+        db_table = 'signals_rollup'
+        verbose_name = 'Агрегат значений сигнала'
+        verbose_name_plural = 'Сигналы. Агрегаты значений'
+        constraints = [
+            models.UniqueConstraint(fields=['asset', 'period', 'signal', 'timestamp'],
+                                    name='unique_signals_rollup')
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.asset} {self.signal} {self.period}: {self.timestamp}"
+
+
+class SignalsRollupState(models.Model):
+    id = models.BigAutoField(primary_key=True)
+    asset = models.CharField(max_length=200, verbose_name='Идентификатор оборудования')
+    signal = models.CharField(max_length=200, verbose_name='Код сигнала')
+    period = models.IntegerField(verbose_name='Длительность интервала, сек.')
+    start = models.BigIntegerField(verbose_name='Начало агрегированного периода')
+    end = models.BigIntegerField(verbose_name='Окончание агрегированного периода')
+
+    class Meta:
+        managed = True
+        db_table = 'signals_rollup_state'
+        verbose_name = 'Период агрегатов значений сигнала'
+        verbose_name_plural = 'Сигналы. Периоды агрегатов значений'
+        constraints = [
+            models.UniqueConstraint(fields=['asset', 'period', 'signal'],
+                                    name='unique_signals_rollup_state')
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.asset} {self.signal} {self.period}: [{self.start}, {self.end}]"
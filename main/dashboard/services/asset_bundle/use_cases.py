@@ -0,0 +1,146 @@
+"""
+Разделы страницы актива одним запросом.
+
+Актив определяется один раз. Коды последних значений всех разделов собираются
+заранее и запрашиваются одним запросом, после чего разделы строятся параллельно
+и получают последние значения из индекса (LAST_VALUES_CACHE) без запросов.
+Запросы внутри разделов выполняются параллельно в пуле вложенных вызовов (см. run_concurrently).
+Справочники сигналов и переводов общие для процесса (см. реестры справочников).
+"""
+import logging
+from functools import partial
+
+from dashboard.services.commons.assets_manager import AssetsManager
+from dashboard.services.commons.meterings_manager import MeteringsManager
+from dashboard.services.diag_mess import use_cases as diagmsg_use_cases
+from dashboard.services.meterings import use_cases as meter_use_cases
+from dashboard.services.meterings.downsampling import Downsampling
+from dashboard.services.substation import use_cases as subst_use_cases
+from dashboard.utils import time_func
+from dashboard.utils.async_func import run_concurrently
+from localization.services.translation import use_cases as translt_use_cases
+
+
+logger = logging.getLogger(__name__)
+
+LAST_SECTION = "last"
+CHARTS_SECTION = "charts"
+DIAGMESS_SECTION = "diagmess"
+RD_TABLE_SECTION = "rdTable"
+RD_NOMOGRAM_SECTION = "rdnomogram"
+FORECAST_3D_SECTION = "3dforecast"
+TABS_SECTION = "tabs"
+TRANSLATION_SECTION = "translation"
+SECTIONS = (LAST_SECTION, CHARTS_SECTION, DIAGMESS_SECTION, RD_TABLE_SECTION,
+            RD_NOMOGRAM_SECTION, FORECAST_3D_SECTION, TABS_SECTION, TRANSLATION_SECTION)
+
+# Коды последних значений разделов, не зависящие от настроек страниц
+_SECTION_LAST_CODES = {
+    RD_TABLE_SECTION: (meter_use_cases.RD_TABLE_KEY,),
+    RD_NOMOGRAM_SECTION: meter_use_cases.RD_NOMOGRAM_KEYS,
+    FORECAST_3D_SECTION: meter_use_cases.FORECAST_3D_KEYS,
+}
+
+
+def _parse_sections(sections: str | None) -> list[str]:
+    """Получить список разделов из параметра запроса (через ','). По умолчанию - все разделы"""
+    if sections in (None, ""):
+        return list(SECTIONS)
+    result = []
+    for section in sections.split(","):
+        section = section.strip()
+        if section in SECTIONS:
+            result.append(section)
+        elif section:
+            logger.error(f"Неизвестный раздел страницы актива '{section}', ожидается один из {SECTIONS}")
+    return list(dict.fromkeys(result))
+
+
+def _call_in_worker(func, kwargs: dict):
+    """Выполнить функцию в потоке пула: исключение считается ошибкой раздела"""
+    try:
+        return func(**kwargs)
+    except Exception:
+        logger.exception(f"Ошибка построения раздела страницы актива ({func})")
+        return None
+
+
+def _get_asset_type_tabs():
+    return subst_use_cases.get_asset_type_tabs(), True
+
+
+@time_func.runtime_in_log
+def get_asset_bundle(asset_id: int, sections: str | None, get_params: dict, lang: str,
+                     use_template: bool = True, downsampling: Downsampling | None = None,
+                     since: float | None = None):
+    """
+    Получить разделы страницы актива одним запросом.
+
+    Parameters:
+    ---
+    - sections - разделы через ',' (см. SECTIONS), по умолчанию все;
+    - get_params - параметры запроса, общие для разделов: 'dateStart', 'dateEnd',
+    'tab' и 'signals' для графиков, параметры фильтрации и пагинации диаг. сообщений;
+    - since - watermark (сек.) дельта-режима разделов последних значений и графиков.
+
+    Return:
+    ---
+    - ({раздел: (результат, status), ...}, status), status = False, если актив не найден
+    """
+    asset = AssetsManager.get_by_id(asset_id)
+    if asset is None:
+        return {}, False
+    sections = _parse_sections(sections)
+    date_start = get_params.get("dateStart")
+    date_end = get_params.get("dateEnd")
+    tab = get_params.get("tab")
+    if CHARTS_SECTION in sections and not tab:
+        logger.error("Для раздела графиков не задана вкладка 'tab'")
+        sections.remove(CHARTS_SECTION)
+
+    # 1. сигналы разделов, зависящие от настроек страниц
+    prepare_calls = {}
+    if LAST_SECTION in sections:
+        prepare_calls[LAST_SECTION] = (meter_use_cases.get_last_values_signals,
+                                       {"asset": asset, "lang": lang})
+    if CHARTS_SECTION in sections:
+        prepare_calls[CHARTS_SECTION] = (meter_use_cases.get_charts_signals,
+                                         {"asset": asset, "tab": tab,
+                                          "input_sgn_codes": get_params.get("signals"), "lang": lang,
+                                          "date_end": time_func.define_date_interval(date_start, date_end)[1]})
+    prepared = dict(zip(prepare_calls, run_concurrently(
+        (_call_in_worker, {"func": func, "kwargs": kwargs}) for func, kwargs in prepare_calls.values())))
+
+    # 2. последние значения всех разделов одним запросом
+    last_codes = set()
+    for section in sections:
+        if section in prepared and prepared[section] is not None:
+            last_codes.update(prepared[section].last_codes)
+        last_codes.update(_SECTION_LAST_CODES.get(section, ()))
+    if last_codes:
+        MeteringsManager.get_last_meterings(asset, last_codes)
+
+    # 3. разделы строятся параллельно
+    section_calls = {
+        LAST_SECTION: (partial(meter_use_cases.get_last_meterings_v2, asset),
+                       {"lang": lang, "since": since, "page": prepared.get(LAST_SECTION)}),
+        CHARTS_SECTION: (partial(meter_use_cases.get_meterings_for_charts, asset),
+                         {"date_start": date_start, "date_end": date_end, "tab": tab,
+                          "input_sgn_codes": get_params.get("signals"), "lang": lang,
+                          "downsampling": downsampling, "since": since,
+                          "charts": prepared.get(CHARTS_SECTION)}),
+        DIAGMESS_SECTION: (diagmsg_use_cases.get_asset_diag_messages,
+                           {"obj_id": asset.id, "date_start": date_start, "date_end": date_end,
+                            "get_params": get_params}),
+        RD_TABLE_SECTION: (partial(meter_use_cases.get_rd_table, asset), {"lang": lang}),
+        RD_NOMOGRAM_SECTION: (partial(meter_use_cases.get_rd_nomogram, asset),
+                              {"lang": lang, "use_template": use_template}),
+        FORECAST_3D_SECTION: (partial(meter_use_cases.get_forecast_3d, asset), {"lang": lang}),
+        TABS_SECTION: (_get_asset_type_tabs, {}),
+        TRANSLATION_SECTION: (translt_use_cases.get_interface_all_translts, {"lang": lang}),
+    }
+    results = run_concurrently(
+        (_call_in_worker, {"func": section_calls[section][0], "kwargs": section_calls[section][1]})
+        for section in sections)
+    return {section: result if result is not None else ({}, False)
+            for section, result in zip(sections, results)}, True
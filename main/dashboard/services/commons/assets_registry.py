@@ -0,0 +1,114 @@
+import logging
+import threading
+from time import monotonic
+from typing import Iterable
+
+from dashboard.models import Assets, Substations
+from dashboard.utils.cache_tools import SharedVersion
+from main.settings import REGISTRY_TTL
+from .asset_desc import AssetDesc
+from .assets_manager import AssetsManager
+
+
+logger = logging.getLogger(__name__)
+
+
+class _RegistrySnapshot:
+    """Загруженные из БД активы и организационная структура с индексами"""
+    def __init__(self, assets: list[AssetDesc], nodes: list[tuple[int, int | None]]):
+        self.by_id: dict[int, AssetDesc] = {}
+        self.by_guid: dict[str, AssetDesc] = {}
+        self.by_subst: dict[int, list[AssetDesc]] = {}
+        self.children: dict[int, list[int]] = {}
+        for asset in assets:
+            self.by_id[asset.id] = asset
+            if asset.guid:
+                self.by_guid[asset.guid] = asset
+            self.by_subst.setdefault(asset.subst_id, []).append(asset)
+        self.nodes = {node_id for node_id, _ in nodes}
+        for node_id, parent_id in nodes:
+            if parent_id is not None:
+                self.children.setdefault(parent_id, []).append(node_id)
+
+
+class AssetsRegistry:
+    """
+    Активы (оборудование) и организационная структура, загруженные в память процесса.
+
+    Справочник загружается из БД целиком при первом обращении и перезагружается
+    после смены общей для процессов версии ('invalidate' вызывается
+    обработчиками сигналов сохранения/удаления моделей активов и орг. структуры)
+    или по истечении REGISTRY_TTL сек.
+    Описания активов (AssetDesc) общие для процесса и используются только для чтения.
+    """
+    _version = SharedVersion("assets_registry")
+    _lock = threading.Lock()
+    _snapshot: _RegistrySnapshot | None = None
+    _snapshot_version = None
+    _loaded_at = 0.0
+
+    @classmethod
+    def _load(cls):
+        """Загрузить активы и элементы организационной структуры из БД"""
+        assets = [AssetsManager.from_model_instance(asset)
+                  for asset in Assets.objects.select_related("type", "substation").order_by("id")]
+        nodes = list(Substations.objects.order_by("id").values_list("id", "parent_id"))
+        return _RegistrySnapshot(assets, nodes)
+
+    @classmethod
+    def _get_snapshot(cls) -> _RegistrySnapshot:
+        version = cls._version.get()
+        snapshot = cls._snapshot
+        if (snapshot is not None and cls._snapshot_version == version
+                and monotonic() - cls._loaded_at < REGISTRY_TTL):
+            return snapshot
+        with cls._lock:
+            if (cls._snapshot is None or cls._snapshot_version != version
+                    or monotonic() - cls._loaded_at >= REGISTRY_TTL):
+                cls._snapshot = cls._load()
+                cls._snapshot_version = version
+                cls._loaded_at = monotonic()
+                logger.debug(f"Справочник активов загружен: {len(cls._snapshot.by_id)} активов.")
+            return cls._snapshot
+
+    @classmethod
+    def invalidate(cls):
+        """Сбросить справочник во всех процессах приложения"""
+        cls._version.bump()
+        with cls._lock:
+            cls._snapshot = None
+
+    @classmethod
+    def get_by_id(cls, id: int) -> AssetDesc | None:
+        return cls._get_snapshot().by_id.get(id)
+
+    @classmethod
+    def get_by_guid(cls, guid: str) -> AssetDesc | None:
+        return cls._get_snapshot().by_guid.get(guid)
+
+    @classmethod
+    def dict_by_guids(cls, guids: Iterable[str]) -> dict[str, AssetDesc]:
+        """Получить словарь активов с guid из списка guids: {guid: AssetDesc}"""
+        by_guid = cls._get_snapshot().by_guid
+        return {guid: by_guid[guid] for guid in guids if guid in by_guid}
+
+    @classmethod
+    def get_by_node(cls, node_id: int) -> list[AssetDesc] | None:
+        """
+        Получить активы элемента организационной структуры (подстанции или организации)
+        и всех входящих в него элементов.
+        Возвращает None, если элемента нет.
+        """
+        snapshot = cls._get_snapshot()
+        if node_id not in snapshot.nodes:
+            return None
+        result = []
+        visited = set()
+        stack = [node_id]
+        while stack:
+            if (current := stack.pop()) in visited:
+                continue
+            visited.add(current)
+            result.extend(snapshot.by_subst.get(current, ()))
+            stack.extend(snapshot.children.get(current, ()))
+        return result
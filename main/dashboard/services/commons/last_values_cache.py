@@ -0,0 +1,177 @@
+import logging
+import threading
+from math import ceil
+from time import time
+from typing import Callable, Iterable
+
+from dashboard.utils.async_func import run_concurrently
+from main.settings import (LAST_VALUES_CACHE_TTL, LAST_VALUES_LOOKBACK_MARGIN,
+                           LAST_VALUES_FULL_SYNC_INTERVAL)
+
+
+logger = logging.getLogger(__name__)
+
+LastValueKey = tuple[str, str]
+# Окно запроса последних значений для сигналов, отсутствующих в индексе
+FULL_LOOKBACK = "10y"
+
+
+class LastValuesCache:
+    """
+    Индекс последних значений сигналов в разрезе (guid актива, код сигнала).
+
+    Значение из индекса отдается без запроса 'ttl' сек. после синхронизации.
+    После этого значение досинхронизируется запросом с коротким окном:
+    от времени прошлой синхронизации (с запасом 'lookback_margin' сек.) до текущего.
+    Если за это окно новых значений нет - остается известное значение.
+    Запрос с окном FULL_LOOKBACK делается только для сигналов, отсутствующих
+    в индексе или не синхронизированных дольше 'full_sync_interval' сек.
+
+    Отсутствие значения у сигнала тоже сохраняется.
+    При частичном попадании запрашиваются только отсутствующие в кеше пары.
+    Одновременные запросы одних и тех же пар объединяются: пары, которые
+    уже запрашиваются другим потоком, ожидают результата этого потока.
+    """
+    def __init__(self, ttl: float = LAST_VALUES_CACHE_TTL,
+                 lookback_margin: float = LAST_VALUES_LOOKBACK_MARGIN,
+                 full_sync_interval: float = LAST_VALUES_FULL_SYNC_INTERVAL):
+        self._ttl = ttl
+        self._lookback_margin = lookback_margin
+        self._full_sync_interval = full_sync_interval
+        # ключ -> (время синхронизации, ['asset', 'signal_code', 'value', 'timestamp'] | None)
+        self._entries: dict[LastValueKey, tuple[float, list | None]] = {}
+        self._in_flight: dict[LastValueKey, threading.Event] = {}
+        self._lock = threading.Lock()
+        self._swept_at = time()
+        self._stats = {"hits": 0, "misses": 0, "coalesced": 0,
+                       "full_queries": 0, "incremental_queries": 0}
+
+    def _pop_valid(self, keys: Iterable[LastValueKey], now: float, result: dict):
+        """Перенести в result актуальные записи индекса, вернуть остальные ключи"""
+        missing = []
+        for key in keys:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry[0] < self._ttl:
+                result[key] = entry[1]
+            else:
+                missing.append(key)
+        return missing
+
+    def get_many(self, keys: Iterable[LastValueKey],
+                 query: Callable[[list[LastValueKey], str], tuple[list[list], bool]]):
+        """
+        Получить последние значения для ключей (guid, code).
+
+        Parameters:
+        ---
+        - keys - ключи (guid актива, код сигнала);
+        - query - функция запроса значений ключей за окно lookback (напр. '10y', '300s'),
+        возвращающая ([['asset', 'signal_code', 'value', 'timestamp'], ...], status).
+
+        Return:
+        ---
+        - ({key: ['asset', 'signal_code', 'value', 'timestamp'] | None, ...}, status)
+        """
+        keys = list(dict.fromkeys(keys))
+        result: dict[LastValueKey, list | None] = {}
+        if self._ttl <= 0:
+            meterings, status = query(keys, FULL_LOOKBACK)
+            found = self._found_by_keys(meterings)
+            return {key: found.get(key) for key in keys}, status
+
+        status = True
+        with self._lock:
+            missing = self._pop_valid(keys, time(), result)
+            self._stats["hits"] += len(keys) - len(missing)
+            own, waits = [], {}
+            for key in missing:
+                if (event := self._in_flight.get(key)) is not None:
+                    waits[key] = event
+                else:
+                    self._in_flight[key] = threading.Event()
+                    own.append(key)
+            self._stats["misses"] += len(own)
+            self._stats["coalesced"] += len(waits)
+
+        if own:
+            try:
+                status = self._sync(own, query, result)
+            finally:
+                with self._lock:
+                    for key in own:
+                        self._in_flight.pop(key).set()
+
+        if waits:
+            for event in set(waits.values()):
+                event.wait()
+            with self._lock:
+                left = self._pop_valid(waits, time(), result)
+            if left:
+                # Запрос другого потока завершился ошибкой - ключи запрашиваются повторно
+                status = self._sync(left, query, result) and status
+        return result, status
+
+    @staticmethod
+    def _found_by_keys(meterings: list[list]):
+        return {(str(record[0]), record[1]): record for record in meterings}
+
+    def _sync(self, keys: list[LastValueKey], query: Callable, result: dict):
+        """Синхронизировать значения ключей с хранилищем, результат записать в result"""
+        now = time()
+        full_keys, incremental_keys = [], []
+        synced_since = now
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is None or now - entry[0] > self._full_sync_interval:
+                    full_keys.append(key)
+                else:
+                    incremental_keys.append(key)
+                    synced_since = min(synced_since, entry[0])
+
+        calls = []
+        if full_keys:
+            calls.append((query, {"keys": full_keys, "lookback": FULL_LOOKBACK}))
+        if incremental_keys:
+            lookback = f"{ceil(now - synced_since + self._lookback_margin)}s"
+            calls.append((query, {"keys": incremental_keys, "lookback": lookback}))
+        results = run_concurrently(calls)
+
+        status = True
+        key_groups = [group for group in (full_keys, incremental_keys) if group]
+        with self._lock:
+            self._stats["full_queries"] += bool(full_keys)
+            self._stats["incremental_queries"] += bool(incremental_keys)
+            for group, (meterings, query_status) in zip(key_groups, results):
+                status = status and query_status
+                found = self._found_by_keys(meterings)
+                is_full = group is full_keys
+                for key in group:
+                    record = found.get(key)
+                    if record is None and not is_full:
+                        # Новых значений нет - остается известное значение
+                        record = self._entries.get(key, (now, None))[1]
+                    result[key] = record
+                    if query_status:
+                        self._entries[key] = (now, record)
+            if now - self._swept_at > self._full_sync_interval:
+                self._entries = {key: entry for key, entry in self._entries.items()
+                                 if now - entry[0] <= self._full_sync_interval}
+                self._swept_at = now
+        return status
+
+    def clear(self):
+        with self._lock:
+            self._entries = {}
+
+    def get_stats(self):
+        """Получить счетчики индекса"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["size"] = len(self._entries)
+        requested = stats["hits"] + stats["misses"] + stats["coalesced"]
+        stats["hit_ratio"] = round(stats["hits"] / requested, 4) if requested else 0
+        return stats
+
+
+LAST_VALUES_CACHE = LastValuesCache()
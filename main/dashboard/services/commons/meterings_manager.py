@@ -1,45 +1,81 @@
 import json
 import logging
+import threading
 from datetime import datetime, timedelta
+from math import ceil
 from typing import Dict, Iterable, List, Union
 
-import requests
 import shortuuid
 from dashboard.services.commons.asset_desc import AssetDesc
+from dashboard.services.commons.last_values_cache import LAST_VALUES_CACHE
+from dashboard.services.commons.range_cache import RANGE_CACHE
+from dashboard.services.commons.rollup import SignalsRollupManager
+from dashboard.services.commons.series import group_min_max_series, iter_range_series, merge_min_max
+from dashboard.utils.async_func import run_concurrently
+from dashboard.utils.http_client import VM_CLIENT, VML_CLIENT
 from dashboard.utils.time_func import runtime_in_log, normalize_date
 
-from main.settings import VM_ADDRESS, VM_PREFIX, VML_ADDRESS, VML_PROJECT_ID
+from main.settings import VM_PREFIX, VML_RESOLVE_CHUNK_SIZE, VML_RESOLVE_TIME_MARGIN, VM_STEP_LADDER
 
 
 logger = logging.getLogger(__name__)
 
+# Функции запросов значений для графиков: (функция MetricsQL, имя ряда)
+RANGE_FUNCTIONS = [("max_over_time", "max"), ("min_over_time", "min"),
+                   ("tmax_over_time", "tmax"), ("tmin_over_time", "tmin"),]
+# Размер части тела ответа query_range, читаемой при разборе, байт
+_RESPONSE_CHUNK_SIZE = 64*1024
+# Функции запросов для расчета агрегатов значений
+ROLLUP_FUNCTIONS = RANGE_FUNCTIONS + [("avg_over_time", "avg"), ("last_over_time", "last"),
+                                      ("tlast_over_time", "tlast")]
+
 
 class MeteringsManager:
+    _indexed_stats = {"requested": 0, "unresolved": 0, "queries": 0}
+    _indexed_stats_lock = threading.Lock()
+
     @classmethod
     @runtime_in_log
     def _query_prometheus(cls, query: str, step: str = '10y'):
         on_time = datetime.now() - timedelta(days=0)
-        req_query = VM_ADDRESS + '/api/v1/query?query=' + \
-            query + '&time='+str(on_time.timestamp()*1000)
+        params = {"query": query, "time": str(on_time.timestamp()*1000)}
         if step:
-            req_query = req_query + '&step=' + step
-        response = requests.get(req_query)
+            params["step"] = step
+        response = VM_CLIENT.get('/api/v1/query', params=params)
         return response.json()
 
     @classmethod
     @runtime_in_log
     def _query_prometheus_range(cls, query: str, start: int, end: int, step: str = '10y'):
-        req_query = VM_ADDRESS + '/prometheus/api/v1/query_range?query=' + \
-            query
+        params = {"query": query}
         if start is not None:
-            req_query = req_query + '&start=' + str(int(start*1000))
+            params["start"] = str(int(start*1000))
         if end is not None:
-            req_query = req_query + '&end=' + str(int(end*1000))
+            params["end"] = str(int(end*1000))
         if step is not None:
-            req_query = req_query + '&step=' + step
-        response = requests.get(req_query)
+            params["step"] = step
+        response = VM_CLIENT.get('/prometheus/api/v1/query_range', params=params)
         return response.json()
 
+    @classmethod
+    @runtime_in_log
+    def _query_prometheus_range_raw(cls, query: str, start: int, end: int, step: str = '10y'):
+        """
+        Запрос query_range, возвращает итератор частей тела ответа без разбора JSON
+        (для разбора по мере чтения, см. iter_range_series).
+        """
+        params = {"query": query, "start": str(int(start*1000)), "end": str(int(end*1000))}
+        if step is not None:
+            params["step"] = step
+        response = VM_CLIENT.get('/prometheus/api/v1/query_range', params=params, stream=True)
+        return cls._iter_content(response)
+
+    @staticmethod
+    def _iter_content(response):
+        """Части тела ответа. Ответ закрывается после чтения или при прекращении разбора"""
+        with response:
+            yield from response.iter_content(chunk_size=_RESPONSE_CHUNK_SIZE)
+
     @classmethod
     def _get_msg_hash(cls, asset, signal, ts):
         msg_id = asset+":"+signal+":"+str(int(ts))
@@ -59,13 +95,14 @@ class MeteringsManager:
         - 'codes' - список кодов сигналов;
 
         Значения сигналов возвращаются как [['asset', 'signal_code', 'value', 'timestamp'], ...].
+        Значения берутся из индекса последних значений (LAST_VALUES_CACHE),
+        из VictoriaMetrics запрашиваются только значения, изменившиеся после
+        прошлой синхронизации индекса.
         """
         if not codes:
             return [], True
         elif not isinstance(codes, Iterable):
             return [], False
-        meterings = []
-        res_status = True
 
         asset_list = []
         if isinstance(asset, AssetDesc):
@@ -73,9 +110,60 @@ class MeteringsManager:
         else:
             asset_list.extend(asset)
 
+        codes = list(dict.fromkeys(codes))
+        return cls.get_last_meterings_by_keys([(str(el.guid), code) for el in asset_list for code in codes])
+
+    @classmethod
+    @runtime_in_log
+    def get_last_meterings_by_keys(cls, keys: Iterable[tuple[str, str]]):
+        """
+        Получить последние значения сигналов для ключей (guid актива, код сигнала)
+        без запроса остальных сочетаний активов и сигналов ключей.
+
+        Значения сигналов возвращаются как [['asset', 'signal_code', 'value', 'timestamp'], ...].
+        """
+        keys = list(dict.fromkeys(keys))
+        if not keys:
+            return [], True
+        cached, res_status = LAST_VALUES_CACHE.get_many(keys, cls._query_last_meterings_by_keys)
+        meterings = [record for key in keys if (record := cached.get(key)) is not None]
+        return meterings, res_status
+
+    @classmethod
+    def _query_last_meterings_by_keys(cls, keys: list[tuple[str, str]], lookback: str = "10y"):
+        """
+        Запросить последние значения сигналов для ключей (guid актива, код сигнала).
+        Активы группируются по наборам кодов сигналов: один запрос на набор кодов.
+        """
+        codes_by_guids = {}
+        for guid, code in keys:
+            codes_by_guids.setdefault(guid, {})[code] = None
+        guids_by_codes = {}
+        for guid, codes in codes_by_guids.items():
+            guids_by_codes.setdefault(tuple(codes), []).append(guid)
+        results = run_concurrently(
+            (cls._query_last_meterings, {"guids": guids, "codes": list(codes), "lookback": lookback})
+            for codes, guids in guids_by_codes.items())
+        meterings = []
+        status = True
+        for group_meterings, group_status in results:
+            meterings.extend(group_meterings)
+            status = status and group_status
+        return meterings, status
+
+    @classmethod
+    def _query_last_meterings(cls, guids: List[str], codes: List[str], lookback: str = "10y"):
+        """
+        Запросить из VictoriaMetrics (VictoriaLogs) последние значения сигналов 'codes'
+        активов 'guids' за окно 'lookback' до текущего момента.
+
+        Значения сигналов возвращаются как [['asset', 'signal_code', 'value', 'timestamp'], ...].
+        """
+        res_status = True
+
         asset_filter = ""
-        if asset_list:
-            asset_filter = f'asset=~"{"|".join([str(el.guid) for el in asset_list])}"'
+        if guids:
+            asset_filter = f'asset=~"{"|".join(guids)}"'
 
         signal_filter = ""
         if codes:
@@ -87,7 +175,7 @@ class MeteringsManager:
 
         filter_str = f'{{{asset_filter},{signal_filter}}}'
         query = 'WITH (f_str='+filter_str + \
-            ',ts_q(d,p)=alias(tlast_over_time(d{f_str}[10y]),p),val_q(d,p)=alias(last_over_time(d{f_str}[10y]),p),idx_q(d)=(ts_q(d,"i_ts"),val_q(d, "i_vl")),val_blk_q(d)=(ts_q(d,"v_ts"),val_q(d,"v_vl"))) '\
+            ',ts_q(d,p)=alias(tlast_over_time(d{f_str}['+lookback+']),p),val_q(d,p)=alias(last_over_time(d{f_str}['+lookback+']),p),idx_q(d)=(ts_q(d,"i_ts"),val_q(d, "i_vl")),val_blk_q(d)=(ts_q(d,"v_ts"),val_q(d,"v_vl"))) '\
                 'union(idx_q('+table_prefix+'indexes_value),val_blk_q('+table_prefix+'signals_value))'
         result = cls._query_prometheus(query)
 
@@ -104,29 +192,116 @@ class MeteringsManager:
             if 'i_vl' in metric_val and 'v_vl' in metric_val:
                 # Если есть значения в обеих базах - брать последнее
                 if metric_val['i_ts'] > metric_val['v_ts']:
-                    indexes_dict.append([metric_key[0], metric_key[1], metric_val['i_vl'], metric_val['i_ts']])
+                    indexes_dict.append([metric_key[0], metric_key[1], metric_val['i_vl'], metric_val['i_ts'],
+                                         [metric_key[0], metric_key[1], metric_val['v_vl'], metric_val['v_ts']]])
                 else:
                     meterings.append([metric_key[0], metric_key[1], metric_val['v_vl'], metric_val['v_ts']])
             elif 'i_vl' in metric_val:
                 # Если есть только в logs - записать значение, чтобы в дальнейшем получить значение
-                indexes_dict.append([metric_key[0], metric_key[1], metric_val['i_vl'], metric_val['i_ts']])
+                indexes_dict.append([metric_key[0], metric_key[1], metric_val['i_vl'], metric_val['i_ts'], None])
             else:
                 # Иначе - просто взять значение
                 meterings.append([metric_key[0], metric_key[1], metric_val['v_vl'], metric_val['v_ts']])
 
         if indexes_dict:
-            headers = {'projectid': VML_PROJECT_ID or 0}
-            query_logs = "message_id:in("+','.join(cls._get_msg_hash(el[0], el[1], el[3])
-                                                   for el in indexes_dict)+") | fields asset,signal,_msg,_time"
-            query_dict = {"query": query_logs, "limit": 500, "start": (datetime.fromtimestamp(
-                0).isoformat()[:-3]+"Z"), "end": (datetime.now().isoformat()[:-3]+"Z")}
-            res = requests.post(VML_ADDRESS + '/select/logsql/query', headers=headers, data=query_dict)
+            indexed_meterings, indexed_status = cls._resolve_indexed_values(indexes_dict)
+            meterings.extend(indexed_meterings)
+            res_status = res_status and indexed_status
+
+        return meterings, res_status
+
+    @classmethod
+    def _query_indexed_chunk(cls, chunk: list[tuple[str, list]]):
+        """
+        Запросить из VictoriaLogs значения индексированных сигналов одной пачки.
+
+        Окно запроса ограничено временными метками значений из VictoriaMetrics
+        с запасом VML_RESOLVE_TIME_MARGIN сек. (время записи в VictoriaLogs может
+        отличаться от метки значения).
+
+        Return:
+        ---
+        - ({message_id: ['asset', 'signal_code', 'value', 'timestamp'], ...}, status)
+        """
+        timestamps = [float(item[3]) for _, item in chunk]
+        query_dict = {
+            "query": "message_id:in(" + ",".join(msg_hash for msg_hash, _ in chunk) + ")"
+                     " | fields message_id,asset,signal,_msg,_time",
+            "limit": 2 * len(chunk),
+            "start": int(min(timestamps) - VML_RESOLVE_TIME_MARGIN),
+            "end": int(max(timestamps) + VML_RESOLVE_TIME_MARGIN) + 1,
+        }
+        result = {}
+        try:
+            res = VML_CLIENT.post('/select/logsql/query', data=query_dict)
+            res.raise_for_status()
             for data in res.iter_lines():
+                if not data:
+                    continue
                 row_data = json.loads(data)
-                meterings.append([row_data['asset'], row_data['signal'], row_data['_msg'],
-                                  datetime.strptime(row_data['_time'], "%Y-%m-%dT%H:%M:%S%z").timestamp()])
+                if (ts := normalize_date(row_data.get('_time'))) is not None:
+                    ts = ts.timestamp()
+                result[row_data.get('message_id')] = [row_data['asset'], row_data['signal'], row_data['_msg'], ts]
+        except Exception as ex:
+            logger.error(f"Ошибка запроса значений индексированных сигналов из VictoriaLogs. {ex}")
+            return result, False
+        return result, True
 
-        return meterings, res_status
+    @classmethod
+    def _resolve_indexed_values(cls, indexes: list[list]):
+        """
+        Получить из VictoriaLogs значения индексированных (строковых) сигналов.
+
+        Parametrs
+        ---
+        - indexes - [['asset', 'signal_code', 'index', 'timestamp', fallback], ...],
+        где fallback - значение из signals_value, которое используется, если
+        значение в VictoriaLogs не найдено (или None).
+
+        Идентификаторы сообщений запрашиваются пачками по VML_RESOLVE_CHUNK_SIZE
+        параллельно. Ненайденные идентификаторы записываются в лог.
+
+        Return
+        ---
+        - ([['asset', 'signal_code', 'value', 'timestamp'], ...], status)
+        """
+        by_hash = {cls._get_msg_hash(item[0], item[1], item[3]): item for item in indexes}
+        items = sorted(by_hash.items(), key=lambda x: float(x[1][3]))
+        chunks = [items[i:i + VML_RESOLVE_CHUNK_SIZE]
+                  for i in range(0, len(items), VML_RESOLVE_CHUNK_SIZE)]
+        resolved = {}
+        status = True
+        for chunk_result, chunk_status in run_concurrently(
+                (cls._query_indexed_chunk, {"chunk": chunk}) for chunk in chunks):
+            resolved.update(chunk_result)
+            status = status and chunk_status
+
+        meterings = []
+        unresolved = []
+        for msg_hash, item in by_hash.items():
+            if (record := resolved.get(msg_hash)) is not None:
+                if record[3] is None:
+                    record[3] = float(item[3])
+                meterings.append(record)
+            else:
+                unresolved.append(msg_hash)
+                if item[4] is not None:
+                    meterings.append(item[4])
+        with cls._indexed_stats_lock:
+            cls._indexed_stats["requested"] += len(by_hash)
+            cls._indexed_stats["unresolved"] += len(unresolved)
+            cls._indexed_stats["queries"] += len(chunks)
+        if unresolved:
+            logger.warning(f"В VictoriaLogs не найдены значения {len(unresolved)} из {len(by_hash)} "
+                           f"индексированных сигналов. message_id: {', '.join(unresolved[:20])}"
+                           f"{' ...' if len(unresolved) > 20 else ''}")
+        return meterings, status
+
+    @classmethod
+    def get_indexed_stats(cls):
+        """Получить счетчики получения значений индексированных сигналов"""
+        with cls._indexed_stats_lock:
+            return dict(cls._indexed_stats)
 
     @classmethod
     def check_code_by_sources(cls, code_by_sources: dict):
@@ -147,7 +322,8 @@ class MeteringsManager:
             date_start,
             date_end,
             is_reduced: bool = False,
-            count_points: int = 2048):
+            count_points: int = 2048,
+            since: float | None = None):
         """
         Получить список значений сигналов за период [date_start, date_end].
 
@@ -158,57 +334,247 @@ class MeteringsManager:
         кодам сигналов;
         - is_reduced: bool - если True - делается запрос с оптимизацией кол-ва точек.
         False (по умолчанию) - запрос всех данных для временного интервала.
+        - since - граница дельта-режима, сек. (см. delta.get_threshold): если задана,
+        возвращаются только точки с временной меткой строго больше 'since'. Шаг запроса при этом рассчитывается
+        по всему периоду [date_start, date_end], как и без 'since'.
+
+        Return
+        ---
+        - ([(signal, timestamp, value), ...], status)
         """
+        series, res_status = cls.get_meterings_columnar(
+            asset_id, code_by_sources, date_start, date_end, is_reduced, count_points, since)
         meterings = []
+        for signal_series in series:
+            meterings.extend(signal_series.to_tuples())
+        return meterings, res_status
+
+    @classmethod
+    def get_meterings_columnar(
+            cls,
+            asset_id: str,
+            code_by_sources: Dict[str, Iterable],
+            date_start,
+            date_end,
+            is_reduced: bool = False,
+            count_points: int = 2048,
+            since: float | None = None):
+        """
+        Получить значения сигналов за период [date_start, date_end] в колоночном виде.
+
+        Параметры аналогичны 'get_meterings'.
+
+        Return
+        ---
+        - ([SignalSeries, ...], status)
+        """
+        series = []
         res_status = True
         check_status, return_status = cls.check_code_by_sources(code_by_sources)
         if not check_status:
-            return meterings, return_status
-
-        table_prefix = ''
-        if VM_PREFIX:
-            table_prefix = VM_PREFIX + '_'
+            return series, return_status
 
-        with_section = 'WITH (q='+table_prefix+'signals_value{'+f'asset="{asset_id.guid}", signal=~"' + \
-            '|'.join(['|'.join(codes) for codes in code_by_sources.values()]) + '"})'
-
-        functions = [("max_over_time", "max"), ("min_over_time", "min"),
-                     ("tmax_over_time", "tmax"), ("tmin_over_time", "tmin"),]
         if is_reduced:
-            period = int((date_end - date_start)/count_points)
+            period = cls._snap_period((date_end - date_start)/count_points)
         else:
             period = 60
+        if since is not None:
+            date_start = max(date_start, since)
+            if date_start > date_end:
+                return series, res_status
 
-        alias_str = ",".join(
-            ['alias('+fnc[0]+'(q['+str(period)+'s]),"'+fnc[1]+'")' for fnc in functions])
-        query = with_section + ' union('+alias_str+')'
+        rollup_series, split = {}, None
+        if is_reduced:
+            signals = list(dict.fromkeys(code for codes in code_by_sources.values() for code in codes))
+            rollup_series, split = SignalsRollupManager.get_series(
+                asset_id.guid, signals, period, date_start, date_end)
+        if rollup_series:
+            # по агрегатам - период до split, сигналы без агрегатов и остаток периода - из хранилища
+            calls = []
+            if other_signals := [signal for signal in signals if signal not in rollup_series]:
+                calls.append((cls._get_range_series, {"asset": asset_id, "code_by_sources": {"": other_signals},
+                                                      "period": period, "date_start": date_start,
+                                                      "date_end": date_end}))
+            if split < date_end:
+                calls.append((cls._get_range_series, {"asset": asset_id, "code_by_sources": {"": list(rollup_series)},
+                                                      "period": period, "date_start": split + 1,
+                                                      "date_end": date_end}))
+            for part, part_status in run_concurrently(calls):
+                res_status = res_status and part_status
+                for signal_series in part:
+                    if (head := rollup_series.get(signal_series.signal)) is not None:
+                        head.timestamps.extend(signal_series.timestamps)
+                        head.values.extend(signal_series.values)
+                    else:
+                        rollup_series[signal_series.signal] = signal_series
+            series = [signal_series for signal_series in rollup_series.values() if signal_series]
+        else:
+            series, res_status = cls._get_range_series(asset_id, code_by_sources, period, date_start, date_end)
+
+        if since is not None:
+            series = [part for signal_series in series if (part := signal_series.newer_than(since))]
+        return series, res_status
+
+    @classmethod
+    def _get_range_series(cls, asset: AssetDesc, code_by_sources: Dict[str, Iterable], period: int,
+                          date_start: float, date_end: float):
+        """
+        Получить min/max значения сигналов актива с шагом 'period' за период
+        [date_start, date_end] из хранилища (через кеш RANGE_CACHE, если он включен).
+
+        Return
+        ---
+        - ([SignalSeries, ...], status)
+        """
+        if RANGE_CACHE.enabled:
+            signals = list(dict.fromkeys(code for codes in code_by_sources.values() for code in codes))
+            series_by_signals, status = RANGE_CACHE.get_series(
+                asset.guid, signals, period, date_start, date_end,
+                lambda signals, start, end: cls._query_range_series(asset.guid, signals, period, start, end))
+            return list(series_by_signals.values()), status
+        series = []
+        query = cls._get_range_query(f'asset="{asset.guid}"', code_by_sources, period)
+        query_start, query_end = cls._align_range(date_start, date_end, period)
+        body = cls._query_prometheus_range_raw(query, query_start, query_end, str(period) + 's')
+        for (_, signal), metrics in group_min_max_series(body).items():
+            series.append(merge_min_max(signal, metrics, date_start, date_end))
+        return series, True
 
-        json_parsed = cls._query_prometheus_range(query, date_start, date_end, str(period) + 's')
+    @classmethod
+    def query_rollup(cls, asset_guid: str, signals: list[str], period: int, start: int, end: int):
+        """
+        Запросить агрегаты значений сигналов актива по интервалам 'period' сек.
+        для моментов вычисления [start, end] (интервал момента t - (t - period, t]).
 
+        Return
+        ---
+        - {signal: {момент вычисления: {"min", "max", "tmin", "tmax", "avg", "last", "tlast"}}}
+        """
+        query = cls._get_range_query(f'asset="{asset_guid}"', {"": signals}, period, ROLLUP_FUNCTIONS)
+        body = cls._query_prometheus_range_raw(query, start, end, str(period) + 's')
         result = {}
-        for metric in json_parsed["data"]["result"]:
-            signal = metric["metric"]["signal"]
-            name = metric["metric"]["__name__"]
-            values = metric["values"]
+        for metric, timestamps, values in iter_range_series(body):
+            name = metric.get("__name__")
+            by_time = result.setdefault(metric.get("signal"), {})
+            for timestamp, value in zip(timestamps, values):
+                value = float(value)
+                by_time.setdefault(timestamp, {})[name] = int(value) if name in ("tmin", "tmax", "tlast") else value
+        return result
 
-            if signal not in result:
-                result[signal] = {"tmax": [], "tmin": [], "max": [], "min": []}
+    @classmethod
+    def _query_range_series(cls, asset_guid: str, signals: list[str], period: int, start: int, end: int):
+        """
+        Запросить min/max значения сигналов актива с шагом 'period' для моментов
+        вычисления [start, end] без отбора по времени.
 
-            result[signal][name] = values
+        Return
+        ---
+        - ({signal: SignalSeries}, status)
+        """
+        query = cls._get_range_query(f'asset="{asset_guid}"', {"": signals}, period)
+        body = cls._query_prometheus_range_raw(query, start, end, str(period) + 's')
+        return {signal: merge_min_max(signal, metrics, float("-inf"), float("inf"))
+                for (_, signal), metrics in group_min_max_series(body).items()}, True
 
-        for signal, metrics in result.items():
-            tmax_values = metrics["tmax"]
-            tmin_values = metrics["tmin"]
-            max_values = metrics["max"]
-            min_values = metrics["min"]
+    @classmethod
+    def _snap_period(cls, period: float) -> int:
+        """
+        Привести шаг запроса к ближайшему не меньшему значению из VM_STEP_LADDER.
+        Шаг больше максимального значения лестницы округляется до кратного ему.
+        """
+        for step in VM_STEP_LADDER:
+            if period <= step:
+                return step
+        return ceil(period/VM_STEP_LADDER[-1])*VM_STEP_LADDER[-1]
 
-            combined_values = list(zip([int(v[1]) for v in tmax_values], [float(v[1]) for v in max_values])) + \
-                list(zip([int(v[1]) for v in tmin_values], [float(v[1]) for v in min_values]))
+    @classmethod
+    def _align_range(cls, date_start: float, date_end: float, period: int):
+        """
+        Получить границы запроса, выровненные по шагу 'period': моменты вычисления
+        интервалов min/max, в которые попадают date_start и date_end.
+        Точки за пределами [date_start, date_end] отбрасываются после запроса.
+        """
+        return ceil(date_start/period)*period, ceil(date_end/period)*period
 
-            combined_values = filter(lambda x: x[0] >= float(date_start) and x[0] <= float(date_end), combined_values)
+    @classmethod
+    def _get_range_query(cls, asset_filter: str, code_by_sources: Dict[str, Iterable], period: int,
+                         functions: list[tuple[str, str]] = RANGE_FUNCTIONS):
+        """
+        Получить запрос min/max значений и их временных меток (или функций 'functions')
+        с шагом period секунд для сигналов из 'code_by_sources'.
+        """
+        table_prefix = ''
+        if VM_PREFIX:
+            table_prefix = VM_PREFIX + '_'
 
-            meterings.extend([(signal, timestamp, value)
-                             for timestamp, value in sorted(combined_values, key=lambda x: x[0])])
+        with_section = 'WITH (q='+table_prefix+'signals_value{'+asset_filter+', signal=~"' + \
+            '|'.join(['|'.join(codes) for codes in code_by_sources.values()]) + '"})'
+
+        alias_str = ",".join(
+            ['alias('+fnc[0]+'(q['+str(period)+'s]),"'+fnc[1]+'")' for fnc in functions])
+        return with_section + ' union('+alias_str+')'
+
+    @classmethod
+    @runtime_in_log
+    def get_meterings_by_assets(
+            cls,
+            intervals: Dict[str, tuple[float, float]],
+            code_by_sources: Dict[str, Iterable],
+            is_reduced: bool = False,
+            count_points: int = 2048,
+            since: float | None = None):
+        """
+        Получить значения сигналов нескольких активов одним запросом.
+
+        Parametrs
+        ---
+        - intervals - словарь соответствия guid активов их временным интервалам
+        (date_start, date_end);
+        - 'code_by_sources' - словарь соответствия источников значений сигналов
+        кодам сигналов;
+        - is_reduced: bool - если True - шаг запроса рассчитывается так, чтобы
+        на самом длинном интервале было не более count_points точек.
+        False (по умолчанию) - шаг 60 сек.;
+        - since - граница дельта-режима, сек. (см. delta.get_threshold): если задана,
+        возвращаются только точки с временной меткой строго больше 'since', шаг запроса рассчитывается по полным интервалам.
+
+        Запрос выполняется за объединение интервалов, значения каждого актива
+        отбираются в пределах его интервала.
+
+        Return
+        ---
+        - ({guid: [(signal, timestamp, value), ...], ...}, status)
+        """
+        meterings = {}
+        res_status = True
+        check_status, return_status = cls.check_code_by_sources(code_by_sources)
+        if not check_status or not intervals:
+            return meterings, return_status
+
+        if is_reduced:
+            period = cls._snap_period(max((end - start)/count_points for start, end in intervals.values()))
+        else:
+            period = 60
+        if since is not None:
+            intervals = {guid: (max(start, since), end) for guid, (start, end) in intervals.items()
+                         if end > since}
+            if not intervals:
+                return meterings, res_status
+        date_start = min(start for start, _ in intervals.values())
+        date_end = max(end for _, end in intervals.values())
+
+        query = cls._get_range_query(f'asset=~"{"|".join(intervals)}"', code_by_sources, period)
+        query_start, query_end = cls._align_range(date_start, date_end, period)
+        body = cls._query_prometheus_range_raw(query, query_start, query_end, str(period) + 's')
+
+        for (asset, signal), metrics in group_min_max_series(body).items():
+            if asset not in intervals:
+                continue
+            asset_start, asset_end = intervals[asset]
+            signal_series = merge_min_max(signal, metrics, asset_start, asset_end)
+            if since is not None:
+                signal_series = signal_series.newer_than(since)
+            meterings.setdefault(asset, []).extend(signal_series.to_tuples())
 
         return meterings, res_status
 
@@ -247,12 +613,18 @@ class MeteringsManager:
 
     @classmethod
     def get_last_messages(
-            cls, asset_id: str, group: str, count: int, fields: List[str] = [], type_str: str = ""):
+            cls, asset_id: str | List[str], group: str, count: int, fields: List[str] = [], type_str: str = ""):
+        """
+        Получить последние 'count' сообщений группы 'group'.
+        В 'asset_id' передается guid актива или список guid нескольких активов.
+        """
         asset_filter = ""
         type_filter = ""
         fields_filter = ""
 
-        if asset_id:
+        if isinstance(asset_id, (list, tuple, set)):
+            asset_filter = 'asset:in(' + ",".join(f'"{guid}"' for guid in asset_id) + ')|'
+        elif asset_id:
             asset_filter = 'asset:"'+asset_id+'"|'
         if type_str:
             type_filter = 'type:"'+type_str+'"|'
@@ -269,12 +641,36 @@ class MeteringsManager:
                 "start": 0,
                 "end": datetime.now().timestamp()}
 
-        req_query = VML_ADDRESS + '/select/logsql/query'
         result = []
-        headers = {'projectid': VML_PROJECT_ID or 0}
-        res = requests.post(req_query, headers=headers, data=data)
+        res = VML_CLIENT.post('/select/logsql/query', data=data)
         for record in res.iter_lines():
             row_data = json.loads(record)
             row_data["timestamp"] = normalize_date(row_data.pop("_time")).timestamp()
             result.append(row_data)
         return result
+
+    @classmethod
+    def get_messages_since(cls, asset_id: List[str], group: str, since: str, count: int,
+                           offset: int = 0, fields: List[str] = []):
+        """
+        Получить сообщения группы 'group' активов 'asset_id' (guid) не старше 'since'
+        (_time в формате RFC3339) от старых к новым: 'count' сообщений начиная с 'offset'.
+        У записей сохраняется исходное значение '_time'.
+        """
+        fields_filter = ""
+        if fields:
+            fields_list = list(dict.fromkeys("_time" if field == "timestamp" else field for field in fields))
+            if "_time" not in fields_list:
+                fields_list.append("_time")
+            fields_filter = ' | fields ' + ",".join(fields_list)
+        query = ('asset:in(' + ",".join(f'"{guid}"' for guid in asset_id) + ') AND group:' + group
+                 + ' AND _time:>=' + since + ' | sort by (_time)'
+                 + (f' | offset {offset}' if offset else '') + f' | limit {count}' + fields_filter)
+        data = {"query": query, "start": 0, "end": datetime.now().timestamp()}
+        result = []
+        res = VML_CLIENT.post('/select/logsql/query', data=data)
+        for record in res.iter_lines():
+            row_data = json.loads(record)
+            row_data["timestamp"] = normalize_date(row_data["_time"]).timestamp()
+            result.append(row_data)
+        return result
@@ -0,0 +1,187 @@
+import logging
+import threading
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from math import ceil
+from time import time
+from typing import Callable
+
+from dashboard.services.commons.series import SignalSeries
+from main.settings import RANGE_CACHE_MAX_BYTES, RANGE_CACHE_CHUNK_POINTS, RANGE_CACHE_CLOSED_LAG
+
+
+logger = logging.getLogger(__name__)
+
+# Оценка памяти ряда: 16 байт на точку и накладные расходы на объекты ряда и ключа
+_SERIES_OVERHEAD = 300
+_POINT_SIZE = 16
+
+ChunkKey = tuple[str, str, int, int]
+# (signals, start, end) -> ({signal: SignalSeries}, status)
+RangeQuery = Callable[[list[str], int, int], tuple[dict[str, SignalSeries], bool]]
+
+
+def _series_size(series: SignalSeries):
+    return _SERIES_OVERHEAD + len(series)*_POINT_SIZE
+
+
+class RangeCache:
+    """
+    Кеш значений сигналов запросов min/max с шагом 'period' по выровненным отрезкам времени.
+
+    Время делится на отрезки длиной period*chunk_points сек., выровненные от начала эпохи.
+    Значения отрезка запрашиваются из хранилища с началом на границе отрезка,
+    поэтому интервалы min/max не зависят от границ запрошенного периода и значения
+    отрезка переиспользуются запросами со смещенными границами (скользящее окно).
+
+    Закрытые отрезки (закончившиеся ранее, чем 'closed_lag' сек. назад) хранятся
+    в памяти бессрочно с вытеснением давно не используемых при превышении 'max_bytes'.
+    Открытый (последний) отрезок запрашивается каждый раз. Отсутствующие в кеше
+    соседние отрезки запрашиваются одним запросом.
+    """
+    def __init__(self, max_bytes: int = RANGE_CACHE_MAX_BYTES,
+                 chunk_points: int = RANGE_CACHE_CHUNK_POINTS,
+                 closed_lag: float = RANGE_CACHE_CLOSED_LAG):
+        self._max_bytes = max_bytes
+        self._chunk_points = chunk_points
+        self._closed_lag = closed_lag
+        self._chunks: OrderedDict[ChunkKey, SignalSeries] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {"chunk_hits": 0, "chunk_misses": 0, "queries": 0, "evicted": 0}
+
+    @property
+    def enabled(self):
+        return self._max_bytes > 0 and self._chunk_points > 0
+
+    def get_series(self, asset: str, signals: list[str], period: int,
+                   date_start: float, date_end: float, query: RangeQuery):
+        """
+        Получить значения сигналов актива за период [date_start, date_end].
+
+        Parameters:
+        ---
+        - asset - guid актива;
+        - signals - коды сигналов;
+        - period - шаг интервалов min/max, сек.;
+        - query - функция запроса значений сигналов с шагом 'period' для моментов
+        вычисления [start, end], возвращающая ({signal: SignalSeries}, status).
+
+        Return:
+        ---
+        - ({signal: SignalSeries}, status)
+        """
+        chunk_len = period*self._chunk_points
+        # значение в момент t вычисляется по точкам (t - period, t]
+        first_chunk = ceil(date_start/period)*period // chunk_len
+        last_eval = ceil(date_end/period)*period
+        last_chunk = last_eval // chunk_len
+        closed_before = (time() - self._closed_lag) // chunk_len
+
+        chunks = {}
+        missing = []
+        with self._lock:
+            for chunk in range(first_chunk, last_chunk + 1):
+                chunk_start = chunk*chunk_len
+                is_closed = chunk < closed_before
+                chunk_missing = []
+                for signal in signals:
+                    key = (asset, signal, period, chunk_start)
+                    if is_closed and (series := self._chunks.get(key)) is not None:
+                        self._chunks.move_to_end(key)
+                        chunks[(signal, chunk)] = series
+                    else:
+                        chunk_missing.append(signal)
+                self._stats["chunk_hits"] += len(signals) - len(chunk_missing)
+                self._stats["chunk_misses"] += len(chunk_missing)
+                if chunk_missing:
+                    missing.append((chunk, chunk_missing, is_closed))
+
+        status = True
+        for run in self._group_runs(missing):
+            run_status = self._query_run(asset, period, chunk_len, last_eval, run, query, chunks)
+            status = status and run_status
+
+        result = {}
+        for signal in signals:
+            series = SignalSeries(signal)
+            for chunk in range(first_chunk, last_chunk + 1):
+                if (part := chunks.get((signal, chunk))) is not None:
+                    series.timestamps.extend(part.timestamps)
+                    series.values.extend(part.values)
+            left = bisect_left(series.timestamps, date_start)
+            right = bisect_right(series.timestamps, date_end)
+            if right > left:
+                result[signal] = SignalSeries(signal, series.timestamps[left:right], series.values[left:right])
+        return result, status
+
+    @staticmethod
+    def _group_runs(missing: list[tuple[int, list[str], bool]]):
+        """Сгруппировать отсутствующие отрезки в последовательности соседних отрезков"""
+        runs = []
+        for chunk, signals, is_closed in missing:
+            if runs and runs[-1][-1][0] == chunk - 1:
+                runs[-1].append((chunk, signals, is_closed))
+            else:
+                runs.append([(chunk, signals, is_closed)])
+        return runs
+
+    def _query_run(self, asset: str, period: int, chunk_len: int, last_eval: int,
+                   run: list[tuple[int, list[str], bool]], query: RangeQuery, chunks: dict):
+        """Запросить значения последовательности соседних отрезков и сохранить закрытые"""
+        signals = list(dict.fromkeys(signal for _, run_signals, _ in run for signal in run_signals))
+        start = run[0][0]*chunk_len
+        end = (run[-1][0] + 1)*chunk_len - period
+        if not run[-1][2]:
+            # открытый отрезок не сохраняется и запрашивается только до конца периода,
+            # закрытые - целиком, чтобы в кеш не попадали неполные отрезки
+            end = min(end, last_eval)
+        series_by_signals, status = query(signals, start, end)
+        with self._lock:
+            self._stats["queries"] += 1
+
+        for chunk, run_signals, is_closed in run:
+            # точки отрезка - (начало отрезка - period, конец отрезка - period]
+            low = chunk*chunk_len - period
+            high = (chunk + 1)*chunk_len - period
+            for signal in run_signals:
+                series = series_by_signals.get(signal) or SignalSeries(signal)
+                left = bisect_right(series.timestamps, low)
+                right = bisect_right(series.timestamps, high)
+                part = SignalSeries(signal, series.timestamps[left:right], series.values[left:right])
+                chunks[(signal, chunk)] = part
+                if is_closed and status:
+                    self._put((asset, signal, period, chunk*chunk_len), part)
+        return status
+
+    def _put(self, key: ChunkKey, series: SignalSeries):
+        size = _series_size(series)
+        if size > self._max_bytes:
+            return
+        with self._lock:
+            if (previous := self._chunks.pop(key, None)) is not None:
+                self._bytes -= _series_size(previous)
+            self._chunks[key] = series
+            self._bytes += size
+            while self._bytes > self._max_bytes:
+                _, evicted = self._chunks.popitem(last=False)
+                self._bytes -= _series_size(evicted)
+                self._stats["evicted"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._chunks = OrderedDict()
+            self._bytes = 0
+
+    def get_stats(self):
+        """Получить счетчики кеша"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["chunks"] = len(self._chunks)
+            stats["bytes"] = self._bytes
+        requested = stats["chunk_hits"] + stats["chunk_misses"]
+        stats["hit_ratio"] = round(stats["chunk_hits"] / requested, 4) if requested else 0
+        return stats
+
+
+RANGE_CACHE = RangeCache()
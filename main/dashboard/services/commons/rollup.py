@@ -0,0 +1,200 @@
+"""
+Агрегаты значений сигналов вкладок графиков по интервалам ROLLUP_PERIODS (час, сутки).
+
+Для каждой пары (актив, сигнал) из настроек вкладок графиков (SignalsChartTabs)
+по закрытым интервалам рассчитываются min/max (с временными метками), среднее
+и последнее значение и сохраняются в БД (SignalsRollup). Рассчитанный период
+пары хранится в SignalsRollupState. Расчет выполняется командой 'rollup_signals'.
+
+Запросы значений для графиков с шагом не меньше интервала агрегатов выполняются
+по агрегатам самого крупного подходящего интервала за рассчитанный период
+и к VictoriaMetrics - только за оставшийся период.
+"""
+import logging
+import threading
+from array import array
+from itertools import groupby
+from math import ceil, floor
+from time import time
+from typing import Callable
+
+from django.db import transaction
+
+from dashboard.models import SignalsChartTabs, SignalsRollup, SignalsRollupState
+from dashboard.services.commons.series import SignalSeries, merge_min_max
+from main.settings import (ROLLUP_PERIODS, ROLLUP_HISTORY_DAYS, ROLLUP_CHUNK_POINTS,
+                           ROLLUP_CLOSED_LAG)
+
+
+logger = logging.getLogger(__name__)
+
+# (guid актива, сигналы, period, start, end) ->
+# {signal: {момент вычисления: {"min", "max", "tmin", "tmax", "avg", "last", "tlast"}}}
+RollupQuery = Callable[[str, list[str], int, int, int], dict[str, dict[int, dict]]]
+
+_BULK_SIZE = 1000
+
+
+class SignalsRollupManager:
+    _stats = {"routed": 0, "rollup_points": 0, "errors": 0}
+    _stats_lock = threading.Lock()
+
+    @classmethod
+    def _count(cls, name: str, value: int = 1):
+        with cls._stats_lock:
+            cls._stats[name] += value
+
+    @classmethod
+    def get_stats(cls):
+        """Получить счетчики запросов значений по агрегатам"""
+        with cls._stats_lock:
+            return dict(cls._stats)
+
+    @classmethod
+    def get_rollup_signals(cls) -> dict[str, list[str]]:
+        """Получить коды сигналов вкладок графиков активов: {guid актива: [код сигнала, ...]}"""
+        result = {}
+        for guid, code in (SignalsChartTabs.objects
+                           .filter(asset__guid__isnull=False)
+                           .order_by("asset_id", "code_id")
+                           .values_list("asset__guid", "code__code")
+                           .distinct()):
+            if code not in (signals := result.setdefault(guid, [])):
+                signals.append(code)
+        return result
+
+    @classmethod
+    def materialize(cls, query: RollupQuery, now: float | None = None):
+        """
+        Рассчитать агрегаты значений сигналов вкладок графиков по закрытым
+        интервалам ROLLUP_PERIODS, не рассчитанным ранее, и удалить агрегаты
+        старше ROLLUP_HISTORY_DAYS.
+
+        Return:
+        ---
+        - {длительность интервала: кол-во сохраненных агрегатов}
+        """
+        now = time() if now is None else now
+        rollup_signals = cls.get_rollup_signals()
+        result = {}
+        for period in ROLLUP_PERIODS:
+            until = floor((now - ROLLUP_CLOSED_LAG)/period)*period
+            history_start = floor((now - ROLLUP_HISTORY_DAYS*86400)/period)*period
+            SignalsRollup.objects.filter(period=period, timestamp__lte=history_start).delete()
+            SignalsRollupState.objects.filter(period=period, start__lt=history_start).update(start=history_start)
+            states = {(state.asset, state.signal): state
+                      for state in SignalsRollupState.objects.filter(period=period)}
+            result[period] = 0
+            for guid, signals in rollup_signals.items():
+                signals_by_end = {}
+                for signal in signals:
+                    state = states.get((guid, signal))
+                    end = max(state.end, history_start) if state else history_start
+                    signals_by_end.setdefault(end, []).append(signal)
+                for end, signals_group in signals_by_end.items():
+                    try:
+                        result[period] += cls._materialize_signals(
+                            query, guid, signals_group, period, end, until, states)
+                    except Exception:
+                        cls._count("errors")
+                        logger.exception(f"Не удалось рассчитать агрегаты ({period} сек.) "
+                                         f"сигналов {signals_group} актива {guid}")
+        return result
+
+    @classmethod
+    def _materialize_signals(cls, query: RollupQuery, guid: str, signals: list[str],
+                             period: int, end: int, until: int, states: dict):
+        """Рассчитать агрегаты сигналов актива для интервалов, оканчивающихся в (end, until]"""
+        count = 0
+        start = end + period
+        while start <= until:
+            chunk_end = min(start + period*(ROLLUP_CHUNK_POINTS - 1), until)
+            data = query(guid, signals, period, start, chunk_end)
+            rows = [
+                SignalsRollup(asset=guid, signal=signal, period=period, timestamp=timestamp,
+                              min_value=values["min"], max_value=values["max"],
+                              tmin=values["tmin"], tmax=values["tmax"],
+                              avg_value=values.get("avg"), last_value=values.get("last"),
+                              tlast=values.get("tlast"))
+                for signal, by_time in data.items() if signal in signals
+                for timestamp, values in by_time.items()
+                if all(values.get(field) is not None for field in ("min", "max", "tmin", "tmax"))
+            ]
+            with transaction.atomic():
+                SignalsRollup.objects.bulk_create(rows, batch_size=_BULK_SIZE, ignore_conflicts=True)
+                for signal in signals:
+                    state = states.get((guid, signal))
+                    if state is None:
+                        state = SignalsRollupState(asset=guid, signal=signal, period=period, start=end)
+                        states[(guid, signal)] = state
+                    state.end = chunk_end
+                    state.save()
+            count += len(rows)
+            start = chunk_end + period
+        return count
+
+    @classmethod
+    def route(cls, period: int) -> int | None:
+        """Получить самый крупный интервал агрегатов, кратный шагу запроса 'period'"""
+        periods = [rollup_period for rollup_period in ROLLUP_PERIODS
+                   if rollup_period <= period and period % rollup_period == 0]
+        return periods[-1] if periods else None
+
+    @classmethod
+    def get_series(cls, asset: str, signals: list[str], period: int,
+                   date_start: float, date_end: float):
+        """
+        Получить min/max значения сигналов актива с шагом 'period' по агрегатам
+        (аналогично запросу min/max к VictoriaMetrics).
+
+        Используются сигналы, агрегаты которых рассчитаны с начала периода.
+        Значения возвращаются за период [date_start, min(date_end, split)],
+        значения за (split, date_end] запрашиваются из хранилища.
+
+        Return:
+        ---
+        - ({signal: SignalSeries}, split), ({}, None), если агрегаты не применимы
+        """
+        rollup_period = cls.route(period)
+        if rollup_period is None:
+            return {}, None
+        # значение в момент t вычисляется по точкам (t - period, t]
+        first_start = ceil(date_start/period)*period - period
+        last_eval = ceil(date_end/period)*period
+        try:
+            states = list(SignalsRollupState.objects
+                          .filter(asset=asset, period=rollup_period, signal__in=signals,
+                                  start__lte=first_start)
+                          .values_list("signal", "end"))
+            if not states:
+                return {}, None
+            split = floor(min(end for _, end in states)/period)*period
+            if split <= first_start:
+                return {}, None
+            rows = (SignalsRollup.objects
+                    .filter(asset=asset, period=rollup_period, signal__in=[signal for signal, _ in states],
+                            timestamp__gt=first_start, timestamp__lte=min(split, last_eval))
+                    .order_by("signal", "timestamp")
+                    .values_list("signal", "timestamp", "max_value", "tmax", "min_value", "tmin"))
+            result = {signal: SignalSeries(signal) for signal, _ in states}
+            points = 0
+            for signal, signal_rows in groupby(rows, key=lambda row: row[0]):
+                metrics = {"tmax": array("q"), "max": array("d"), "tmin": array("q"), "min": array("d")}
+                # интервалы агрегатов вложены в интервалы шага запроса (period кратен интервалу агрегатов)
+                for _, group in groupby(signal_rows, key=lambda row: ceil(row[1]/period)):
+                    group = list(group)
+                    _, _, max_value, tmax, _, _ = max(group, key=lambda row: row[2])
+                    _, _, _, _, min_value, tmin = min(group, key=lambda row: row[4])
+                    metrics["tmax"].append(tmax)
+                    metrics["max"].append(max_value)
+                    metrics["tmin"].append(tmin)
+                    metrics["min"].append(min_value)
+                result[signal] = merge_min_max(signal, metrics, date_start, min(date_end, split))
+                points += len(result[signal])
+        except Exception:
+            cls._count("errors")
+            logger.exception(f"Не удалось получить агрегаты ({rollup_period} сек.) сигналов актива {asset}")
+            return {}, None
+        cls._count("routed")
+        cls._count("rollup_points", points)
+        return result, split
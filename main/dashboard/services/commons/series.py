@@ -0,0 +1,204 @@
+import codecs
+import json
+from array import array
+from bisect import bisect_left, bisect_right
+from itertools import repeat
+from typing import Iterable, Iterator
+
+
+_decoder = json.JSONDecoder()
+
+
+class SignalSeries:
+    """
+    Ряд значений сигнала в колоночном виде.
+
+    - timestamps - временные метки, сек. (array 'q', int64);
+    - values - значения (array 'd', float64).
+    """
+    __slots__ = ("signal", "timestamps", "values")
+
+    def __init__(self, signal: str, timestamps: array = None, values: array = None):
+        self.signal = signal
+        self.timestamps = timestamps if timestamps is not None else array("q")
+        self.values = values if values is not None else array("d")
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def __repr__(self):
+        return f"SignalSeries(signal={self.signal}, len={len(self)})"
+
+    def to_tuples(self):
+        """Получить значения в виде [(signal, timestamp, value), ...]"""
+        return list(zip(repeat(self.signal), self.timestamps, self.values))
+
+    def newer_than(self, timestamp: float) -> "SignalSeries":
+        """Получить ряд из точек с временной меткой строго больше 'timestamp'"""
+        start = bisect_right(self.timestamps, timestamp)
+        if not start:
+            return self
+        return SignalSeries(self.signal, self.timestamps[start:], self.values[start:])
+
+
+class _BodyReader:
+    """
+    Текст тела ответа, дочитываемый по частям (bytes/str или итератор частей bytes).
+
+    Разобранная часть текста ('pos') периодически отбрасывается,
+    поэтому в памяти находится только еще не разобранный текст.
+    """
+    def __init__(self, body: bytes | str | Iterable[bytes]):
+        if isinstance(body, (bytes, bytearray, str)):
+            body = (body,)
+        self._chunks = iter(body)
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._eof = False
+        self.text = ""
+        self.pos = 0
+
+    def _read_chunk(self) -> str | None:
+        """Прочитать следующую часть тела (None, если тело прочитано полностью)"""
+        if self._eof:
+            return None
+        for chunk in self._chunks:
+            if chunk:
+                return chunk if isinstance(chunk, str) else self._decoder.decode(chunk)
+        self._eof = True
+        return self._decoder.decode(b"", final=True)
+
+    def read(self) -> bool:
+        """Дочитать часть тела. Возвращает False, если тело прочитано полностью"""
+        if (chunk := self._read_chunk()) is None:
+            return False
+        self.text += chunk
+        return True
+
+    def read_more(self) -> bool:
+        """
+        Дочитать тело, пока не разобранный текст не увеличится в 4 раза
+        (суммарный объем повторного разбора незавершенного ряда - не более трети его размера).
+        """
+        parts = [self.text[self.pos:]]
+        size = len(parts[0])
+        need = 4*size + 1
+        while size < need and (chunk := self._read_chunk()) is not None:
+            parts.append(chunk)
+            size += len(chunk)
+        self.text = "".join(parts)
+        self.pos = 0
+        return len(parts) > 1
+
+    def skip_ws(self) -> bool:
+        """Пропустить пробельные символы. Возвращает False, если текст закончился"""
+        while True:
+            while self.pos < len(self.text) and self.text[self.pos] in " \t\n\r":
+                self.pos += 1
+            if self.pos < len(self.text):
+                return True
+            if not self.read():
+                return False
+
+    def consume(self):
+        """Отбросить разобранный текст, если он занимает больше половины буфера"""
+        if self.pos > len(self.text) // 2:
+            self.text = self.text[self.pos:]
+            self.pos = 0
+
+    def drain(self):
+        """Дочитать оставшиеся части тела (соединение возвращается в пул после чтения ответа)"""
+        for _ in self._chunks:
+            pass
+
+
+def iter_range_series(body: bytes | str | Iterable[bytes]) -> Iterator[tuple[dict, array, list]]:
+    """
+    Разобрать ответ query_range VictoriaMetrics по одному ряду.
+
+    Тело ответа (bytes/str или итератор частей, например response.iter_content)
+    разбирается по мере чтения: ряды массива data.result декодируются последовательно,
+    разобранный текст отбрасывается, поэтому одновременно в памяти находятся
+    объекты только одного ряда и еще не разобранная часть тела.
+
+    Return:
+    ---
+    - итератор (metric: dict, timestamps бакетов: array 'q', строковые значения: list)
+    """
+    reader = _BodyReader(body)
+    while (start := reader.text.find('"result"')) < 0 or reader.text.find("[", start) < 0:
+        if not reader.read():
+            text = reader.text
+            status = json.loads(text).get("status") if start < 0 and text.strip() else None
+            raise ValueError(f"В ответе VictoriaMetrics нет данных (status: {status})")
+    reader.pos = reader.text.index("[", start) + 1
+    while True:
+        if not reader.skip_ws():
+            raise ValueError("Ответ VictoriaMetrics прерван")
+        if reader.text[reader.pos] == "]":
+            reader.drain()
+            return
+        try:
+            series, reader.pos = _decoder.raw_decode(reader.text, reader.pos)
+        except json.JSONDecodeError:
+            # ряд прочитан не полностью
+            if not reader.read_more():
+                raise
+            continue
+        values = series.get("values") or []
+        yield (series.get("metric", {}),
+               array("q", (int(v[0]) for v in values)),
+               [v[1] for v in values])
+        del series, values
+        if not reader.skip_ws():
+            raise ValueError("Ответ VictoriaMetrics прерван")
+        if reader.text[reader.pos] == ",":
+            reader.pos += 1
+        reader.consume()
+
+
+def group_min_max_series(body: bytes | str | Iterable[bytes]):
+    """
+    Сгруппировать ряды min/max/tmin/tmax ответа query_range по (asset, signal).
+
+    Значения рядов min/max преобразуются в array 'd', рядов tmin/tmax - в array 'q'.
+
+    Return:
+    ---
+    - {(asset, signal): {"max": array, "min": array, "tmax": array, "tmin": array}, ...}
+    """
+    result = {}
+    for metric, _, raw_values in iter_range_series(body):
+        key = (metric.get("asset"), metric.get("signal"))
+        name = metric.get("__name__")
+        if key not in result:
+            result[key] = {"tmax": array("q"), "tmin": array("q"), "max": array("d"), "min": array("d")}
+        if name in ("tmax", "tmin"):
+            result[key][name] = array("q", map(int, map(float, raw_values)))
+        elif name in ("max", "min"):
+            result[key][name] = array("d", map(float, raw_values))
+    return result
+
+
+def merge_min_max(signal: str, metrics: dict, date_start: float, date_end: float) -> SignalSeries:
+    """
+    Объединить ряды min/max сигнала в один отсортированный по времени ряд
+    в пределах [date_start, date_end].
+
+    Точки максимумов (tmax, max) и минимумов (tmin, min) объединяются
+    без создания кортежей на каждую точку.
+    """
+    count_max = min(len(metrics["tmax"]), len(metrics["max"]))
+    count_min = min(len(metrics["tmin"]), len(metrics["min"]))
+    timestamps = metrics["tmax"][:count_max] + metrics["tmin"][:count_min]
+    values = metrics["max"][:count_max] + metrics["min"][:count_min]
+
+    order = sorted(range(len(timestamps)), key=timestamps.__getitem__)
+    timestamps = array("q", map(timestamps.__getitem__, order))
+    values = array("d", map(values.__getitem__, order))
+
+    left = bisect_left(timestamps, date_start)
+    right = bisect_right(timestamps, date_end)
+    if left > 0 or right < len(timestamps):
+        timestamps = timestamps[left:right]
+        values = values[left:right]
+    return SignalSeries(signal, timestamps, values)
@@ -2,7 +2,7 @@ from typing import Dict, List, Iterable, Union
 from copy import deepcopy
 
 from main.settings import ROUND_NDIGIT
-from dashboard.models import SignalsGuide, SignalsChartTabs
+from dashboard.services.commons.signals_registry import SignalsRegistry, SignalRecord
 
 
 class SignalDesc:
@@ -57,47 +57,31 @@ class SignalDesc:
         return {self._storage: self._code}
 
     @classmethod
-    def __get_signals(cls, sgn_guides: Iterable[SignalsGuide], visible: bool = False):
-        """Получить список 'SignalDesc' из списка 'SignalsGuide'"""
-        return [cls(id=sgn_guide.id,
-                    code=sgn_guide.code,
-                    name=sgn_guide.name,
-                    unit_code=sgn_guide.unit.code if sgn_guide.unit else None,
-                    unit_name=sgn_guide.unit.name if sgn_guide.unit else "",
-                    storage=sgn_guide.dynamic_storage.name if sgn_guide.dynamic_storage else "",
-                    category_id=sgn_guide.category.id if sgn_guide.category else None,
-                    category=sgn_guide.category.name if sgn_guide.category else "",
-                    last_val_table=getattr(sgn_guide, "last_val_table", None),
-                    lim0_code=sgn_guide.lim0_code,
-                    lim1_code=sgn_guide.lim1_code,
-                    precision=sgn_guide.precision,
+    def __get_signals(cls, sgn_records: Iterable[SignalRecord], visible: bool = False):
+        """Получить список 'SignalDesc' из списка 'SignalRecord'"""
+        return [cls(id=record.id,
+                    code=record.code,
+                    name=record.name,
+                    unit_code=record.unit_code,
+                    unit_name=record.unit_name,
+                    storage=record.storage,
+                    category_id=record.category_id,
+                    category=record.category,
+                    lim0_code=record.lim0_code,
+                    lim1_code=record.lim1_code,
+                    precision=record.precision,
                     visible=visible)
-                for sgn_guide in sgn_guides]
+                for record in sgn_records]
 
     @classmethod
     def _get_sg_guide(cls, codes: Iterable[str]):
-        """Получить список 'SignalsGuide' из списка кодов"""
-        if codes and isinstance(codes, Iterable):
-            return (SignalsGuide.objects
-                    .select_related("unit", "category", "dynamic_storage")
-                    .filter(code__in=codes)
-                    .only("id", "code", "name", "unit__code", "unit__name", "dynamic_storage__name",
-                          "category__id", "category__name", "lim0_code", "lim1_code", "precision"))
-        else:
-            return []
+        """Получить список 'SignalRecord' из списка кодов"""
+        return SignalsRegistry.get_by_codes(codes)
 
     @classmethod
     def _get_sg_guide_for_chart_tab(cls, asset_id: int, chart_tab: str):
-        """Получить список 'SignalsGuide' из списка кодов"""
-        if not isinstance(chart_tab, str):
-            chart_tab = str(chart_tab)
-        return (elem.code for elem in
-                SignalsChartTabs.objects
-                    .select_related("code", "code__sg_type", "code__unit",
-                                    "code__category", "code__group",
-                                    "code__data_type", "code__plot_type",
-                                    "code__databus_source", "code__dynamic_storage")
-                    .filter(asset__pk=asset_id, chart_tab__chart_tab__code=chart_tab).only("code"))
+        """Получить список 'SignalRecord' вкладки графиков актива"""
+        return SignalsRegistry.get_for_tab(asset_id, chart_tab)
 
     @classmethod
     def get_limits_for_signals(cls, signals: Iterable['SignalDesc']):
@@ -110,12 +94,7 @@ class SignalDesc:
     @classmethod
     def get_pdata_signals(cls):
         """Получить список 'SignalDesc' сигналов паспортных значений"""
-        sgn_guides = (SignalsGuide.objects
-                      .select_related("sg_type", "unit", "category", "group",
-                                      "data_type", "plot_type",
-                                      "databus_source", "dynamic_storage")
-                      .filter(dynamic_storage__name="pdata"))
-        return cls.__get_signals(sgn_guides)
+        return cls.__get_signals(SignalsRegistry.get_by_storage("pdata"))
 
     @classmethod
     def get_separated_by_chart_groups(cls, signals: Iterable['SignalDesc']):
@@ -139,16 +118,10 @@ class SignalDesc:
     @classmethod
     def get_signals_for_type(cls, type: str, codes: list = None):
         """Получить список 'SignalDesc' сигналов для данного типа и кодов"""
-        sgn_guides = (SignalsGuide.objects
-                      .select_related("sg_type", "unit", "category", "group",
-                                      "data_type", "plot_type",
-                                      "databus_source", "dynamic_storage")
-                      .filter(sg_type__code=type))
+        sgn_guides = SignalsRegistry.get_by_type(type)
         if codes and isinstance(codes, (list, tuple)):
-            sgn_guides = sgn_guides.filter(code__in=codes)
-            sgn_guides = sgn_guides.only("id", "code", "name", "unit__code", "unit__name",
-                                         "dynamic_storage__name", "category__id",
-                                         "category__name", "lim0_code", "lim1_code", "precision")
+            codes = set(codes)
+            sgn_guides = [record for record in sgn_guides if record.code in codes]
         return cls.__get_signals(sgn_guides)
 
     @classmethod
@@ -0,0 +1,145 @@
+import logging
+import threading
+from dataclasses import dataclass
+from time import monotonic
+from typing import Iterable
+
+from dashboard.models import SignalsGuide, SignalsChartTabs
+from dashboard.utils.cache_tools import SharedVersion
+from main.settings import REGISTRY_TTL
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class SignalRecord:
+    """Описание сигнала из справочника signals_guide"""
+    id: int
+    code: str
+    name: str
+    sg_type: str
+    unit_code: str | None
+    unit_name: str
+    storage: str
+    category_id: int | None
+    category: str
+    lim0_code: str | None
+    lim1_code: str | None
+    precision: int | None
+
+
+class _RegistrySnapshot:
+    """Загруженный из БД справочник сигналов с индексами"""
+    def __init__(self, records: list[SignalRecord], tabs: list[tuple[int, str, int]]):
+        self.by_id: dict[int, SignalRecord] = {}
+        self.by_code: dict[str, list[SignalRecord]] = {}
+        self.by_type: dict[str, list[SignalRecord]] = {}
+        self.by_storage: dict[str, list[SignalRecord]] = {}
+        self.by_tab: dict[tuple[int, str], list[SignalRecord]] = {}
+        for record in records:
+            self.by_id[record.id] = record
+            self.by_code.setdefault(record.code, []).append(record)
+            self.by_type.setdefault(record.sg_type, []).append(record)
+            self.by_storage.setdefault(record.storage, []).append(record)
+        for asset_id, tab, signal_id in tabs:
+            if (record := self.by_id.get(signal_id)) is not None:
+                self.by_tab.setdefault((asset_id, tab), []).append(record)
+
+
+class SignalsRegistry:
+    """
+    Справочник сигналов (signals_guide), загруженный в память процесса.
+
+    Справочник загружается из БД целиком при первом обращении и перезагружается
+    после смены общей для процессов версии ('invalidate' вызывается
+    обработчиками сигналов сохранения/удаления моделей справочника)
+    или по истечении REGISTRY_TTL сек.
+    """
+    _version = SharedVersion("signals_registry")
+    _lock = threading.Lock()
+    _snapshot: _RegistrySnapshot | None = None
+    _snapshot_version = None
+    _loaded_at = 0.0
+
+    @classmethod
+    def _load(cls):
+        """Загрузить справочник сигналов и сигналы вкладок графиков из БД"""
+        records = [
+            SignalRecord(
+                id=sgn_guide.id,
+                code=sgn_guide.code,
+                name=sgn_guide.name,
+                sg_type=sgn_guide.sg_type.code if sgn_guide.sg_type else "",
+                unit_code=sgn_guide.unit.code if sgn_guide.unit else None,
+                unit_name=sgn_guide.unit.name if sgn_guide.unit else "",
+                storage=sgn_guide.dynamic_storage.name if sgn_guide.dynamic_storage else "",
+                category_id=sgn_guide.category.id if sgn_guide.category else None,
+                category=sgn_guide.category.name if sgn_guide.category else "",
+                lim0_code=sgn_guide.lim0_code,
+                lim1_code=sgn_guide.lim1_code,
+                precision=sgn_guide.precision)
+            for sgn_guide in (SignalsGuide.objects
+                              .select_related("sg_type", "unit", "category", "dynamic_storage")
+                              .only("id", "code", "name", "sg_type__code", "unit__code", "unit__name",
+                                    "dynamic_storage__name", "category__id", "category__name",
+                                    "lim0_code", "lim1_code", "precision")
+                              .order_by("id"))
+        ]
+        tabs = list(SignalsChartTabs.objects
+                    .order_by("id")
+                    .values_list("asset_id", "chart_tab__chart_tab__code", "code_id"))
+        return _RegistrySnapshot(records, tabs)
+
+    @classmethod
+    def _get_snapshot(cls) -> _RegistrySnapshot:
+        version = cls._version.get()
+        snapshot = cls._snapshot
+        if (snapshot is not None and cls._snapshot_version == version
+                and monotonic() - cls._loaded_at < REGISTRY_TTL):
+            return snapshot
+        with cls._lock:
+            if (cls._snapshot is None or cls._snapshot_version != version
+                    or monotonic() - cls._loaded_at >= REGISTRY_TTL):
+                cls._snapshot = cls._load()
+                cls._snapshot_version = version
+                cls._loaded_at = monotonic()
+                logger.debug(f"Справочник сигналов загружен: {len(cls._snapshot.by_id)} сигналов.")
+            return cls._snapshot
+
+    @classmethod
+    def invalidate(cls):
+        """Сбросить справочник во всех процессах приложения"""
+        cls._version.bump()
+        with cls._lock:
+            cls._snapshot = None
+
+    @classmethod
+    def get_by_codes(cls, codes: Iterable[str]) -> list[SignalRecord]:
+        """Получить описания сигналов по кодам (в порядке id)"""
+        if not codes or not isinstance(codes, Iterable):
+            return []
+        by_code = cls._get_snapshot().by_code
+        records = [record for code in set(codes) for record in by_code.get(code, ())]
+        return sorted(records, key=lambda x: x.id)
+
+    @classmethod
+    def get_by_id(cls, id: int) -> SignalRecord | None:
+        return cls._get_snapshot().by_id.get(id)
+
+    @classmethod
+    def get_by_type(cls, sg_type: str) -> list[SignalRecord]:
+        return list(cls._get_snapshot().by_type.get(sg_type, ()))
+
+    @classmethod
+    def get_by_storage(cls, storage: str) -> list[SignalRecord]:
+        return list(cls._get_snapshot().by_storage.get(storage, ()))
+
+    @classmethod
+    def get_for_tab(cls, asset_id: int, chart_tab: str) -> list[SignalRecord]:
+        """Получить описания сигналов вкладки графиков актива"""
+        try:
+            asset_id = int(asset_id)
+        except (TypeError, ValueError):
+            return []
+        return list(cls._get_snapshot().by_tab.get((asset_id, str(chart_tab)), ()))
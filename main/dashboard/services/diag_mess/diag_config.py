@@ -1,3 +1,9 @@
+import re
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+
+from .search_index import EMPTY_MSG_REGEXP, is_time_search
+
+
 class Config:
     """Родительский класс конфигуратора обработки диаг сообщений"""
     _convert_types = {"str": str, "int": int, "float": float}
@@ -39,6 +45,14 @@ class QueryConfig(Config):
     def get_pipe_fields(self):
         return 'fields asset,level,param_groups,group,id_tab,message_ids,signals,_time,_msg'
 
+    def get_exclude_empty_filter(self):
+        """
+        Условие исключения записей без текста сообщения и без шаблона сообщения.
+        Коды шаблонов без текста в языке не учитываются
+        (см. DiagMsgSearchIndex.get_exclude_empty_filter).
+        """
+        return f'NOT ((_msg:"" OR _msg:~{EMPTY_MSG_REGEXP}) AND message_ids:in("", "[]"))'
+
     @classmethod
     def _clear_group(cls, value):
         value = cls._clear(value, "str")
@@ -78,6 +92,23 @@ class ProcessedConfig(Config):
         else:
             return False
 
+    def get_search(self):
+        """Строка поиска (строчными)"""
+        return (self._search or "").lower()
+
+    def is_query_sortable(self):
+        """
+        Могут ли отбор, сортировка и пагинация сообщений выполняться в запросе к БД:
+        нет сортировки по тексту сообщений (текст формируется из шаблонов после запроса)
+        и поиск не может совпадать со временем сообщения (поиск по тексту выполняется
+        по индексу шаблонов, см. DiagMsgSearchIndex).
+        Сообщения актива при сортировке по активу упорядочиваются по времени.
+        """
+        return self._order_field != "message" and not is_time_search(self.get_search())
+
+    def get_pipe_sort(self):
+        return f'sort by (_time){" desc" if self.is_order_reverse() else ""}'
+
     @classmethod
     def _clear_order_field(cls, value):
         value = cls._clear(value, "str")
@@ -130,3 +161,71 @@ class PaginationConfig(Config):
             return self.get_start_slice() + self._limit
         else:
             return None
+
+    def get_pipe_page(self):
+        pipes = []
+        if start := self.get_start_slice():
+            pipes.append(f"offset {start}")
+        if self._limit is not None and self._limit >= 0:
+            pipes.append(f"limit {self._limit}")
+        return " | ".join(pipes)
+
+
+class CursorConfig(Config):
+    """
+    Класс конфигуратора keyset-пагинации ленты диаг сообщений.
+
+    Курсор страницы содержит время (_time) последней записи предыдущей страницы
+    и кол-во полученных записей с этим временем.
+    """
+    _default_limit = 100
+    _max_limit = 1000
+    _time_pattern = re.compile(r"\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(\.\d{1,9})?Z")
+
+    def __init__(self, **kwargs):
+        self._limit: int | None = self._clear(kwargs.get("limit"), "int")
+        self._before, self._skip = self._parse_cursor(kwargs.get("cursor"))
+
+    def get_limit(self):
+        if self._limit is None or self._limit <= 0:
+            return self._default_limit
+        return min(self._limit, self._max_limit)
+
+    def get_before(self):
+        return self._before
+
+    def get_skip(self):
+        return self._skip
+
+    def get_next_cursor(self, records: list[dict]):
+        """
+        Получить курсор следующей страницы по записям страницы (от новых к старым).
+        'records' содержит на одну запись больше кол-ва записей страницы,
+        если следующая страница есть, иначе возвращается None.
+        """
+        limit = self.get_limit()
+        if len(records) <= limit:
+            return None
+        last_time = records[limit - 1].get("_time")
+        skip = sum(1 for rec in records[:limit] if rec.get("_time") == last_time)
+        if last_time == self._before:
+            skip += self._skip
+        return urlsafe_b64encode(f"{last_time},{skip}".encode()).decode()
+
+    @classmethod
+    def _parse_cursor(cls, value):
+        """
+        Получить (время, кол-во записей) из курсора.
+        Генерирует ValueError при некорректном курсоре.
+        """
+        value = cls._clear(value, "str")
+        if not value:
+            return None, 0
+        try:
+            before, skip = urlsafe_b64decode(value.encode()).decode().split(",")
+            skip = int(skip)
+        except Exception as ex:
+            raise ValueError(f"Некорректный курсор ленты диаг. сообщений '{value}'. {ex}")
+        if not cls._time_pattern.fullmatch(before) or skip < 0:
+            raise ValueError(f"Некорректный курсор ленты диаг. сообщений '{value}'.")
+        return before, skip
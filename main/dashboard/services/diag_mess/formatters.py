@@ -46,3 +46,14 @@ def to_subst_page(diags: Iterable[dict], count_diags):
         ],
         "count_messages": count_diags
     }
+
+
+def to_feed_page(diags: Iterable[dict], next_cursor: str | None):
+    """Возвращает страницу ленты диаг. сообщений подстанции / организации"""
+    page = to_subst_page(diags, None)
+    for rec, msg in zip(diags, page["diag_messages"]):
+        msg["substation"] = rec.get("subst_name")
+    return {
+        "diag_messages": page["diag_messages"],
+        "next_cursor": next_cursor,
+    }
@@ -2,6 +2,7 @@ class InputParams:
     __pagin_keys = {
             "offset": "diagNumStart",
             "limit": "diagCount",
+            "cursor": "cursor",
         }
     __other_keys = {
         "diag_type": "diagType",
@@ -0,0 +1,256 @@
+"""
+Кеш записей диаг. сообщений активов по суткам.
+
+Записи сообщений актива (для условия отбора по группе) хранятся по отрезкам
+времени длиной DIAG_MSG_CACHE_BUCKET сек., выровненным от начала эпохи.
+Закрытые отрезки (закончившиеся ранее, чем DIAG_MSG_CACHE_CLOSED_LAG сек. назад)
+запрашиваются один раз, отсутствующие соседние отрезки - одним запросом.
+Записи открытого периода хранятся "хвостом" с меткой последней полученной записи:
+повторный запрос получает только записи новее метки (с запасом CLOSED_LAG
+на запаздывающие записи), отрезки хвоста после закрытия переносятся в кеш отрезков
+без повторного запроса.
+
+Объем кеша оценивается по размеру записей, при превышении DIAG_MSG_CACHE_MAX_BYTES
+вытесняются давно не используемые отрезки и хвосты.
+"""
+import logging
+import threading
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from datetime import datetime, timezone
+from time import time
+from typing import Callable
+
+from dashboard.utils import time_func
+from main.settings import DIAG_MSG_CACHE_MAX_BYTES, DIAG_MSG_CACHE_BUCKET, DIAG_MSG_CACHE_CLOSED_LAG
+
+
+logger = logging.getLogger(__name__)
+
+# Оценка памяти записи: накладные расходы на словарь записи и на каждое поле
+_RECORD_OVERHEAD = 250
+_FIELD_OVERHEAD = 100
+_PART_OVERHEAD = 300
+
+# (start, end, after) -> записи сообщений за [start, end], новее 'after', если задано
+MsgQuery = Callable[[float, float, float | None], list[dict]]
+# (guid актива, условие отбора, начало отрезка | None для хвоста)
+PartKey = tuple[str, str, int | None]
+
+
+def _record_size(record: dict):
+    return _RECORD_OVERHEAD + sum(
+        _FIELD_OVERHEAD + len(key) + (len(value) if isinstance(value, str) else 0)
+        for key, value in record.items())
+
+
+class MsgPart:
+    """
+    Записи сообщений отрезка времени, упорядоченные по времени.
+
+    'end' - время, до которого записи получены (для хвоста - метка последнего запроса).
+    """
+    def __init__(self, start: float, end: float, timestamps: list[float] | None = None,
+                 records: list[dict] | None = None):
+        self.start = start
+        self.end = end
+        self.timestamps = timestamps or []
+        self.records = records or []
+        self.size = _PART_OVERHEAD + sum(map(_record_size, self.records))
+
+    @classmethod
+    def from_records(cls, start: float, end: float, records: list[dict]):
+        """Получить часть из записей запроса (записи без корректного времени пропускаются)"""
+        pairs = []
+        for record in records:
+            msg_time = time_func.normalize_date(record.get("_time"))
+            if msg_time:
+                pairs.append((msg_time.timestamp(), record))
+        pairs.sort(key=lambda pair: pair[0])
+        return cls(start, end, [ts for ts, _ in pairs], [record for _, record in pairs])
+
+    def slice(self, start: float, end: float, include_end: bool = True) -> "MsgPart":
+        """Получить записи за [start, end] ([start, end), если include_end = False)"""
+        left = bisect_left(self.timestamps, start)
+        right = (bisect_right if include_end else bisect_left)(self.timestamps, end)
+        return MsgPart(max(start, self.start), min(end, self.end),
+                       self.timestamps[left:right], self.records[left:right])
+
+    def get_hwm(self):
+        """Время последней записи (или начала части, если записей нет)"""
+        return self.timestamps[-1] if self.timestamps else self.start
+
+
+class DiagMsgCache:
+    """Кеш записей диаг. сообщений активов по отрезкам времени (см. описание модуля)"""
+    def __init__(self, max_bytes: int = DIAG_MSG_CACHE_MAX_BYTES,
+                 bucket: int = DIAG_MSG_CACHE_BUCKET,
+                 closed_lag: float = DIAG_MSG_CACHE_CLOSED_LAG):
+        self._max_bytes = max_bytes
+        self._bucket = bucket
+        self._closed_lag = closed_lag
+        self._parts: OrderedDict[PartKey, MsgPart] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {"bucket_hits": 0, "bucket_misses": 0, "tail_hits": 0, "queries": 0, "evicted": 0}
+
+    @property
+    def enabled(self):
+        return self._max_bytes > 0 and self._bucket > 0
+
+    def get_records(self, asset: str, filter_key: str,
+                    date_start: datetime, date_end: datetime, query: MsgQuery) -> list[dict]:
+        """
+        Получить записи сообщений актива за период [date_start, date_end],
+        упорядоченные по времени.
+
+        Parameters:
+        ---
+        - asset - guid актива;
+        - filter_key - условие отбора сообщений запроса (часть ключа кеша);
+        - query - функция запроса записей за [start, end] (сек.), новее 'after' (сек.), если задано.
+        Генерирует исключение при ошибках запроса.
+        """
+        start, end = date_start.timestamp(), date_end.timestamp()
+        now = time()
+        closed_until = (now - self._closed_lag) // self._bucket * self._bucket
+        # отрезки, закрывшиеся после последнего обновления хвоста, берутся из хвоста
+        tail_from = closed_until
+        with self._lock:
+            tail = self._parts.get((asset, filter_key, None))
+        if tail is not None and tail.start < closed_until and tail.start % self._bucket == 0:
+            tail_from = tail.start
+        first_bucket = int(start // self._bucket)
+        last_bucket = int(min(end, tail_from - 1) // self._bucket)
+
+        parts = []
+        missing = []
+        with self._lock:
+            for bucket in range(first_bucket, last_bucket + 1):
+                key = (asset, filter_key, bucket*self._bucket)
+                if (part := self._parts.get(key)) is not None:
+                    self._parts.move_to_end(key)
+                    parts.append(part)
+                else:
+                    missing.append(bucket)
+            self._stats["bucket_hits"] += len(parts)
+            self._stats["bucket_misses"] += len(missing)
+
+        for run in self._group_runs(missing):
+            parts.extend(self._query_run(asset, filter_key, run, query))
+        if end >= tail_from:
+            parts.extend(self._get_tail(asset, filter_key, max(start, tail_from), now, closed_until, query))
+
+        parts.sort(key=lambda part: part.start)
+        result = []
+        for part in parts:
+            result.extend(part.slice(start, end).records)
+        return result
+
+    @staticmethod
+    def _group_runs(missing: list[int]):
+        """Сгруппировать отсутствующие отрезки в последовательности соседних отрезков"""
+        runs = []
+        for bucket in missing:
+            if runs and runs[-1][-1] == bucket - 1:
+                runs[-1].append(bucket)
+            else:
+                runs.append([bucket])
+        return runs
+
+    def _query_run(self, asset: str, filter_key: str, run: list[int], query: MsgQuery):
+        """Запросить записи последовательности соседних закрытых отрезков и сохранить их"""
+        run_start = run[0]*self._bucket
+        run_end = (run[-1] + 1)*self._bucket
+        run_part = MsgPart.from_records(run_start, run_end, query(run_start, run_end, None))
+        self._count("queries")
+        parts = []
+        for bucket in run:
+            bucket_start = bucket*self._bucket
+            # записи на границе отрезков относятся к следующему отрезку
+            part = run_part.slice(bucket_start, bucket_start + self._bucket, include_end=False)
+            self._put((asset, filter_key, bucket_start), part)
+            parts.append(part)
+        return parts
+
+    def _get_tail(self, asset: str, filter_key: str, start: float, now: float,
+                  closed_until: float, query: MsgQuery) -> list[MsgPart]:
+        """
+        Получить записи периода [start, now]: из хвоста кеша
+        с дозапросом записей новее метки последней записи.
+        Закрытые отрезки хвоста переносятся в кеш отрезков (только отрезки целиком),
+        отрезки, закончившиеся до 'start', уже получены из кеша отрезков и не возвращаются.
+
+        Return:
+        ---
+        - [закрытые отрезки хвоста, ..., хвост]
+        """
+        key = (asset, filter_key, None)
+        with self._lock:
+            tail = self._parts.get(key)
+        if tail is not None and tail.start <= start:
+            after = max(tail.get_hwm() - self._closed_lag, tail.start)
+            new_part = MsgPart.from_records(after, now, query(after, now, after))
+            keep = bisect_right(tail.timestamps, after)
+            tail = MsgPart(tail.start, now, tail.timestamps[:keep] + new_part.timestamps,
+                           tail.records[:keep] + new_part.records)
+            self._count("tail_hits")
+        else:
+            tail = MsgPart.from_records(start, now, query(start, now, None))
+        self._count("queries")
+
+        parts = []
+        tail_start = tail.start
+        while (bucket_start := tail_start // self._bucket * self._bucket) + self._bucket <= closed_until:
+            bucket_end = bucket_start + self._bucket
+            part = tail.slice(tail_start, bucket_end, include_end=False)
+            if bucket_start == tail_start:
+                self._put((asset, filter_key, bucket_start), part)
+            if bucket_end > start:
+                parts.append(part)
+            tail_start = bucket_end
+        if tail_start != tail.start:
+            tail = tail.slice(tail_start, tail.end)
+        self._put(key, tail)
+        parts.append(tail)
+        return parts
+
+    def _count(self, name: str):
+        with self._lock:
+            self._stats[name] += 1
+
+    def _put(self, key: PartKey, part: MsgPart):
+        if part.size > self._max_bytes:
+            return
+        with self._lock:
+            if (previous := self._parts.pop(key, None)) is not None:
+                self._bytes -= previous.size
+            self._parts[key] = part
+            self._bytes += part.size
+            while self._bytes > self._max_bytes:
+                _, evicted = self._parts.popitem(last=False)
+                self._bytes -= evicted.size
+                self._stats["evicted"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._parts = OrderedDict()
+            self._bytes = 0
+
+    def get_stats(self):
+        """Получить счетчики кеша"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["parts"] = len(self._parts)
+            stats["bytes"] = self._bytes
+        requested = stats["bucket_hits"] + stats["bucket_misses"]
+        stats["hit_ratio"] = round(stats["bucket_hits"] / requested, 4) if requested else 0
+        return stats
+
+
+def to_rfc3339(timestamp: float):
+    """Время в формате фильтра '_time' LogsQL"""
+    return datetime.fromtimestamp(timestamp, timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+
+DIAG_MSG_CACHE = DiagMsgCache()
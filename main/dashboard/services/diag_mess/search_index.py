@@ -0,0 +1,177 @@
+"""
+Поиск диаг. сообщений в VictoriaLogs по тексту шаблонов языка.
+
+Текст сообщения формируется из шаблонов (message_ids) и параметров (param_groups)
+после запроса, поэтому строка поиска преобразуется в условие LogsQL по этим полям
+с помощью индекса шаблонов языка:
+- шаблоны, текст которых (без подстановок) содержит строку поиска, - отбор по коду шаблона;
+- шаблоны с подстановками, которые могут вывести строку поиска (для подстановок
+с числовым форматом, например {param1:.1f}, - только строки из цифр и знаков числа), -
+отбор по коду шаблона и значениям параметров, содержащим строку поиска.
+Значения параметров сравниваются в декодированном виде: regexp проверяет вхождение
+строки поиска внутрь строкового значения JSON (в т.ч. в виде escape-последовательностей
+\\uXXXX) или внутрь числа, но не в разметку JSON;
+- записи без шаблонов - отбор по исходному тексту сообщения (_msg).
+
+Совпадения, часть которых приходится на текст шаблона, а часть на значение
+параметра (или на соседние шаблоны сообщения), не учитываются.
+Индекс языка перестраивается после перезагрузки словарей переводов.
+"""
+import json
+import logging
+import re
+from string import Formatter
+
+from localization.services.translation.store import TranslationStore
+
+
+logger = logging.getLogger(__name__)
+
+# Символы строки времени сообщения ('%Y-%m-%d %H:%M:%S')
+_TIME_CHARS = frozenset("0123456789-: ")
+# Типы формата подстановок, выводящих только число
+_NUMERIC_FORMAT_TYPES = frozenset("bdeEfFgGnoxX%")
+# Строка поиска, которая может быть частью отформатированного числа
+_NUMERIC_SEARCH = re.compile(r"[\d\s.,+\-eE%]*\d[\d\s.,+\-eE%]*")
+# Строка поиска, которая может быть частью числа JSON
+_JSON_NUMBER_SEARCH = re.compile(r"[\d.+\-eE]*\d[\d.+\-eE]*")
+# Позиция вне строковых значений JSON: от начала текста пропускаются символы вне строк и строки целиком
+_JSON_OUTSIDE_STRINGS = r'^(?:[^"]|"(?:[^"\\]|\\.)*")*?'
+# Начало строкового значения JSON и целые символы (в т.ч. escape-последовательности) до вхождения
+_JSON_STRING_PREFIX = r'"(?:[^"\\]|\\u[0-9a-fA-F]{4}|\\[^u])*?'
+# Окончание строкового значения JSON после вхождения: строка - значение, а не ключ объекта
+_JSON_STRING_SUFFIX = r'(?:[^"\\]|\\.)*"\s*(?:[,\]}]|$)'
+
+
+def is_time_search(search: str) -> bool:
+    """Может ли строка поиска совпадать со временем сообщения"""
+    return bool(search) and set(search) <= _TIME_CHARS
+
+
+def _to_regexp_value(regexp: str) -> str:
+    """Значение regexp-фильтра LogsQL (строка в кавычках)"""
+    return json.dumps(regexp, ensure_ascii=False)
+
+
+# Текст сообщения, который при обработке считается пустым (см. use_cases._get_processed_msg_record)
+EMPTY_MSG_REGEXP = _to_regexp_value(r"^\s*(null|\[\]|\{\}|\(\))?\s*$")
+
+
+def _is_numeric_search(search: str) -> bool:
+    """Может ли строка поиска быть частью числа"""
+    return bool(_NUMERIC_SEARCH.fullmatch(search))
+
+
+def _get_json_char_regexp(char: str) -> str:
+    """Regexp символа (без учета регистра) в строковом значении JSON: сам символ или escape-последовательность"""
+    forms = set()
+    for variant in {char, char.lower(), char.upper()}:
+        forms.add(json.dumps(variant, ensure_ascii=False)[1:-1])
+        escaped = json.dumps(variant)[1:-1]
+        forms.add(escaped)
+        if escaped.startswith("\\u"):
+            forms.add("\\u" + escaped[2:].upper())
+    forms = sorted(map(re.escape, forms))
+    return forms[0] if len(forms) == 1 else f"(?:{'|'.join(forms)})"
+
+
+def _get_params_regexp(search: str) -> str:
+    """
+    Regexp вхождения строки поиска (без учета регистра) в декодированные значения
+    параметров param_groups (JSON): внутрь строкового значения (не ключа объекта) или,
+    если строка поиска может быть частью числа, внутрь числа.
+    """
+    term = "".join(map(_get_json_char_regexp, search))
+    in_string = f"{_JSON_STRING_PREFIX}{term}{_JSON_STRING_SUFFIX}"
+    if _JSON_NUMBER_SEARCH.fullmatch(search):
+        return f"{_JSON_OUTSIDE_STRINGS}(?:{in_string}|{term})"
+    return f"{_JSON_OUTSIDE_STRINGS}{in_string}"
+
+
+class DiagMsgSearchIndex:
+    """Индекс текста шаблонов диаг. сообщений одного языка"""
+    _indexes: dict[str, tuple[dict, "DiagMsgSearchIndex"]] = {}
+
+    def __init__(self, templates: dict):
+        # {id шаблона: текст шаблона без подстановок (строчными)}
+        self._texts = {}
+        # {id шаблона с подстановками параметров: есть ли подстановки, выводящие не только число}
+        self._with_params = {}
+        for msg_id, template in templates.items():
+            if not isinstance(template, str):
+                continue
+            try:
+                parts = list(Formatter().parse(template))
+            except ValueError:
+                parts = [(template, None, None, None)]
+            # подстановки заменяются разделителем, чтобы совпадения не приходились на их место
+            self._texts[msg_id] = "".join(
+                literal + ("\n" if field is not None else "") for literal, field, _, _ in parts).lower()
+            fields = [(conversion, spec) for _, field, spec, conversion in parts if field is not None]
+            if fields:
+                self._with_params[msg_id] = not all(
+                    conversion is None and spec and spec[-1] in _NUMERIC_FORMAT_TYPES for conversion, spec in fields)
+        # условие записей без перевода (нет кодов шаблонов с текстом): выводится текст '_msg'
+        translated = [msg_id for msg_id, template in templates.items() if isinstance(template, str) and template]
+        self._untranslated_filter = f"NOT message_ids:~{self._get_ids_regexp(translated)}" if translated else ""
+
+    @classmethod
+    def get(cls, lang: str) -> "DiagMsgSearchIndex":
+        """Получить индекс шаблонов языка 'lang'"""
+        templates = TranslationStore.get_all("diag_msg", lang)
+        cached = cls._indexes.get(lang)
+        if cached is None or cached[0] is not templates:
+            cached = (templates, cls(templates))
+            cls._indexes = {**cls._indexes, lang: cached}
+            logger.debug(f"Индекс поиска диаг. сообщений языка '{lang}' построен.")
+        return cached[1]
+
+    def resolve(self, search: str) -> tuple[list, list]:
+        """
+        Получить коды шаблонов, подходящих под строку поиска.
+
+        Return:
+        ---
+        - (id шаблонов, текст которых содержит строку поиска,
+        id остальных шаблонов с подстановками, которые могут вывести строку поиска)
+        """
+        is_numeric = _is_numeric_search(search)
+        search = search.lower()
+        matched = [msg_id for msg_id, text in self._texts.items() if search in text]
+        matched_set = set(matched)
+        return matched, [msg_id for msg_id, has_text in self._with_params.items()
+                         if msg_id not in matched_set and (has_text or is_numeric)]
+
+    def get_filter(self, search: str) -> str:
+        """Получить условие LogsQL отбора сообщений, текст которых содержит строку поиска"""
+        if not search:
+            return ""
+        matched, with_params = self.resolve(search)
+        search_regexp = _to_regexp_value(f"(?i){re.escape(search)}")
+        conditions = []
+        if matched:
+            conditions.append(f"message_ids:~{self._get_ids_regexp(matched)}")
+        if with_params:
+            conditions.append(
+                f"(message_ids:~{self._get_ids_regexp(with_params)} "
+                f"AND param_groups:~{_to_regexp_value(_get_params_regexp(search))})")
+        if self._untranslated_filter:
+            conditions.append(f"({self._untranslated_filter} AND _msg:~{search_regexp})")
+        else:
+            conditions.append(f"_msg:~{search_regexp}")
+        return f"({' OR '.join(conditions)})"
+
+    def get_exclude_empty_filter(self) -> str:
+        """
+        Получить условие LogsQL исключения записей, текст которых после перевода пуст:
+        нет кодов шаблонов языка с текстом, а '_msg' пуст (см. use_cases._get_processed_msg_record).
+        """
+        empty_msg = f'(_msg:"" OR _msg:~{EMPTY_MSG_REGEXP})'
+        if self._untranslated_filter:
+            return f"NOT ({empty_msg} AND {self._untranslated_filter})"
+        return f"NOT {empty_msg}"
+
+    @staticmethod
+    def _get_ids_regexp(ids: list) -> str:
+        """Regexp вхождения одного из кодов шаблонов в список кодов (message_ids)"""
+        return _to_regexp_value(f"(^|\\D)({'|'.join(map(re.escape, map(str, ids)))})(\\D|$)")
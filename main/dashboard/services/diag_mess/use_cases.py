@@ -1,18 +1,20 @@
 import logging
 from datetime import datetime
-from functools import lru_cache
 from typing import Any, Dict
 
 from dashboard.services.commons.meterings_manager import MeteringsManager
 from dashboard.services.commons.assets_manager import AssetsManager, AssetDesc
+from dashboard.services.commons.assets_registry import AssetsRegistry
 from dashboard.services.commons.status import get_status_name, diag_msg_status_eng_to_ru
 from dashboard.utils import time_func
+from dashboard.utils.async_func import run_concurrently
 from localization.services.translation.app_interface import APITralslation
 from localization.services.translation.diag_msg import DiagMsgTralslation
 
-from .diag_config import QueryConfig, ProcessedConfig, PaginationConfig
+from .diag_config import QueryConfig, ProcessedConfig, PaginationConfig, CursorConfig
 from .input_params import InputParams
-from .formatters import to_subst_page
+from .search_index import DiagMsgSearchIndex
+from .formatters import to_subst_page, to_feed_page
 from .vm_msg_manager import VMDiagMsgManager
 
 
@@ -64,29 +66,82 @@ def get_translation_latest(count: int = 5, lang: str = "ru", use_template: bool
         logger.exception(f"ERROR requesting a latest {count} diag messages")
         status = False
         diag_msg = []
-    asset_guid = [record.get("asset") for record in diag_msg if record.get("asset")]
-    assets = AssetsManager.dict_by_guid(AssetsManager.get_by_guids(asset_guid))
+    assets = AssetsRegistry.dict_by_guids(record.get("asset") for record in diag_msg if record.get("asset"))
+    result = {"diag_msg": to_latest_messages(diag_msg, assets, lang, use_template)}
+    return result, status
+
+
+def get_latest_by_assets(asset_guids: list[str], count: int, use_template: bool = True):
+    """
+    Получить последние диаг. сообщения активов 'asset_guids' одним запросом.
+
+    Return:
+    ---
+    - ([запись сообщения, ...], status), записи упорядочены от новых к старым
+    """
+    try:
+        diag_msg = MeteringsManager.get_last_messages(
+            asset_id=asset_guids,
+            group="diag",
+            count=count,
+            fields=_get_qieried_fields(use_template))
+    except Exception:
+        logger.exception(f"ERROR requesting a latest {count} diag messages for {len(asset_guids)} assets")
+        return [], False
+    return diag_msg, True
+
+
+def get_by_assets_since(asset_guids: list[str], since: str, count: int, offset: int = 0,
+                        use_template: bool = True):
+    """
+    Получить диаг. сообщения активов 'asset_guids' не старше 'since' (_time в формате RFC3339)
+    от старых к новым: 'count' сообщений начиная с 'offset'.
+
+    Return:
+    ---
+    - ([запись сообщения, ...], status)
+    """
+    try:
+        diag_msg = MeteringsManager.get_messages_since(
+            asset_id=asset_guids,
+            group="diag",
+            since=since,
+            count=count,
+            offset=offset,
+            fields=_get_qieried_fields(use_template))
+    except Exception:
+        logger.exception(f"ERROR requesting diag messages since {since} for {len(asset_guids)} assets")
+        return [], False
+    return diag_msg, True
+
+
+def to_latest_messages(diag_msg: list[dict], assets: dict, lang: str = "ru", use_template: bool = True):
+    """
+    Отформатировать записи диаг. сообщений для ленты последних сообщений.
+
+    Parameters:
+    ---
+    - diag_msg - записи сообщений (см. MeteringsManager.get_last_messages);
+    - assets - словарь соответствия guid активов их описаниям (AssetDesc).
+    """
     if use_template:
         translator = DiagMsgTralslation.from_diag_msg(diag_msg, lang)
     else:
         translator = None
-    result = {
-        "diag_msg": [
-            {
-                "substation": get_property(assets, msg.get("asset"), "subst_name"),
-                "asset_id": get_property(assets, msg.get("asset"), "id"),
-                "asset_type": get_property(assets, msg.get("asset"), "type_code"),
-                "asset": get_property(assets, msg.get("asset"), "name"),
-                "msg": _get_message(msg, translator, use_template),
-                "date": datetime.fromtimestamp(msg.get("timestamp")),
-                "level": get_status_name(msg.get("level")),
-                "id_tab": msg.get("id_tab"),
-                "signals": msg.get("signals"),
-            }
-            for msg in diag_msg
-            if msg.get("timestamp")]
-    }
-    return result, status
+    return [
+        {
+            "substation": get_property(assets, msg.get("asset"), "subst_name"),
+            "asset_id": get_property(assets, msg.get("asset"), "id"),
+            "asset_type": get_property(assets, msg.get("asset"), "type_code"),
+            "asset": get_property(assets, msg.get("asset"), "name"),
+            "msg": _get_message(msg, translator, use_template),
+            "date": datetime.fromtimestamp(msg.get("timestamp")),
+            "level": get_status_name(msg.get("level")),
+            "id_tab": msg.get("id_tab"),
+            "signals": msg.get("signals"),
+        }
+        for msg in diag_msg
+        if msg.get("timestamp")]
 
 
 def get_last(asset_id: int = None, asset_guid: str = None,
@@ -146,28 +201,135 @@ def get_asset_diag_messages(obj_id: int,
     input_params = InputParams.web_to_db_params(get_params)
     query_config = QueryConfig(**input_params)
     processed_config = ProcessedConfig(**input_params)
+    pagin_config = PaginationConfig(**input_params)
     try:
-        filt_diags = get_messages_per_interval(
-            obj_id=obj_id,
-            date_start=date_start,
-            date_end=date_end,
-            query_config=query_config,
-            processed_config=processed_config)
+        if processed_config.is_query_sortable():
+            filt_diags, count_diags = get_messages_page(
+                obj_id=obj_id,
+                date_start=date_start,
+                date_end=date_end,
+                query_config=query_config,
+                processed_config=processed_config,
+                pagin_config=pagin_config)
+        else:
+            filt_diags = get_messages_per_interval(
+                obj_id=obj_id,
+                date_start=date_start,
+                date_end=date_end,
+                query_config=query_config,
+                processed_config=processed_config)
+            count_diags = len(filt_diags)
+            filt_diags = filt_diags[pagin_config.get_start_slice():pagin_config.get_end_slice()]
         diags_query_status = True
     except Exception as ex:
         logger.error(
             "Не удалось получить диаг сообщения для: "
             f"{obj_id = }, {date_start = }, {date_end = }. {ex}")
         filt_diags = []
+        count_diags = 0
         diags_query_status = False
-    pagin_config = PaginationConfig(**input_params)
-    count_diags = len(filt_diags)
-    filt_diags = filt_diags[pagin_config.get_start_slice():pagin_config.get_end_slice()]
     return to_subst_page(filt_diags, count_diags), diags_query_status
 
 
 @time_func.runtime_in_log
-@lru_cache(maxsize=10)
+def get_node_diag_messages(node_id: int, date_start: str, date_end: str,
+                           get_params: dict = None):
+    """
+    Получить ленту диагностических сообщений всех активов элемента
+    организационной структуры (подстанции или организации со всеми входящими элементами).
+
+    Сообщения активов запрашиваются одним запросом от новых к старым,
+    страницы выбираются по курсору ('cursor' из ответа предыдущей страницы),
+    описания активов берутся из справочника активов (AssetsRegistry).
+
+    Return:
+    ---
+    - ({"diag_messages": [...], "next_cursor": str | None}, status)
+    """
+    if get_params is None:
+        get_params = {}
+    input_params = InputParams.web_to_db_params(get_params)
+    query_config = QueryConfig(**input_params)
+    processed_config = ProcessedConfig(**input_params)
+    try:
+        cursor_config = CursorConfig(**input_params)
+        assets = AssetsRegistry.get_by_node(node_id)
+        if assets is None:
+            raise ValueError(f"Элемент организационной структуры с id = {node_id} не найден.")
+        assets = AssetsManager.dict_by_guid(asset for asset in assets if asset.guid)
+        raw_diags = []
+        if assets:
+            date_start, date_end = time_func.define_date_interval(date_start, date_end)
+            raw_diags = VMDiagMsgManager.feed(
+                guids=list(assets), date_start=date_start, date_end=date_end,
+                query_config=query_config, limit=cursor_config.get_limit() + 1,
+                before=cursor_config.get_before(), skip=cursor_config.get_skip())
+        next_cursor = cursor_config.get_next_cursor(raw_diags)
+        raw_diags = raw_diags[:cursor_config.get_limit()]
+        translations = DiagMsgTralslation([], processed_config._lang).get_translations(raw_diags)
+        filt_diags = [
+            processed_rec
+            for rec, loc_msg in zip(raw_diags, translations)
+            if (asset := assets.get(rec.get("asset"))) is not None
+            and (processed_rec := _get_processed_msg_record(rec, loc_msg, asset, None))]
+        status = True
+    except Exception as ex:
+        logger.error(
+            "Не удалось получить ленту диаг сообщений для: "
+            f"{node_id = }, {date_start = }, {date_end = }. {ex}")
+        filt_diags = []
+        next_cursor = None
+        status = False
+    return to_feed_page(filt_diags, next_cursor), status
+
+
+@time_func.runtime_in_log
+def get_messages_page(
+        obj_id: int,
+        date_start: str,
+        date_end: str,
+        query_config: QueryConfig,
+        processed_config: ProcessedConfig,
+        pagin_config: PaginationConfig):
+    """
+    Получить страницу обработанных диаг сообщений за требуемый период.
+    Сортировка, пагинация, подсчет и поиск сообщений (по индексу шаблонов языка,
+    см. DiagMsgSearchIndex) выполняются в VictoriaLogs, обрабатываются только записи страницы.
+    Записи, текст которых после перевода пуст, исключаются в запросе
+    (см. DiagMsgSearchIndex.get_exclude_empty_filter), поэтому кол-во совпадает
+    с обработанными записями (кроме записей с 'message_ids' не в виде списка JSON).
+    При ошибке запроса генерирует исключение!
+
+    Return:
+    ---
+    - ([запись сообщения, ...], кол-во сообщений за период)
+    """
+    date_start, date_end = time_func.define_date_interval(
+        date_start, date_end)
+    asset = AssetsManager.get_by_id(obj_id)
+    if not asset.guid:
+        raise ValueError(f"У актива с id = {asset.id} отсутствует GUID.")
+    search = processed_config.get_search()
+    search_index = DiagMsgSearchIndex.get(processed_config._lang)
+    filters = [search_index.get_exclude_empty_filter()]
+    # если наименование актива содержит строку поиска, подходят все сообщения актива
+    if search and search not in (asset.name or "").lower():
+        filters.append(search_index.get_filter(search))
+    search_filter = " AND ".join(filters)
+    raw_diags, count_diags = run_concurrently((
+        (VMDiagMsgManager.page, {"obj_id": asset.guid, "date_start": date_start, "date_end": date_end,
+                                 "query_config": query_config,
+                                 "sort_pipe": processed_config.get_pipe_sort(),
+                                 "page_pipe": pagin_config.get_pipe_page(),
+                                 "search_filter": search_filter}),
+        (VMDiagMsgManager.count, {"obj_id": asset.guid, "date_start": date_start, "date_end": date_end,
+                                  "query_config": query_config, "search_filter": search_filter}),
+    ))
+    # записи страницы уже отобраны по строке поиска, повторная проверка изменила бы кол-во записей
+    return _get_processed_messages(raw_diags, processed_config, asset, use_search=False), count_diags
+
+
+@time_func.runtime_in_log
 def get_messages_per_interval(
         obj_id: int,
         date_start: str,
@@ -197,18 +359,21 @@ def get_messages_per_interval(
 
 
 @time_func.runtime_in_log
-def _get_processed_messages(raw_diags: list[dict], config: ProcessedConfig, asset: AssetDesc):
+def _get_processed_messages(raw_diags: list[dict], config: ProcessedConfig, asset: AssetDesc,
+                            use_search: bool = True):
     """
     Получить обработанные диаг. сообщения из списка сырых (из запроса)
     записей диаг. сообщений.
+    Если use_search = False, записи не отбираются по строке поиска.
     """
     if raw_diags:
-        translator = DiagMsgTralslation([], config._lang)
+        translations = DiagMsgTralslation([], config._lang).get_translations(raw_diags)
+        search = config._search if use_search else None
         filt_diags = [
             processed_rec
-            for rec in raw_diags
+            for rec, loc_msg in zip(raw_diags, translations)
             if (processed_rec := _get_processed_msg_record(
-                rec, translator, asset, config._search))]
+                rec, loc_msg, asset, search))]
     else:
         filt_diags = []
     return filt_diags
@@ -216,19 +381,19 @@ def _get_processed_messages(raw_diags: list[dict], config: ProcessedConfig, asse
 
 def _get_processed_msg_record(
             rec: dict,
-            translator: DiagMsgTralslation,
+            loc_msg: str,
             asset: AssetDesc,
             search: str):
-    """Получить обработанную запись диаг. сообщения"""
+    """
+    Получить обработанную запись диаг. сообщения.
+    loc_msg - текст сообщения по шаблонам (см. DiagMsgTralslation.get_translations).
+    """
     msg_time = time_func.normalize_date(rec["_time"])
     if not msg_time:
         return None
     str_msg_time = msg_time.strftime("%Y-%m-%d %H:%M:%S")
 
     raw_msg = rec.get("_msg", "").strip()
-    loc_msg = translator.get_translation(
-        rec.get("message_ids"),
-        rec.get("param_groups"))
     if not (msg := loc_msg or raw_msg):
         return None
 
@@ -238,7 +403,7 @@ def _get_processed_msg_record(
 
     asset_name = asset.name or ""
 
-    search = search.lower()
+    search = (search or "").lower()
     result_search = (
         msg.lower().find(search) > -1 or asset_name.lower().find(search) > -1
         or str_msg_time.lower().find(search) > -1)
@@ -251,6 +416,7 @@ def _get_processed_msg_record(
         "asset_name": asset_name,
         "asset": asset.id,
         "asset_type": asset.type_code,
+        "subst_name": asset.subst_name,
         "level": get_status_name(rec.get("level")),
         "level_txt": diag_msg_status_eng_to_ru(get_status_name(rec.get("level"))),
         "group": rec.get("group"),
@@ -1,12 +1,12 @@
 import logging
 import json
-import requests
 from datetime import datetime
-from functools import lru_cache
+from functools import partial
 
-from main.settings import VML_ADDRESS, VML_PROJECT_ID
+from dashboard.utils.http_client import VML_CLIENT
 from dashboard.utils.time_func import runtime_in_log
 from .diag_config import QueryConfig
+from .msg_cache import DIAG_MSG_CACHE, to_rfc3339
 
 
 logger = logger = logging.getLogger(__name__)
@@ -17,12 +17,12 @@ class VMDiagMsgManager:
 
     @classmethod
     @runtime_in_log
-    @lru_cache(maxsize=10)
     def per_interval(cls, obj_id: int, date_start: datetime, date_end: datetime,
                      query_config: QueryConfig = None):
         """
         Возвращает диагностические сообщения для
         актива в интервале [date_start, date_end]
+        (через кеш сообщений DIAG_MSG_CACHE, если он включен).
 
         Parameters:
         ---
@@ -32,24 +32,125 @@ class VMDiagMsgManager:
         if not query_config:
             query_config = QueryConfig()
 
-        url_query = f"{VML_ADDRESS}/select/logsql/query"
-        headers = {'projectid': VML_PROJECT_ID or 0}
+        group_filter = query_config.get_group_filter(None)
+        if DIAG_MSG_CACHE.enabled:
+            return DIAG_MSG_CACHE.get_records(
+                obj_id, group_filter, date_start, date_end,
+                partial(cls._query_per_interval, obj_id, query_config)), True
+        return cls._query_per_interval(obj_id, query_config, date_start.timestamp(), date_end.timestamp()), True
+
+    @classmethod
+    def _query_per_interval(cls, obj_id: int, query_config: QueryConfig,
+                            start: float, end: float, after: float | None = None):
+        """Запросить сообщения актива за [start, end] (сек.), новее 'after', если задано"""
+        filter_parts = [query_config.get_group_filter(obj_id)]
+        if after is not None:
+            filter_parts.append(f"_time:>{to_rfc3339(after)}")
+        query = " | ".join(
+            val
+            for val in (
+                " AND ".join(val for val in filter_parts if val),
+                query_config.get_pipe_fields())
+            if val)
+        return cls._query(query, datetime.fromtimestamp(start), datetime.fromtimestamp(end))
+
+    @classmethod
+    @runtime_in_log
+    def page(cls, obj_id: int, date_start: datetime, date_end: datetime,
+             query_config: QueryConfig, sort_pipe: str, page_pipe: str, search_filter: str = ""):
+        """
+        Возвращает страницу диагностических сообщений актива в интервале
+        [date_start, date_end]: сортировка и пагинация выполняются в VictoriaLogs.
+        Записи без текста сообщения исключаются в запросе.
+
+        Parameters:
+        ---
+        - sort_pipe - pipe сортировки ('sort by (...)');
+        - page_pipe - pipes пагинации ('offset N | limit M');
+        - search_filter - условие поиска по тексту сообщений (см. DiagMsgSearchIndex).
+        Генерирует исключение при ошибках запроса или парсинга результата.
+        """
         query = " | ".join(
             (
                 val
                 for val in (
-                    query_config.get_group_filter(obj_id),
+                    cls._get_page_filter(obj_id, query_config, search_filter),
+                    sort_pipe,
+                    page_pipe,
                     query_config.get_pipe_fields())
                 if val))
+        return cls._query(query, date_start, date_end)
+
+    @classmethod
+    @runtime_in_log
+    def count(cls, obj_id: int, date_start: datetime, date_end: datetime,
+              query_config: QueryConfig, search_filter: str = "") -> int:
+        """
+        Возвращает кол-во диагностических сообщений актива в интервале
+        [date_start, date_end] с отбором как в 'page'.
+        Генерирует исключение при ошибках запроса или парсинга результата.
+        """
+        query = f"{cls._get_page_filter(obj_id, query_config, search_filter)} | stats count() as count"
+        rows = cls._query(query, date_start, date_end)
+        return int(rows[0].get("count", 0)) if rows else 0
+
+    @classmethod
+    @runtime_in_log
+    def feed(cls, guids: list[str], date_start: datetime, date_end: datetime,
+             query_config: QueryConfig, limit: int, before: str | None = None, skip: int = 0):
+        """
+        Возвращает диагностические сообщения активов 'guids' в интервале
+        [date_start, date_end] одним запросом от новых к старым (keyset-пагинация).
+
+        Parameters:
+        ---
+        - limit - максимальное кол-во записей;
+        - before - время (_time) последней записи предыдущей страницы:
+        выбираются записи не новее 'before';
+        - skip - кол-во записей со временем 'before', полученных на предыдущих страницах.
+        Генерирует исключение при ошибках запроса или парсинга результата.
+        """
+        filter_parts = [
+            query_config.get_group_filter(None),
+            f"asset:in({','.join(json.dumps(guid) for guid in guids)})",
+            query_config.get_exclude_empty_filter()]
+        if before:
+            filter_parts.append(f"_time:<={before}")
+        pipes = [" AND ".join(val for val in filter_parts if val),
+                 # полный порядок записей с одинаковым временем: по активу, кодам шаблонов, параметрам,
+                 # потоку журнала и тексту - иначе смещение 'skip' может пропускать или повторять записи
+                 "sort by (_time desc, asset, message_ids, param_groups, _stream_id, _msg)"]
+        if skip:
+            pipes.append(f"offset {skip}")
+        pipes.extend((f"limit {limit}", query_config.get_pipe_fields()))
+        return cls._query(" | ".join(pipes), date_start, date_end)
+
+    @classmethod
+    def _get_page_filter(cls, obj_id: int, query_config: QueryConfig, search_filter: str = ""):
+        return " AND ".join(
+            val
+            for val in (
+                query_config.get_group_filter(obj_id),
+                query_config.get_exclude_empty_filter(),
+                search_filter)
+            if val)
+
+    @classmethod
+    def _query(cls, query: str, date_start: datetime, date_end: datetime):
+        """
+        Выполнить запрос LogsQL за интервал [date_start, date_end].
+        Возвращает список записей результата.
+        Генерирует исключение при ошибках запроса или парсинга результата.
+        """
+        url_query = "/select/logsql/query"
         params = {"query": query, "start": date_start.timestamp(), "end": date_end.timestamp()}
         query_descripts = [
             f"URL = {url_query}",
-            f"Заголовок HTTP запроса = {headers}",
             f"VLogs запрос = {query}",
             f"Параметры запроса = {params}",]
         try:
             # raise ValueError("Тестовое исключение при запросе")
-            response = requests.post(url_query, headers=headers, data=params)
+            response = VML_CLIENT.post(url_query, data=params)
         except Exception as ex:
             message_chanks = [
                     "Ошибка запроса диаг сообщений.",
@@ -57,38 +158,36 @@ class VMDiagMsgManager:
                     str(ex)]
             logger.error("\n".join(message_chanks))
             raise ex
-        else:
-            res = []
-            count_rec = 0
-            errors = {}
-            for rec in response.iter_lines():
-                count_rec += 1
-                try:
-                    # raise ValueError("Тестовое исключение при парсинге")
-                    row_data = json.loads(rec)
-                except Exception as ex:
-                    str_ex = str(ex)
-                    if str_ex not in errors:
-                        errors[str_ex] = 0
-                    errors[str_ex] += 1
-                else:
-                    res.append(row_data)
-            if errors:
-                message_chanks = [
-                    "Ошибки парсинга результата запроса диаг сообщений.",
-                    *query_descripts,
-                    f"Получено записей = {count_rec}"]
-                count_all_errors = 0
-                for key, count in errors.items():
-                    message_chanks.append(f"[Error]: {key}. Кол-во: {count}")
-                    count_all_errors += count
-                message = "\n".join(message_chanks)
-                if count_rec == count_all_errors:
-                    raise ValueError(message)
-                else:
-                    logger.warning(message)
-            status = True
-        return res, status
+        res = []
+        count_rec = 0
+        errors = {}
+        for rec in response.iter_lines():
+            count_rec += 1
+            try:
+                # raise ValueError("Тестовое исключение при парсинге")
+                row_data = json.loads(rec)
+            except Exception as ex:
+                str_ex = str(ex)
+                if str_ex not in errors:
+                    errors[str_ex] = 0
+                errors[str_ex] += 1
+            else:
+                res.append(row_data)
+        if errors:
+            message_chanks = [
+                "Ошибки парсинга результата запроса диаг сообщений.",
+                *query_descripts,
+                f"Получено записей = {count_rec}"]
+            count_all_errors = 0
+            for key, count in errors.items():
+                message_chanks.append(f"[Error]: {key}. Кол-во: {count}")
+                count_all_errors += count
+            message = "\n".join(message_chanks)
+            if count_rec == count_all_errors:
+                raise ValueError(message)
+            else:
+                logger.warning(message)
+        return res
 
     @classmethod
     def _get_condition_select_assets(cls, obj_id: int, is_subst: bool = True):
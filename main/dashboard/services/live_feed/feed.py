@@ -0,0 +1,288 @@
+"""
+Потоки обновлений (Server-Sent Events) последних значений сигналов и диаг. сообщений.
+
+Клиенты подписываются на набор активов и сигналов. Один фоновый поток процесса
+раз в LIVE_FEED_INTERVAL сек. запрашивает последние значения подписанных пар
+(актив, сигнал) (один запрос на набор кодов сигналов) и диаг. сообщения всех подписанных активов
+новее последнего полученного (страницами от метки времени), сравнивает их с предыдущим снимком и отправляет каждому подписчику
+только изменившиеся значения и новые сообщения его активов.
+Новый подписчик получает полный снимок значений своих сигналов.
+
+Поток опроса запускается при первой подписке и завершается,
+когда подписчиков не остается.
+"""
+import asyncio
+import json
+import logging
+import threading
+from time import time
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import close_old_connections
+
+from dashboard.services.commons.asset_desc import AssetDesc
+from dashboard.services.commons.assets_manager import AssetsManager
+from dashboard.services.commons.meterings_manager import MeteringsManager
+from dashboard.services.commons.status import get_status_name
+from dashboard.services.diag_mess import use_cases as diagmsg_use_cases
+from dashboard.services.diag_mess.msg_cache import to_rfc3339
+from main.settings import (LIVE_FEED_INTERVAL, LIVE_FEED_KEEPALIVE, LIVE_FEED_MAX_DURATION,
+                           LIVE_FEED_MESSAGES_LIMIT, LIVE_FEED_QUEUE_SIZE)
+
+
+logger = logging.getLogger(__name__)
+
+STATUS_CODE = "condition"
+VALUES_EVENT = "values"
+DIAG_MSG_EVENT = "diag_msg"
+
+
+def _get_message_key(record: dict) -> tuple:
+    """Ключ диаг. сообщения для пропуска повторно полученных сообщений"""
+    return (record.get("asset"), record.get("_time"), record.get("message_ids", record.get("message")))
+
+
+def format_event(event: str, data) -> str:
+    """Получить событие в формате text/event-stream"""
+    payload = json.dumps(data, cls=DjangoJSONEncoder, ensure_ascii=False, separators=(",", ":"))
+    return f"event: {event}\ndata: {payload}\n\n"
+
+
+class Subscription:
+    """
+    Подписка клиента на обновления сигналов 'codes' активов 'assets'.
+
+    События передаются из потока опроса в очередь цикла событий 'loop' клиента.
+    При переполнении очереди события отбрасываются, а подписка помечается
+    для отправки полного снимка значений в следующем цикле опроса.
+    """
+    def __init__(self, assets: list[AssetDesc], codes: list[str], lang: str,
+                 loop: asyncio.AbstractEventLoop):
+        self.assets = {asset.guid: asset for asset in assets}
+        self.codes = list(dict.fromkeys(codes))
+        self.lang = lang
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=LIVE_FEED_QUEUE_SIZE)
+        self.is_initialized = False
+
+    def get_keys(self):
+        return [(guid, code) for guid in self.assets for code in self.codes]
+
+    def push(self, event: str, data):
+        """Передать событие подписчику (вызывается из потока опроса)"""
+        try:
+            self.loop.call_soon_threadsafe(self._put, event, data)
+        except RuntimeError:
+            # цикл событий клиента уже закрыт
+            pass
+
+    def _put(self, event: str, data):
+        try:
+            self.queue.put_nowait((event, data))
+        except asyncio.QueueFull:
+            self.is_initialized = False
+
+
+class LiveFeed:
+    """Общий для процесса опрос последних значений и диаг. сообщений для подписчиков"""
+    def __init__(self, interval: float = LIVE_FEED_INTERVAL,
+                 messages_limit: int = LIVE_FEED_MESSAGES_LIMIT,
+                 use_template: bool = True):
+        self._interval = interval
+        self._messages_limit = messages_limit
+        self._use_template = use_template
+        self._subscriptions: set[Subscription] = set()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread: threading.Thread | None = None
+        # (guid актива, код сигнала) -> (значение, временная метка)
+        self._snapshot: dict[tuple[str, str], tuple] = {}
+        # время (_time) последнего полученного сообщения и ключи полученных сообщений с этим временем
+        self._messages_since: str | None = None
+        self._messages_seen: set[tuple] = set()
+        self._stats = {"cycles": 0, "events": 0, "errors": 0}
+
+    def subscribe(self, assets: list[AssetDesc], codes: list[str], lang: str) -> Subscription:
+        """Подписаться на обновления (вызывается из цикла событий клиента)"""
+        subscription = Subscription(assets, codes, lang, asyncio.get_running_loop())
+        with self._lock:
+            self._subscriptions.add(subscription)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="live_feed_thread", daemon=True)
+                self._thread.start()
+        self._wakeup.set()
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    async def stream(self, assets: list[AssetDesc], codes: list[str], lang: str,
+                     keepalive: float = LIVE_FEED_KEEPALIVE,
+                     max_duration: float = LIVE_FEED_MAX_DURATION):
+        """
+        Асинхронный итератор событий подписки на сигналы 'codes' активов 'assets'
+        в формате text/event-stream.
+
+        Подписка оформляется при начале передачи ответа и отменяется при его завершении.
+        Поток завершается через 'max_duration' сек., после чего клиент
+        (EventSource) переподключается и получает полный снимок значений.
+        """
+        subscription = self.subscribe(assets, codes, lang)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + max_duration
+        try:
+            yield f"retry: {round(self._interval * 1000)}\n\n"
+            while (timeout := deadline - loop.time()) > 0:
+                try:
+                    event, data = await asyncio.wait_for(subscription.queue.get(), min(keepalive, timeout))
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield format_event(event, data)
+        finally:
+            self.unsubscribe(subscription)
+
+    def _run(self):
+        while True:
+            with self._lock:
+                if not self._subscriptions:
+                    self._thread = None
+                    self._snapshot = {}
+                    self._messages_since = None
+                    self._messages_seen = set()
+                    return
+                subscriptions = list(self._subscriptions)
+                self._wakeup.clear()
+            try:
+                self._poll(subscriptions)
+            except Exception:
+                logger.exception("Ошибка цикла опроса потока обновлений")
+                self._stats["errors"] += 1
+            finally:
+                close_old_connections()
+            self._wakeup.wait(self._interval)
+
+    def _poll(self, subscriptions: list[Subscription]):
+        """Один цикл опроса: запрос значений и сообщений всех подписок и рассылка изменений"""
+        assets = {}
+        keys = {}
+        for subscription in subscriptions:
+            assets.update(subscription.assets)
+            keys.update(dict.fromkeys(subscription.get_keys()))
+
+        # запрашиваются только пары (актив, сигнал) подписок, а не все сочетания активов и сигналов
+        last_data, status = MeteringsManager.get_last_meterings_by_keys(list(keys))
+        snapshot = {(guid, code): (value, timestamp) for guid, code, value, timestamp in last_data}
+        if not status:
+            self._stats["errors"] += 1
+            # при ошибке запроса для неполученных ключей сохраняются прежние значения,
+            # иначе в следующем цикле они считались бы изменившимися и рассылались повторно
+            snapshot = {**{key: item for key in keys if (item := self._snapshot.get(key)) is not None},
+                        **snapshot}
+        changed = {key for key, item in snapshot.items() if self._snapshot.get(key) != item}
+        self._snapshot = snapshot
+
+        new_messages = self._poll_messages(list(assets))
+        formatted_messages = {}
+        for subscription in subscriptions:
+            keys = subscription.get_keys()
+            if not subscription.is_initialized:
+                subscription.is_initialized = True
+                sub_changed = [key for key in keys if key in snapshot]
+            else:
+                sub_changed = [key for key in keys if key in changed]
+            if sub_changed:
+                self._push(subscription, VALUES_EVENT, self._to_values_event(subscription, sub_changed, snapshot))
+
+            sub_messages = [msg for msg in new_messages if msg.get("asset") in subscription.assets]
+            if sub_messages:
+                lang = subscription.lang
+                if lang not in formatted_messages:
+                    formatted_messages[lang] = diagmsg_use_cases.to_latest_messages(
+                        new_messages, AssetsManager.dict_by_guid(assets.values()), lang, self._use_template)
+                asset_ids = {asset.id for asset in subscription.assets.values()}
+                self._push(subscription, DIAG_MSG_EVENT,
+                           {"diag_msg": [msg for msg in formatted_messages[lang]
+                                         if msg.get("asset_id") in asset_ids]})
+        self._stats["cycles"] += 1
+
+    def _poll_messages(self, guids: list[str]):
+        """
+        Получить диаг. сообщения подписанных активов, новее последнего полученного.
+
+        Сообщения запрашиваются страницами по LIVE_FEED_MESSAGES_LIMIT от метки времени
+        последнего полученного сообщения (включительно), пока не будут получены все.
+        Сообщения с временем метки, полученные ранее, пропускаются по ключу
+        (актив, время, коды шаблонов).
+        """
+        if self._messages_since is None:
+            # сообщения до начала опроса клиенты получают обычными запросами
+            records, status = diagmsg_use_cases.get_latest_by_assets(guids, 1, self._use_template)
+            if not status:
+                self._stats["errors"] += 1
+                return []
+            latest = max((record["timestamp"] for record in records if record.get("timestamp")), default=time())
+            self._messages_since = to_rfc3339(latest)
+            self._messages_seen = set()
+            self._read_messages(guids)
+            return []
+        return self._read_messages(guids)
+
+    def _read_messages(self, guids: list[str]):
+        """Запросить страницами сообщения от метки времени и сдвинуть метку"""
+        records = []
+        offset = 0
+        while True:
+            page, status = diagmsg_use_cases.get_by_assets_since(
+                guids, self._messages_since, self._messages_limit, offset, self._use_template)
+            if not status:
+                self._stats["errors"] += 1
+                break
+            records.extend(page)
+            if len(page) < self._messages_limit:
+                break
+            offset += len(page)
+
+        new_records = []
+        for record in records:
+            if not record.get("timestamp") or not record.get("_time"):
+                continue
+            key = _get_message_key(record)
+            if key in self._messages_seen:
+                continue
+            if record["_time"] != self._messages_since:
+                # записи упорядочены по времени: метка сдвигается на время записи
+                self._messages_since = record["_time"]
+                self._messages_seen = set()
+            self._messages_seen.add(key)
+            new_records.append(record)
+        return new_records
+
+    @staticmethod
+    def _to_values_event(subscription: Subscription, keys: list[tuple[str, str]], snapshot: dict):
+        values_by_assets = {}
+        for guid, code in keys:
+            value, timestamp = snapshot[(guid, code)]
+            values_by_assets.setdefault(guid, {})[code] = {"value": value, "timestamp": timestamp}
+        result = []
+        for guid, values in values_by_assets.items():
+            asset_values = {"asset_id": subscription.assets[guid].id, "values": values}
+            if STATUS_CODE in values:
+                asset_values["status"] = get_status_name(values[STATUS_CODE]["value"])
+            result.append(asset_values)
+        return {"assets": result}
+
+    def _push(self, subscription: Subscription, event: str, data):
+        subscription.push(event, data)
+        self._stats["events"] += 1
+
+    def get_stats(self):
+        """Получить счетчики потоков обновлений"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["subscriptions"] = len(self._subscriptions)
+        return stats
+
+
+LIVE_FEED = LiveFeed()
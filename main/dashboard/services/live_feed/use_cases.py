@@ -0,0 +1,61 @@
+import logging
+from json import loads
+
+from config_ui.services.block_manager import BlockManager
+from dashboard.services.commons.assets_manager import AssetsManager
+from .feed import STATUS_CODE
+
+
+logger = logging.getLogger(__name__)
+
+TCI_CODE = "hi_updated"
+
+
+def _loads_signals(signals: str | None) -> list[str]:
+    """Получить список кодов сигналов из параметра запроса (JSON-список)"""
+    if signals in (None, ""):
+        return []
+    try:
+        signals = loads(signals)
+    except Exception as ex:
+        logger.error(f"Не удалось получить список сигналов из '{signals}'. {ex}")
+        return []
+    if not isinstance(signals, (list, tuple)):
+        logger.error(f"Сигналы подписки ожидаются типа list | tuple, получен {type(signals)}")
+        return []
+    return [str(code) for code in signals]
+
+
+def get_asset_feed_params(asset_id: int, input_sgn_codes: str | None):
+    """
+    Получить активы и коды сигналов подписки на обновления актива.
+
+    По умолчанию подписка оформляется на сигналы последних значений
+    страницы актива и его статус.
+
+    Return:
+    ---
+    - (([AssetDesc], [код сигнала, ...]), status)
+    """
+    asset = AssetsManager.get_by_id(asset_id)
+    if asset is None:
+        return ([], []), False
+    codes = _loads_signals(input_sgn_codes)
+    if not codes:
+        codes = sorted(BlockManager(asset.id, "last_val").last_data_links.get_codes())
+        codes.append(STATUS_CODE)
+    return ([asset], codes), True
+
+
+def get_subst_feed_params(subst_id: int | None = None):
+    """
+    Получить активы и коды сигналов подписки на обновления подстанции:
+    статусы и ИТС оборудования. Если subst_id не задан - статусы всего оборудования.
+
+    Return:
+    ---
+    - (([AssetDesc], [код сигнала, ...]), status)
+    """
+    if subst_id is None:
+        return (AssetsManager.get_all(), [STATUS_CODE]), True
+    return (AssetsManager.get_by_subst(subst_id), [STATUS_CODE, TCI_CODE]), True
@@ -0,0 +1,99 @@
+"""
+Синхронизация рядов значений сигналов по времени.
+
+Совпадающие моменты времени находятся по столбцам временных меток рядов
+(SignalSeries) целиком, без построения словарей измерений по каждой метке:
+точное совмещение - пересечением множеств меток, совмещение с допуском - слиянием
+отсортированных рядов (merge-join), указатели которых продвигаются к общей метке
+бинарным поиском.
+Точки, для которых нет значения хотя бы одного сигнала, пропускаются.
+"""
+from array import array
+from bisect import bisect_left, bisect_right
+
+from dashboard.services.commons.series import SignalSeries
+
+
+def _sorted(series: SignalSeries) -> SignalSeries:
+    timestamps = series.timestamps
+    if all(map(int.__le__, timestamps, timestamps[1:])):
+        return series
+    order = sorted(range(len(timestamps)), key=timestamps.__getitem__)
+    return SignalSeries(series.signal,
+                        array("q", map(timestamps.__getitem__, order)),
+                        array("d", map(series.values.__getitem__, order)))
+
+
+def _exact_join(series: list[SignalSeries]) -> tuple[list, list[list]]:
+    """Совмещение по совпадающим меткам: пересечение индексов {метка: позиция} рядов"""
+    indexes = [dict(zip(signal_series.timestamps, range(len(signal_series)))) for signal_series in series]
+    common = sorted(set(indexes[0]).intersection(*indexes[1:]))
+    return common, [list(map(signal_series.values.__getitem__, map(index.__getitem__, common)))
+                    for signal_series, index in zip(series, indexes)]
+
+
+def merge_join(series: list[SignalSeries], tolerance: float = 0) -> tuple[list, list[list]]:
+    """
+    Совместить ряды по времени (inner join).
+
+    Точки рядов совмещаются, если их временные метки отличаются не более чем
+    на 'tolerance' сек. (0 - только совпадающие метки). Каждая точка ряда
+    используется не более одного раза. Для нескольких точек ряда с одинаковой
+    меткой берется последнее значение.
+
+    Return:
+    ---
+    - (временные метки первого ряда [ts, ...], значения [[значения ряда 1], ...])
+    """
+    if not series or not all(series):
+        return [], [[] for _ in series]
+    if tolerance <= 0:
+        return _exact_join(series)
+    series = [_sorted(signal_series) for signal_series in series]
+    timestamps = [signal_series.timestamps for signal_series in series]
+    values = [signal_series.values for signal_series in series]
+    lengths = list(map(len, timestamps))
+    count = len(series)
+    positions = [0] * count
+    result_timestamps = []
+    result_positions = [[] for _ in range(count)]
+
+    heads = [column[0] for column in timestamps]
+    while True:
+        latest = max(heads)
+        if latest - min(heads) <= tolerance:
+            # совпадение: берется последняя точка каждого ряда с меткой совпадения
+            for i in range(count):
+                position = bisect_right(timestamps[i], heads[i], positions[i], lengths[i])
+                result_positions[i].append(position - 1)
+                positions[i] = position
+            result_timestamps.append(heads[0])
+        else:
+            # пропуск точек, которые не могут совпасть с самой поздней меткой
+            bound = latest - tolerance
+            for i in range(count):
+                if heads[i] < bound:
+                    positions[i] = bisect_left(timestamps[i], bound, positions[i], lengths[i])
+        if any(map(int.__ge__, positions, lengths)):
+            break
+        heads = list(map(array.__getitem__, timestamps, positions))
+
+    return result_timestamps, [list(map(column.__getitem__, column_positions))
+                               for column, column_positions in zip(values, result_positions)]
+
+
+def align_by_codes(codes: list[str], series: list[SignalSeries],
+                   tolerance: float = 0) -> tuple[list, list[list]]:
+    """
+    Совместить по времени ряды сигналов 'codes' (в порядке 'codes').
+
+    Если ряда хотя бы одного сигнала нет, совмещенных точек нет.
+
+    Return:
+    ---
+    - ([ts, ...], [[значения сигнала codes[0]], ...])
+    """
+    series_by_codes = {signal_series.signal: signal_series for signal_series in series}
+    if not all(map(series_by_codes.__contains__, codes)):
+        return [], [[] for _ in codes]
+    return merge_join(list(map(series_by_codes.__getitem__, codes)), tolerance)
@@ -0,0 +1,159 @@
+"""
+Колоночная обработка измерений для форматирования графиков.
+
+Функции работают со столбцами значений целиком: проверка корректности
+столбца выполняется одной операцией, сдвиг часового пояса и округление -
+через map по всему столбцу. Поэлементная обработка с подсчетом ошибок
+выполняется только для столбцов, не прошедших проверку.
+"""
+from array import array
+from bisect import bisect_right
+from collections import deque
+from datetime import datetime, timedelta
+from itertools import groupby, repeat
+from math import floor, isfinite
+from operator import add, itemgetter
+from typing import Iterator
+
+from main.settings import ROUND_NDIGIT
+from dashboard.utils import time_func
+from dashboard.utils.number import Numeric
+
+
+# Признак элемента, который не удалось преобразовать
+INVALID = object()
+
+_EPOCH = datetime(1970, 1, 1)
+# Границы timestamp, для которых datetime.fromtimestamp не выходит за пределы datetime
+_MIN_TIMESTAMP = -62135596800 + 2*86400
+_MAX_TIMESTAMP = 253402300799 - 2*86400
+# Шаг поиска смены смещения часового пояса, сек.
+_OFFSET_PROBE_STEP = 86400
+
+
+def count_error(errors: dict, ex: Exception):
+    """Учесть ошибку преобразования в словаре {текст ошибки: кол-во}"""
+    err = str(ex)
+    errors[err] = errors.get(err, 0) + 1
+
+
+def split_columns(rows: list, width: int, errors: dict) -> list[tuple]:
+    """
+    Разбить строки измерений на 'width' столбцов.
+
+    Строки короче 'width' не попадают в результат и учитываются в 'errors'.
+    """
+    if not rows:
+        return [()] * width
+    regular = (set(map(type, rows)) <= {list, tuple}
+               and min(map(len, rows)) >= width)
+    if not regular:
+        valid_rows = []
+        for row in rows:
+            try:
+                valid_rows.append(tuple(row[i] for i in range(width)))
+            except Exception as ex:
+                count_error(errors, ex)
+        rows = valid_rows
+        if not rows:
+            return [()] * width
+    return [tuple(map(itemgetter(i), rows)) for i in range(width)]
+
+
+def iter_runs(codes: tuple) -> Iterator[tuple[str, int, int]]:
+    """Итератор участков [start, end) столбца 'codes' с одинаковым кодом сигнала"""
+    start = 0
+    for code, group in groupby(codes):
+        end = start + len(list(group))
+        yield code, start, end
+        start = end
+
+
+def consume(iterator):
+    """Выполнить итератор без сохранения результатов"""
+    deque(iterator, maxlen=0)
+
+
+def _is_valid_timestamps(timestamps) -> bool:
+    """Проверка столбца штампов времени целиком: числа в допустимом диапазоне"""
+    try:
+        column = array("d", timestamps)
+    except TypeError:
+        return False
+    if not column:
+        return True
+    return (isfinite(sum(column))
+            and min(column) >= _MIN_TIMESTAMP and max(column) <= _MAX_TIMESTAMP)
+
+
+def _get_offset(tz, timestamp: float) -> timedelta:
+    return datetime.fromtimestamp(timestamp, tz).utcoffset()
+
+
+def get_offset_segments(tz, ts_min: float, ts_max: float):
+    """
+    Получить участки постоянного смещения часового пояса на интервале [ts_min, ts_max].
+
+    Return:
+    ---
+    - (границы участков [t1, t2, ...], смещения участков [off0, off1, off2, ...])
+    """
+    bounds = []
+    offsets = [_get_offset(tz, ts_min)]
+    prev = ts_min
+    while prev < ts_max:
+        current = min(prev + _OFFSET_PROBE_STEP, ts_max)
+        if (offset := _get_offset(tz, current)) != offsets[-1]:
+            # бинарный поиск момента смены смещения с точностью до секунды
+            low, high = prev, current
+            while high - low > 1:
+                middle = (low + high) // 2
+                if _get_offset(tz, middle) == offsets[-1]:
+                    low = middle
+                else:
+                    high = middle
+            bounds.append(high)
+            offsets.append(offset)
+        prev = current
+    return bounds, offsets
+
+
+def local_datetimes(timestamps, errors: dict, tz=None) -> list:
+    """
+    Преобразовать столбец штампов времени (сек.) в локальные datetime без tzinfo.
+
+    Результат совпадает с datetime.fromtimestamp(ts, tz).replace(tzinfo=None).
+    Элементы, которые не удалось преобразовать, заменяются на INVALID,
+    ошибки учитываются в 'errors'.
+    """
+    tz = tz or time_func.get_tz()
+    if not _is_valid_timestamps(timestamps):
+        result = []
+        for timestamp in timestamps:
+            try:
+                result.append(datetime.fromtimestamp(timestamp, tz).replace(tzinfo=None))
+            except Exception as ex:
+                count_error(errors, ex)
+                result.append(INVALID)
+        return result
+    if not timestamps:
+        return []
+
+    deltas = map(timedelta, repeat(0), timestamps)
+    bounds, offsets = get_offset_segments(tz, floor(min(timestamps)), floor(max(timestamps)) + 1)
+    if not bounds:
+        return list(map((_EPOCH + offsets[0]).__add__, deltas))
+    bases = [_EPOCH + offset for offset in offsets]
+    segments = map(bisect_right, repeat(bounds), timestamps)
+    return list(map(add, map(bases.__getitem__, segments), deltas))
+
+
+def round_values(values, ndigit: int = ROUND_NDIGIT) -> list:
+    """
+    Округлить столбец значений.
+
+    Результат совпадает с поэлементным Numeric.round_float(value, ndigit).
+    """
+    if ndigit > 0 and set(map(type, values)) <= {float}:
+        return list(map(round, values, repeat(ndigit)))
+    return list(map(Numeric.round_float, values, repeat(ndigit)))
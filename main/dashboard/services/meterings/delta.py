@@ -0,0 +1,83 @@
+"""
+Дельта-режим ответов с временными рядами и последними значениями.
+
+Клиент передает параметр 'since' - watermark (epoch ms) из предыдущего ответа -
+и получает только точки и значения с временной меткой строго больше watermark.
+Каждый ответ содержит новый watermark - максимальную временную метку
+переданных данных (или 'since', если новых данных нет).
+
+Один watermark общий для всех сигналов, поэтому точки и значения с метками
+не старше DELTA_LOOKBACK сек. до watermark передаются повторно: иначе терялись бы
+значения, поступившие с опозданием, и значения сигналов, отстающих от остальных.
+"""
+import logging
+from typing import Iterable
+
+from main.settings import DELTA_LOOKBACK
+
+
+logger = logging.getLogger(__name__)
+
+_MS_IN_SECOND = 1000
+
+
+def parse_since(value: str | None) -> float | None:
+    """
+    Получить watermark из параметра запроса 'since' (epoch ms).
+
+    Return:
+    ---
+    - timestamp, сек. или None, если параметр не задан или некорректен
+    """
+    if value in (None, ""):
+        return None
+    try:
+        since = int(value)
+    except (TypeError, ValueError):
+        logger.error(f"Некорректное значение параметра since: '{value}'")
+        return None
+    if since < 0:
+        logger.error(f"Некорректное значение параметра since: '{value}'")
+        return None
+    return since / _MS_IN_SECOND
+
+
+def to_watermark(timestamp: float | None) -> int | None:
+    """Преобразовать timestamp (сек.) в watermark (epoch ms)"""
+    if timestamp is None:
+        return None
+    return round(timestamp * _MS_IN_SECOND)
+
+
+def get_watermark(timestamps: Iterable, since: float | None = None) -> int | None:
+    """
+    Получить новый watermark (epoch ms) по временным меткам (сек.) переданных данных.
+
+    Некорректные метки пропускаются. Если меток нет - возвращается 'since'.
+    """
+    latest = since
+    for timestamp in timestamps:
+        try:
+            timestamp = float(timestamp)
+        except (TypeError, ValueError):
+            continue
+        if latest is None or timestamp > latest:
+            latest = timestamp
+    return to_watermark(latest)
+
+
+def get_threshold(since: float | None) -> float | None:
+    """Получить границу (сек.) временных меток дельты: передаются метки строго больше границы"""
+    if since is None:
+        return None
+    return since - DELTA_LOOKBACK
+
+
+def is_newer(timestamp, since: float | None) -> bool:
+    """Передается ли в дельте значение с временной меткой 'timestamp' (сек.) (см. get_threshold)"""
+    if since is None:
+        return True
+    try:
+        return float(timestamp) > get_threshold(since)
+    except (TypeError, ValueError):
+        return False
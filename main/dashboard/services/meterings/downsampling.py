@@ -0,0 +1,192 @@
+"""
+Прореживание рядов значений сигналов для графиков.
+
+- LTTB (largest-triangle-three-buckets) - отбор не более 'points' точек,
+сохраняющих форму линии;
+- M4 - для каждого столбца пикселей графика сохраняются первая, последняя,
+минимальная и максимальная точки (не более 4 точек на столбец).
+"""
+import logging
+from array import array
+from bisect import bisect_left
+from dataclasses import dataclass
+from itertools import repeat
+from math import floor
+from operator import add, mul
+
+from main.settings import (
+    DOWNSAMPLING_MAX_POINTS, DOWNSAMPLING_OVERSAMPLING, RANGE_CACHE_CHUNK_POINTS, VM_MAX_POINTS_PER_SERIES)
+from dashboard.services.commons.series import SignalSeries
+
+
+logger = logging.getLogger(__name__)
+
+LTTB = "lttb"
+M4 = "m4"
+DOWNSAMPLING_MODES = (LTTB, M4)
+# Кол-во интервалов запроса для прореживания: выравнивание границ по шагу добавляет точку,
+# по отрезкам RangeCache - до отрезка с каждой стороны
+_MAX_FETCH_POINTS = VM_MAX_POINTS_PER_SERIES - 2*RANGE_CACHE_CHUNK_POINTS - 1
+
+
+def lttb_indices(xs, ys, threshold: int) -> list[int]:
+    """
+    Получить индексы точек, отобранных алгоритмом LTTB.
+
+    Точки делятся на корзины с равным количеством точек, из каждой корзины
+    выбирается точка, образующая наибольший треугольник с точкой, выбранной
+    в предыдущей корзине, и средней точкой следующей корзины.
+    При 'threshold' < 3 сохраняются крайние точки (при 1 - последняя).
+    """
+    count = len(xs)
+    if threshold >= count or threshold < 1:
+        return list(range(count))
+    if threshold < 3:
+        return [0, count - 1] if threshold == 2 else [count - 1]
+
+    every = (count - 2) / (threshold - 2)
+    selected = [0]
+    a = 0
+    for i in range(threshold - 2):
+        avg_start = floor((i + 1)*every) + 1
+        avg_end = min(floor((i + 2)*every) + 1, count)
+        avg_count = avg_end - avg_start
+        avg_x = sum(xs[avg_start:avg_end]) / avg_count
+        avg_y = sum(ys[avg_start:avg_end]) / avg_count
+
+        range_start = floor(i*every) + 1
+        range_end = floor((i + 1)*every) + 1
+        # удвоенная площадь треугольника линейна по (x, y) точки корзины:
+        # |(ax - avg_x)*(y - ay) - (ax - x)*(avg_y - ay)| = |dx*y + dy*x + c|
+        ax, ay = xs[a], ys[a]
+        dx = ax - avg_x
+        dy = avg_y - ay
+        c = -dx*ay - dy*ax
+        areas = list(map(abs, map(add,
+                                  map(add, map(mul, ys[range_start:range_end], repeat(dx)),
+                                      map(mul, xs[range_start:range_end], repeat(dy))),
+                                  repeat(c))))
+        a = range_start + max(range(len(areas)), key=areas.__getitem__)
+        selected.append(a)
+    selected.append(count - 1)
+    return selected
+
+
+def m4_indices(xs, columns: int, x_start: float, x_end: float, *value_columns) -> list[int]:
+    """
+    Получить индексы точек, отобранных алгоритмом M4.
+
+    Интервал [x_start, x_end] делится на 'columns' столбцов равной ширины.
+    В каждом столбце сохраняются первая и последняя точки, а также точки
+    минимума и максимума каждого из рядов 'value_columns'.
+    Значения 'xs' должны быть отсортированы по возрастанию.
+    """
+    count = len(xs)
+    if columns < 1 or count <= 4*columns:
+        return list(range(count))
+
+    width = (x_end - x_start) / columns
+    selected = []
+    low = bisect_left(xs, x_start)
+    for column in range(1, columns + 1):
+        high = count if column == columns else bisect_left(xs, x_start + column*width, low)
+        if high > low:
+            indices = {low, high - 1}
+            for values in value_columns:
+                indices.add(min(range(low, high), key=values.__getitem__))
+                indices.add(max(range(low, high), key=values.__getitem__))
+            selected.extend(sorted(indices))
+        low = high
+    return selected
+
+
+def take(series: SignalSeries, indices: list[int]) -> SignalSeries:
+    """Получить ряд из точек 'series' с индексами 'indices'"""
+    return SignalSeries(series.signal,
+                        array("q", map(series.timestamps.__getitem__, indices)),
+                        array("d", map(series.values.__getitem__, indices)))
+
+
+@dataclass(frozen=True)
+class Downsampling:
+    """
+    Параметры прореживания.
+
+    - mode - алгоритм (LTTB, M4);
+    - points - для LTTB кол-во точек ряда, для M4 кол-во столбцов пикселей.
+    """
+    mode: str
+    points: int
+
+    @classmethod
+    def from_params(cls, max_points: str | None, width: str | None, mode: str | None):
+        """
+        Получить параметры прореживания из параметров запроса.
+
+        Parameters:
+        ---
+        - max_points - максимальное кол-во точек ряда ('maxPoints');
+        - width - ширина графика в пикселях ('width');
+        - mode - алгоритм 'lttb' | 'm4' ('downsampling'). По умолчанию для 'width' - M4,
+        для 'maxPoints' - LTTB.
+
+        Return:
+        ---
+        - Downsampling или None, если прореживание не запрошено
+        """
+        sizes = {}
+        for name, value in (("maxPoints", max_points), ("width", width)):
+            if value in (None, ""):
+                continue
+            try:
+                sizes[name] = int(value)
+            except (TypeError, ValueError):
+                logger.error(f"Некорректное значение параметра {name}: '{value}'")
+        sizes = {name: value for name, value in sizes.items() if value > 0}
+        if not sizes:
+            return None
+
+        if mode in (None, ""):
+            mode = M4 if "width" in sizes else LTTB
+        elif mode not in DOWNSAMPLING_MODES:
+            logger.error(f"Неизвестный алгоритм прореживания '{mode}', "
+                         f"ожидается один из {DOWNSAMPLING_MODES}")
+            return None
+
+        if mode == M4:
+            points = sizes.get("width") or sizes["maxPoints"] // 4
+            max_points = DOWNSAMPLING_MAX_POINTS // 4
+        else:
+            points = sizes.get("maxPoints") or sizes["width"]
+            max_points = DOWNSAMPLING_MAX_POINTS
+        return cls(mode, max(min(points, max_points), 1))
+
+    @property
+    def fetch_points(self) -> int:
+        """
+        Кол-во интервалов min/max запроса данных для прореживания.
+        Не больше VM_MAX_POINTS_PER_SERIES за вычетом точек, добавляемых выравниванием
+        границ запроса по шагу и по отрезкам RangeCache.
+        """
+        return max(min(self.points * DOWNSAMPLING_OVERSAMPLING, _MAX_FETCH_POINTS), 1)
+
+    def apply(self, series: SignalSeries, date_start: float, date_end: float) -> SignalSeries:
+        """Проредить ряд значений сигнала"""
+        if self.mode == M4:
+            indices = m4_indices(series.timestamps, self.points, date_start, date_end, series.values)
+        else:
+            indices = lttb_indices(series.timestamps, series.values, self.points)
+        if len(indices) == len(series):
+            return series
+        return take(series, indices)
+
+    def path_indices(self, timestamps, xs, ys, date_start: float, date_end: float) -> list[int]:
+        """
+        Получить индексы отобранных точек кривой (xs[i], ys[i]), упорядоченной по времени.
+
+        LTTB отбирает точки по площади треугольников в плоскости (x, y),
+        M4 - по столбцам оси времени с сохранением экстремумов обеих координат.
+        """
+        if self.mode == M4:
+            return m4_indices(timestamps, self.points, date_start, date_end, xs, ys)
+        return lttb_indices(xs, ys, self.points)
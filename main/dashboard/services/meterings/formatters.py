@@ -2,16 +2,19 @@ import logging
 from typing import List, Dict, Any, Union
 from datetime import datetime
 from json import loads
-from itertools import zip_longest
+from itertools import compress, repeat, zip_longest
 
-from main.settings import ROUND_NDIGIT
+from main.settings import ROUND_NDIGIT, SYNC_TIME_TOLERANCE
 from dashboard.utils import time_func
 from dashboard.utils.number import Numeric
 from dashboard.services.commons.signal_desc import SignalDesc
 from dashboard.services.commons.status import get_status_name_without_undefined
 from dashboard.services.commons.gd_table_line import GDTableLine
+from dashboard.services.commons.series import SignalSeries
 from config_ui.services.pasp_manager import PaspManager
+from . import alignment, columnar
 from .added_signal import AddedSignal
+from .downsampling import Downsampling
 from .overload_coeff import overload_coeffs
 from .sgn_code_schemes import loadcapacity_table_code
 
@@ -252,40 +255,20 @@ def _get_v_lines_by_codes(
     max_value = 0
     errors = {}
 
-    for record in meterings:
-        try:
-            code: str = record[0]
-            value = Numeric.round_float(record[2], ROUND_NDIGIT)
-        except Exception as ex:
-            if (err := str(ex)) not in errors:
-                errors[err] = 1
-            else:
-                errors[err] = errors[err] + 1
-            continue
+    codes, timestamps, values = columnar.split_columns(meterings, 3, errors)
+    for code, start, end in columnar.iter_runs(codes):
         # определение min, max значений сигналов начинающихся с min_max_code_prefix
         if code.startswith(min_max_code_prefix):
-            try:
-                value = Numeric.form_float(record[2], ROUND_NDIGIT, 0)
-            except Exception as ex:
-                if (err := str(ex)) not in errors:
-                    errors[err] = 1
-                else:
-                    errors[err] = errors[err] + 1
-            else:
-                min_value = min(min_value, value)
-                max_value = max(max_value, value)
+            run_values = list(map(Numeric.form_float, values[start:end], repeat(ROUND_NDIGIT), repeat(0)))
+            min_value = min(min_value, min(run_values))
+            max_value = max(max_value, max(run_values))
         # обработка значений сигналов из selecting_codes
         if code in selecting_codes:
-            try:
-                timestamp = datetime.fromtimestamp(record[1], time_func.get_tz()).replace(tzinfo=None)
-            except Exception as ex:
-                if (err := str(ex)) not in errors:
-                    errors[err] = 1
-                else:
-                    errors[err] = errors[err] + 1
-            else:
+            run_values = columnar.round_values(values[start:end])
+            run_dates = columnar.local_datetimes(timestamps[start:end], errors)
+            for timestamp, value in zip(run_dates, run_values):
                 # запись добавляется если текущее значение отличается от предыдущего
-                if prev_values[code] != value:
+                if timestamp is not columnar.INVALID and prev_values[code] != value:
                     prev_values[code] = value
                     result[code].append([timestamp])
     # удаляем из результата сигналы не имеющие отобранных записей
@@ -557,21 +540,15 @@ def get_meterings_by_codes(meterings: list):
     """Получить словарь соответствия кодов сигналов измерениям"""
     result = {}
     errors = {}
-    local_tz = time_func.get_tz()
-    for record in meterings:
-        try:
-            code = record[0]
-            timestamp = datetime.fromtimestamp(record[1], local_tz).replace(tzinfo=None)
-            value = Numeric.round_float(record[2], ROUND_NDIGIT)
-        except Exception as ex:
-            if (err := str(ex)) not in errors:
-                errors[err] = 1
-            else:
-                errors[err] = errors[err] + 1
-        else:
-            if code not in result:
-                result[code] = []
-            result[code].append([timestamp, value])
+    codes, timestamps, values = columnar.split_columns(meterings, 3, errors)
+    dates = columnar.local_datetimes(timestamps, errors)
+    values = columnar.round_values(values)
+    for code, start, end in columnar.iter_runs(codes):
+        records = list(map(list, zip(dates[start:end], values[start:end])))
+        if errors:
+            records = [record for record in records if record[0] is not columnar.INVALID]
+        if records:
+            result.setdefault(code, []).extend(records)
     if errors:
         err_str = "".join((f"'{err}' в количестве {count} штук\n" for err, count in errors.items()))
         logger.error("При преобразовании значений полей измерений сигналов"
@@ -583,20 +560,12 @@ def get_meterings_by_codes(meterings: list):
 
 def get_forecast_meterings(code: str, meterings: list):
     """Получить отформатированный список прогнозных значений"""
-    result = []
     errors = {}
-    for record in meterings:
-        try:
-            timestamp = datetime.fromtimestamp(record[0], time_func.get_tz()).replace(tzinfo=None)
-            value = Numeric.round_float(record[1], ROUND_NDIGIT)
-        except Exception as ex:
-            if (err := str(ex)) not in errors:
-                errors[err] = 1
-            else:
-                errors[err] = errors[err] + 1
-        else:
-            result.append([timestamp, value])
+    timestamps, values = columnar.split_columns(meterings, 2, errors)
+    dates = columnar.local_datetimes(timestamps, errors)
+    result = list(map(list, zip(dates, columnar.round_values(values))))
     if errors:
+        result = [record for record in result if record[0] is not columnar.INVALID]
         err_str = "".join((f"'{err}' в количестве {count} штук\n" for err, count in errors.items()))
         logger.error(f"При преобразовании значений полей прогноза сигнала {code}"
                      f" ({len(meterings)} строк)"
@@ -607,22 +576,13 @@ def get_forecast_meterings(code: str, meterings: list):
 
 def get_meterings_by_timestamp(meterings: list):
     """Получить словарь соответствия штампов времени измерениям"""
-    result = {}
     errors = {}
-    for record in meterings:
-        try:
-            code = record[0]
-            timestamp = record[1]
-            value = Numeric.round_float(record[2], ROUND_NDIGIT)
-        except Exception as ex:
-            if (err := str(ex)) not in errors:
-                errors[err] = 1
-            else:
-                errors[err] = errors[err] + 1
-        else:
-            if timestamp not in result:
-                result[timestamp] = {}
-            result[timestamp][code] = value
+    codes, timestamps, values = columnar.split_columns(meterings, 3, errors)
+    values = columnar.round_values(values)
+    result = {timestamp: {} for timestamp in timestamps}
+    for code, start, end in columnar.iter_runs(codes):
+        columnar.consume(map(dict.__setitem__, map(result.__getitem__, timestamps[start:end]),
+                             repeat(code), values[start:end]))
     if errors:
         err_str = "".join((f"'{err}' в количестве {count} штук\n" for err, count in errors.items()))
         logger.error("При преобразовании значений полей измерений сигналов"
@@ -632,50 +592,48 @@ def get_meterings_by_timestamp(meterings: list):
     return result
 
 
-def get_meterings_by_codes_synchronized_time(sgn_codes_to_out_key: dict, meterings: list):
+def get_meterings_by_codes_synchronized_time(sgn_codes_to_out_key: dict, series: List[SignalSeries],
+                                             tolerance: float = SYNC_TIME_TOLERANCE):
     """
     Получить словарь соответствия сигналов спискам измерений
     синхронизированным по времени. В результате для каждого сигнала i-й элемент
     в списке измерений соответсвует i-му элементу в списке моментов времени.
     Если для какого-то момента времени отсутствует измерение хотя бы для
     одного сигнала, то этот момент времени не попадает в результат.
+    Измерения с отличием временных меток не более 'tolerance' сек.
+    считаются одновременными.
     В результате коды сигналов заменяются соотвествующим им выходным ключам
     из 'sgn_codes_to_out_key'.
     """
-    result = {"dates": []}
-    for out_key in sgn_codes_to_out_key.values():
-        result[out_key] = []
-    meterings_by_timestamp = get_meterings_by_timestamp(meterings)
-    for timestamp, meterings in meterings_by_timestamp.items():
-        try:
-            date = datetime.fromtimestamp(timestamp, time_func.get_tz()).replace(tzinfo=None)
-        except Exception:
-            logger.exception(f"Ошибка преобразования {timestamp = } в дату.")
-            continue
-        data_in_timestamp = {}
-        for code, out_key in sgn_codes_to_out_key.items():
-            try:
-                data_in_timestamp[out_key] = meterings[code]
-            except Exception:
-                logger.exception(f"Для даты {date} отсутствует значение для сигнала {code}.")
-                continue
-        result["dates"].append(date)
-        for out_key, value in data_in_timestamp.items():
-            result[out_key].append(value)
+    timestamps, columns = alignment.align_by_codes(list(sgn_codes_to_out_key), series, tolerance)
+    errors = {}
+    dates = columnar.local_datetimes(timestamps, errors)
+    if errors:
+        valid = [date is not columnar.INVALID for date in dates]
+        dates = list(compress(dates, valid))
+        columns = [list(compress(column, valid)) for column in columns]
+        err_str = "".join((f"'{err}' в количестве {count} штук\n" for err, count in errors.items()))
+        logger.error("При преобразовании штампов времени синхронизированных измерений"
+                     f" ({len(timestamps)} точек)"
+                     " возникли ошибки:\n"
+                     f"{err_str}")
+    result = {"dates": dates}
+    for out_key, column in zip(sgn_codes_to_out_key.values(), columns):
+        result[out_key] = columnar.round_values(column)
     return result
 
 
-def to_duval_triangle(sgn_codes_to_out_key: dict, meterings: list):
+def to_duval_triangle(sgn_codes_to_out_key: dict, series: List[SignalSeries]):
     """Возвращает отформатированные данные для треугольника Дюваля"""
     return {
-        "triangle": get_meterings_by_codes_synchronized_time(sgn_codes_to_out_key, meterings)
+        "triangle": get_meterings_by_codes_synchronized_time(sgn_codes_to_out_key, series)
     }
 
 
-def to_duval_pentagon(sgn_codes_to_out_key: dict, meterings: list):
+def to_duval_pentagon(sgn_codes_to_out_key: dict, series: List[SignalSeries]):
     """Возвращает отформатированные данные для пятиугольника Дюваля"""
     return {
-        "pentagon": get_meterings_by_codes_synchronized_time(sgn_codes_to_out_key, meterings)
+        "pentagon": get_meterings_by_codes_synchronized_time(sgn_codes_to_out_key, series)
     }
 
 
@@ -797,9 +755,15 @@ def to_forecast_3d(meterings_dict: dict, model_status_key: str, data_key: str, a
 
 def to_hysteresis(signals: List[SignalDesc],
                   data_keys: list,
-                  meterings: list):
+                  series: List[SignalSeries],
+                  downsampling: Downsampling | None = None,
+                  date_start: float | None = None,
+                  date_end: float | None = None,
+                  tolerance: float = SYNC_TIME_TOLERANCE):
     """
     Возвращает отформатированные данные для страницы графика гистерезиса.
+    Точки кривой - значения сигналов, совмещенные по времени с допуском 'tolerance' сек.
+    Если задан 'downsampling', точки кривой прореживаются в пределах [date_start, date_end].
     """
     result = {"params": []}
     if len(data_keys) < 2:
@@ -811,18 +775,20 @@ def to_hysteresis(signals: List[SignalDesc],
             signal_x = sgn
         if data_keys[1] == sgn._code:
             signal_y = sgn
-    if not signal_x and not signal_y:
+    if not signal_x or not signal_y:
         return result
 
-    meterings_by_time = get_meterings_by_timestamp(meterings)
-    data_x = []
-    data_y = []
-    for timestamp in sorted(meterings_by_time.keys()):
-        x = meterings_by_time[timestamp].get(signal_x._code)
-        y = meterings_by_time[timestamp].get(signal_y._code)
-        if x is not None and y is not None:
-            data_x.append(x)
-            data_y.append(y)
+    timestamps, (data_x, data_y) = alignment.align_by_codes(
+        [signal_x._code, signal_y._code], series, tolerance)
+    data_x = columnar.round_values(data_x)
+    data_y = columnar.round_values(data_y)
+    if downsampling is not None and timestamps:
+        indices = downsampling.path_indices(
+            timestamps, data_x, data_y,
+            timestamps[0] if date_start is None else date_start,
+            timestamps[-1] if date_end is None else date_end)
+        data_x = list(map(data_x.__getitem__, indices))
+        data_y = list(map(data_y.__getitem__, indices))
 
     result["params"].append(
         {
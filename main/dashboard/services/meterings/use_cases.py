@@ -1,14 +1,21 @@
 import logging
 from copy import deepcopy
+from dataclasses import dataclass
+from datetime import datetime
+from itertools import chain
 from json import loads
+from operator import itemgetter
 
 from dashboard.utils import time_func
+from dashboard.utils.async_func import run_concurrently
 from dashboard.services.commons.signal_desc import SignalDesc
 from dashboard.services.commons.assets_manager import AssetsManager
 from dashboard.services.commons.meterings_manager import MeteringsManager, AssetDesc
 from dashboard.services.commons.gd_table_line import GD_TABLE_LINES
 from dashboard.services.diag_mess.use_cases import get_last
 from .added_signal import AddedSignal
+from .downsampling import Downsampling
+from . import delta
 from . import formatters
 from . import sgn_code_schemes
 from . import api_label_schemes
@@ -23,6 +30,14 @@ from config_ui.services.pasp_manager import PaspManager
 logger = logging.getLogger(__name__)
 
 ASSET_MODEL_LABEL = "assetType"
+# Допустимая доля периода, на которую могут расходиться last_date окон одного общего запроса
+WIDGETS_WINDOW_MERGE_SLACK = 0.25
+OVERVOLTAGE_TAB = "overvoltage"
+LOADCAPACITY_TAB = "loadcapacity"
+# Коды сигналов последних значений виджетов диагностики газов
+RD_TABLE_KEY = "diag_c_model1rd_tbl"
+RD_NOMOGRAM_KEYS = ("diag_c_model2rd", "diag_c_model2rd_nomogram")
+FORECAST_3D_KEYS = ("diag_c_forecast_3d", "c_forecast_3d")
 
 
 @time_func.runtime_in_log
@@ -48,6 +63,7 @@ def get_asset_desc(func: object):
     """
     Заменяет в принимаемых аргументах 'id актива' на соответсвующий актив.
     'id актива' должен быть первым неименованным аргументом.
+    Если вместо 'id актива' передан актив (AssetDesc), он используется без запроса.
     """
     def wrapper(*args, **kwargs):
         try:
@@ -56,7 +72,10 @@ def get_asset_desc(func: object):
             logger.error(f"Для {func.__module__}.{func.__qualname__} ожидается "
                          f"как минимум один аргумент - id актива (int)")
             return {}, False
-        asset = AssetsManager.get_by_id(asset_id)
+        if isinstance(asset_id, AssetDesc):
+            asset = asset_id
+        else:
+            asset = AssetsManager.get_by_id(asset_id)
         if asset is None:
             logger.error(f"Для {func.__module__}.{func.__qualname__} "
                          f"не удалось получить актив с id = {asset_id}")
@@ -75,12 +94,25 @@ def _get_added_pdata_signaldesc(lang: str):
                       None, None, None)
 
 
-@get_asset_desc
-def get_last_meterings_v2(asset: AssetDesc, lang: str):
-    """Получить последние значения сигналов для актива с asset_id"""
-    asset_model_label = ASSET_MODEL_LABEL
-    asset_model_code = "asset_model"
-
+@dataclass
+class LastValuesSignals:
+    """Сигналы и переводы страницы последних значений актива"""
+    block_manager: BlockManager
+    pasp_manager: PaspManager
+    last_signals: list[SignalDesc]
+    pasp_sgns: list[SignalDesc]
+    period_signals: list[SignalDesc]
+    added_signals: list[AddedSignal]
+    dictionary_sgns: list[SignalDesc]
+    constants_sgns: list[SignalDesc]
+    units: dict
+    back_labels: dict
+    # коды сигналов, последние значения которых запрашиваются для страницы
+    last_codes: set[str]
+
+
+def get_last_values_signals(asset: AssetDesc, lang: str) -> LastValuesSignals:
+    """Получить сигналы и переводы страницы последних значений актива"""
     block_manager = BlockManager(asset.id, "last_val")
     pasp_manager = PaspManager()
     last_signals, pasp_sgns, period_signals = SignalDesc.get_signals_from_codes(
@@ -109,27 +141,48 @@ def get_last_meterings_v2(asset: AssetDesc, lang: str):
         [last_signals, period_signals], lang, {"sg_name"})
     PaspSignalTralslation.translate_collections(
        pasp_manager.get_signals(), lang)
-    pasp_manager._p_category
     units = SignalDescTralslation.get_unit_translations(block_manager.units.get_codes(), lang)
     back_labels_codes = block_manager.back_labels.get_codes()
     back_labels_codes.update(
         (
             "asset_info_tbl_sect_pdatas", "asset_info_tbl_sect_limits",
-            "asset_info_tbl_sect_constants", asset_model_label)
+            "asset_info_tbl_sect_constants", ASSET_MODEL_LABEL)
     )
     back_labels = APITralslation.get_translts(list(back_labels_codes), lang)
 
-    last_signals_codes = SignalDesc.get_codes(
+    last_codes = SignalDesc.get_codes(
         (last_signals, period_signals, dictionary_sgns, constants_sgns, pasp_sgns),
         False)
-    last_signals_codes.update(AddedSignal.get_codes(added_signals))
+    last_codes.update(AddedSignal.get_codes(added_signals))
+    return LastValuesSignals(block_manager, pasp_manager, last_signals, pasp_sgns, period_signals,
+                             added_signals, dictionary_sgns, constants_sgns, units, back_labels, last_codes)
+
+
+@get_asset_desc
+def get_last_meterings_v2(asset: AssetDesc, lang: str, since: float | None = None,
+                          page: LastValuesSignals | None = None):
+    """
+    Получить последние значения сигналов для актива с asset_id.
+
+    Если задан watermark 'since' (сек.), возвращаются только значения сигналов,
+    обновленные после 'since' с запасом (см. '_get_last_values_delta', delta.get_threshold).
+    Сигналы страницы 'page' могут быть получены заранее (см. 'get_last_values_signals').
+    """
+    asset_model_label = ASSET_MODEL_LABEL
+    asset_model_code = "asset_model"
+
+    if page is None:
+        page = get_last_values_signals(asset, lang)
     last_data, last_data_status = MeteringsManager.get_last_meterings(
         asset,
-        last_signals_codes)
+        page.last_codes)
 
     last_timestamp_by_codes = MeteringsManager.get_last_meterings_timestamp_by_codes(
         last_data)
-    block_manager.period_data_links.set_last_date(last_timestamp_by_codes)
+    page.block_manager.period_data_links.set_last_date(last_timestamp_by_codes)
+    if since is not None:
+        result, period_data_status = _get_last_values_delta(asset, page, last_data, last_timestamp_by_codes, since)
+        return result, period_data_status and last_data_status
 
     last_data = MeteringsManager.get_last_meterings_by_codes(last_data, True)
 
@@ -137,23 +190,20 @@ def get_last_meterings_v2(asset: AssetDesc, lang: str):
         asset_model_code: {
             "order": 0,
             "category": "pdata_main",
-            "name": back_labels.get(asset_model_label)}}
-    pasp_manager.add_psignals_from_dict(added_p_sgn_configs)
+            "name": page.back_labels.get(asset_model_label)}}
+    page.pasp_manager.add_psignals_from_dict(added_p_sgn_configs)
     added_pasp_sgns = _get_added_passport_signals(added_p_sgn_configs)
-    if isinstance(pasp_sgns, list):
-        pasp_sgns.extend(added_pasp_sgns)
+    if isinstance(page.pasp_sgns, list):
+        page.pasp_sgns.extend(added_pasp_sgns)
     last_data[asset_model_code] = asset.model
 
-    for signal in added_signals:
+    for signal in page.added_signals:
         last_data[signal.get_code()] = signal.get_formatted_value(last_data.get(signal.get_code()))
 
     period_data, period_data_status = __get_period_data_for_widgets(
-        block_manager, period_signals, asset)
+        page.block_manager, page.period_signals, asset)
 
-    signals_precision = {}
-    for signals in (last_signals, period_signals):
-        for sgn in signals:
-            signals_precision[sgn._code] = sgn._precision
+    signals_precision = _get_signals_precision(page)
     result = {
         "object_id": asset.subst_id,
         "object_name": asset.subst_name,
@@ -161,27 +211,89 @@ def get_last_meterings_v2(asset: AssetDesc, lang: str):
         "asset_type": asset.type_code
     }
     result.update(
-        {sgn.get_output_key(): last_data.get(signal.get_code()) for sgn in added_signals})
+        {sgn.get_output_key(): last_data.get(signal.get_code()) for sgn in page.added_signals})
     result.update(
-        block_manager.get_data_to_page(
+        page.block_manager.get_data_to_page(
             signals_precision,
             last_data,
             period_data,
             {"image_url": asset.get_image_url(), "scheme_image_url": asset.get_scheme_image_url()},
-            units,
-            back_labels)
+            page.units,
+            page.back_labels)
     )
     result.update(
         formatters.get_additional_formatted_data_to_last_values_page(
-            dictionary_sgns, constants_sgns, last_data)
+            page.dictionary_sgns, page.constants_sgns, last_data)
     )
     result.update(
         formatters.get_passport_data_to_last_values_page(
-            pasp_sgns, pasp_manager, last_data)
+            page.pasp_sgns, page.pasp_manager, last_data)
     )
+    result["watermark"] = delta.get_watermark(last_timestamp_by_codes.values())
     return result, period_data_status or last_data_status
 
 
+def _get_signals_precision(page: LastValuesSignals):
+    """Получить словарь соответствия кодов сигналов страницы их точности"""
+    signals_precision = {}
+    for signals in (page.last_signals, page.period_signals):
+        for sgn in signals:
+            signals_precision[sgn._code] = sgn._precision
+    return signals_precision
+
+
+def _get_last_values_delta(asset: AssetDesc, page: LastValuesSignals, last_data: list[list],
+                           last_timestamp_by_codes: dict, since: float):
+    """
+    Получить последние значения сигналов, обновленные после watermark 'since'.
+
+    Значения форматируются так же, как в полном ответе (точность сигналов, блоки страницы,
+    справочники и паспорт), но ответ содержит только обновленные значения:
+    блоки и панели, ссылающиеся на обновленные сигналы (данные за периоды запрашиваются
+    только для этих блоков), и категории справочников и паспорта с обновленными сигналами.
+
+    Return:
+    ---
+    - ({<ключи дополнительных сигналов>, "outter", "inner", "data", "model_settings", "p_data",
+    "watermark": epoch ms}, статус запроса данных за периоды)
+    """
+    changed = {code for _, code, _, timestamp in last_data if delta.is_newer(timestamp, since)}
+    last_data = MeteringsManager.get_last_meterings_by_codes(last_data, True)
+    for signal in page.added_signals:
+        last_data[signal.get_code()] = signal.get_formatted_value(last_data.get(signal.get_code()))
+
+    linked_codes = page.block_manager.get_linked_codes(changed) if changed else set()
+    if linked_codes:
+        period_data, period_data_status = __get_period_data_for_widgets(
+            page.block_manager, [sgn for sgn in page.period_signals if sgn._code in linked_codes], asset)
+    else:
+        period_data, period_data_status = {}, True
+
+    result = {sgn.get_output_key(): last_data.get(sgn.get_code())
+              for sgn in page.added_signals if sgn.get_code() in changed}
+    result.update(
+        page.block_manager.get_data_to_page(
+            _get_signals_precision(page),
+            last_data,
+            period_data,
+            {"image_url": asset.get_image_url(), "scheme_image_url": asset.get_scheme_image_url()},
+            page.units,
+            page.back_labels,
+            codes=changed)
+    )
+    changed_data = {code: value for code, value in last_data.items() if code in changed}
+    result.update(
+        formatters.get_additional_formatted_data_to_last_values_page(
+            page.dictionary_sgns, page.constants_sgns, changed_data)
+    )
+    result.update(
+        formatters.get_passport_data_to_last_values_page(
+            page.pasp_sgns, page.pasp_manager, changed_data)
+    )
+    result["watermark"] = delta.get_watermark(map(last_timestamp_by_codes.get, changed), since)
+    return result, period_data_status
+
+
 def _loads_signals(signals: str | None):
     """Получить список кодов сигналов десериализованный из входной строки"""
     try:
@@ -195,15 +307,38 @@ def _loads_signals(signals: str | None):
     return signals
 
 
-@get_asset_desc
-def get_meterings_for_charts(asset: AssetDesc,
-                             date_start: str | None, date_end: str | None,
-                             tab: str, input_sgn_codes: str | None, lang: str):
-    """Получить значения сигналов для актива с asset_id за временной диапазон"""
-    overvoltage_tab = "overvoltage"
-    loadcapacity_tab = "loadcapacity"
+def _get_downsampled_meterings(asset: AssetDesc, code_by_sources: dict,
+                               date_start: float, date_end: float,
+                               downsampling: Downsampling, since: float | None = None):
+    """Получить прореженные значения сигналов [(signal, timestamp, value), ...] за период"""
+    series, status = MeteringsManager.get_meterings_columnar(
+        asset, code_by_sources, date_start, date_end,
+        is_reduced=True, count_points=downsampling.fetch_points, since=since)
+    meterings = []
+    for signal_series in series:
+        meterings.extend(downsampling.apply(signal_series, date_start, date_end).to_tuples())
+    return meterings, status
+
+
+@dataclass
+class ChartsSignals:
+    """Сигналы вкладки графиков актива"""
+    signals: list[SignalDesc]
+    offline_signals: list[SignalDesc]
+    forecast_sgns: list[SignalDesc]
+    signals_for_v_line: list[SignalDesc]
+    signals_for_loadcap_table: list[SignalDesc]
+    # коды сигналов, последние значения которых запрашиваются для вкладки
+    last_codes: set[str]
+
+
+def get_charts_signals(asset: AssetDesc, tab: str, input_sgn_codes: str | None,
+                       lang: str, date_end: datetime) -> ChartsSignals:
+    """
+    Получить сигналы вкладки графиков 'tab' актива.
+    Прогнозы включаются, только если диапазон графиков заканчивается текущей датой.
+    """
     t_now = time_func.now_with_tz(None)
-    date_start, date_end = time_func.define_date_interval(date_start, date_end)
     input_sgn_codes = _loads_signals(input_sgn_codes)
     (
         signals,
@@ -217,11 +352,11 @@ def get_meterings_for_charts(asset: AssetDesc,
     signals_for_table = []
     signals_for_v_line = []
     signals_for_loadcap_table = []
-    if tab == overvoltage_tab:
+    if tab == OVERVOLTAGE_TAB:
         signals_for_table, signals_for_v_line = SignalDesc.get_signals_from_codes(
             (sgn_code_schemes.overvoltage_table_code,
              sgn_code_schemes.overvoltage_v_line_code))
-    elif tab == loadcapacity_tab:
+    elif tab == LOADCAPACITY_TAB:
         signals_for_loadcap_table = SignalDesc.get_signals_from_codes(
              sgn_code_schemes.loadcapacity_table_code)
 
@@ -229,32 +364,76 @@ def get_meterings_for_charts(asset: AssetDesc,
         [signals, offline_signals, forecast_sgns, signals_for_v_line, signals_for_loadcap_table],
         lang)
 
-    signals_by_source = SignalDesc.get_codes_by_source(
-        signals + signals_for_v_line, False)
-    offline_signals_by_source = SignalDesc.get_codes_by_source(offline_signals, False)
-    last_signals_codes = SignalDesc.get_codes(
+    last_codes = SignalDesc.get_codes(
         (limits, forecast_sgns, signals_for_table, signals_for_loadcap_table),
         False)
-    if tab == loadcapacity_tab:
-        last_signals_codes.update(
+    if tab == LOADCAPACITY_TAB:
+        last_codes.update(
             ("overload_coeff_num_in_table", "itsu_1044", "itsu_1085",
              "table_overload_coeff_long_number", "its_1081_manual")
         )
+    return ChartsSignals(signals, offline_signals, forecast_sgns,
+                         signals_for_v_line, signals_for_loadcap_table, last_codes)
 
-    task_query_last_data = MeteringsManager.get_last_meterings_by_codes_sync(asset, last_signals_codes)
-    task_query_period_data = MeteringsManager.get_meterings(
-        asset,
-        signals_by_source,
-        date_start.timestamp(), date_end.timestamp(),
-        True
-    )
 
-    task_query_off_period_data = MeteringsManager.get_meterings(
-        asset,
-        offline_signals_by_source,
-        date_start.timestamp(), date_end.timestamp(),
-        False
-    )
+@get_asset_desc
+def get_meterings_for_charts(asset: AssetDesc,
+                             date_start: str | None, date_end: str | None,
+                             tab: str, input_sgn_codes: str | None, lang: str,
+                             downsampling: Downsampling | None = None,
+                             since: float | None = None,
+                             charts: ChartsSignals | None = None):
+    """
+    Получить значения сигналов для актива с asset_id за временной диапазон.
+
+    Если задан 'downsampling', значения сигналов (кроме offline) прореживаются
+    до заданного кол-ва точек, иначе запрашиваются min/max по 2048 интервалам.
+
+    Если задан watermark 'since' (сек.), возвращаются только точки и прогнозы
+    новее 'since' (с запасом, см. delta.get_threshold) с шагом, рассчитанным по всему временному диапазону.
+    Для вкладки перенапряжений 'since' не применяется: вертикальные линии
+    строятся по изменениям значений за весь диапазон.
+    В результат добавляется новый watermark (epoch ms).
+
+    Сигналы вкладки 'charts' могут быть получены заранее (см. 'get_charts_signals').
+    """
+    date_start, date_end = time_func.define_date_interval(date_start, date_end)
+    if charts is None:
+        charts = get_charts_signals(asset, tab, input_sgn_codes, lang, date_end)
+    if tab == OVERVOLTAGE_TAB:
+        since = None
+    threshold = delta.get_threshold(since)
+    forecast_sgns = charts.forecast_sgns
+
+    signals_by_source = SignalDesc.get_codes_by_source(
+        charts.signals + charts.signals_for_v_line, False)
+    offline_signals_by_source = SignalDesc.get_codes_by_source(charts.offline_signals, False)
+
+    if downsampling is None:
+        period_query = (
+            MeteringsManager.get_meterings,
+            {"asset_id": asset, "code_by_sources": signals_by_source,
+             "date_start": date_start.timestamp(), "date_end": date_end.timestamp(),
+             "is_reduced": True, "since": threshold})
+    else:
+        period_query = (
+            _get_downsampled_meterings,
+            {"asset": asset, "code_by_sources": signals_by_source,
+             "date_start": date_start.timestamp(), "date_end": date_end.timestamp(),
+             "downsampling": downsampling, "since": threshold})
+    (
+        task_query_last_data,
+        task_query_period_data,
+        task_query_off_period_data
+    ) = run_concurrently((
+        (MeteringsManager.get_last_meterings_by_codes_sync,
+         {"asset": asset, "codes": charts.last_codes}),
+        period_query,
+        (MeteringsManager.get_meterings,
+         {"asset_id": asset, "code_by_sources": offline_signals_by_source,
+          "date_start": date_start.timestamp(), "date_end": date_end.timestamp(),
+          "is_reduced": False, "since": threshold}),
+    ))
 
     res_query_period_data = task_query_period_data
     res_query_off_period_data = task_query_off_period_data
@@ -269,26 +448,34 @@ def get_meterings_for_charts(asset: AssetDesc,
     data_for_period, data_for_period_status = result_query_period_data
     last_data, last_data_status = result_query_last_data
 
-    signals.extend(offline_signals)
+    forecast_timestamps = [last_data.get(signal._code, {}).get("timestamp") for signal in forecast_sgns]
+    if since is not None:
+        forecast_sgns = [signal for signal, timestamp in zip(forecast_sgns, forecast_timestamps)
+                         if delta.is_newer(timestamp, since)]
+
+    signals = charts.signals + charts.offline_signals
     result = formatters.to_charts_page(signals, forecast_sgns, data_for_period, last_data, tab)
-    if tab == overvoltage_tab:
+    result["watermark"] = delta.get_watermark(
+        chain(map(itemgetter(1), data_for_period), forecast_timestamps), since)
+    if tab == OVERVOLTAGE_TAB:
         translts_phrases = APITralslation.get_translts(
             api_label_schemes.overvolt_tab, lang)
         result.update(formatters.to_overvoltage_table(last_data, translts_phrases))
         result.update(formatters.to_overvoltage_charts(
-            signals_for_v_line, data_for_period, translts_phrases))
-    elif tab == loadcapacity_tab:
+            charts.signals_for_v_line, data_for_period, translts_phrases))
+    elif tab == LOADCAPACITY_TAB:
         translts_phrases = APITralslation.get_translts(
             api_label_schemes.loadcap_tab, lang)
         result.update(formatters.to_loadcapacity_coeff(last_data, translts_phrases))
-        result.update(formatters.to_loadcapacity_table(signals_for_loadcap_table, last_data, translts_phrases))
+        result.update(formatters.to_loadcapacity_table(charts.signals_for_loadcap_table, last_data,
+                                                       translts_phrases))
     return result, data_for_period_status or last_data_status
 
 
 @get_asset_desc
 def get_rd_table(asset: AssetDesc, lang: str):
     """Получить статусы превышения лимитов отношений газов по методике РД"""
-    data_key = "diag_c_model1rd_tbl"
+    data_key = RD_TABLE_KEY
     last_data, status = MeteringsManager.get_last_meterings(
         asset,
         (data_key,))
@@ -308,11 +495,11 @@ def get_duval_triangle(asset: AssetDesc, date_start: str | None, date_end: str |
         "diag_c_duval31_r_ch4": "CH4"}
     signals = SignalDesc.get_signals_from_codes(sgn_codes_to_out_key.keys())
     date_start, date_end = time_func.define_date_interval(date_start, date_end)
-    meterings, status = MeteringsManager.get_meterings(
+    series, status = MeteringsManager.get_meterings_columnar(
         asset,
         SignalDesc.get_codes_by_source(signals, False),
         date_start.timestamp(), date_end.timestamp())
-    return formatters.to_duval_triangle(sgn_codes_to_out_key, meterings), status
+    return formatters.to_duval_triangle(sgn_codes_to_out_key, series), status
 
 
 @get_asset_desc
@@ -328,18 +515,17 @@ def get_duval_pentagon(asset: AssetDesc, date_start: str | None, date_end: str |
         "diag_c_duval51_c_c2h2": "c2h2"}
     signals = SignalDesc.get_signals_from_codes(sgn_codes_to_out_key.keys())
     date_start, date_end = time_func.define_date_interval(date_start, date_end)
-    meterings, status = MeteringsManager.get_meterings(
+    series, status = MeteringsManager.get_meterings_columnar(
         asset,
         SignalDesc.get_codes_by_source(signals, False),
         date_start.timestamp(), date_end.timestamp())
-    return formatters.to_duval_pentagon(sgn_codes_to_out_key, meterings), status
+    return formatters.to_duval_pentagon(sgn_codes_to_out_key, series), status
 
 
 @get_asset_desc
 def get_rd_nomogram(asset: AssetDesc, lang: str, use_template: bool):
     """Получить данные диагностики по методу номограмм"""
-    model_status_key = "diag_c_model2rd"
-    data_key = "diag_c_model2rd_nomogram"
+    model_status_key, data_key = RD_NOMOGRAM_KEYS
     msg_type = "diag_nomogram_rd"
     last_data, status1 = MeteringsManager.get_last_meterings(
         asset,
@@ -354,8 +540,7 @@ def get_rd_nomogram(asset: AssetDesc, lang: str, use_template: bool):
 @get_asset_desc
 def get_forecast_3d(asset: AssetDesc, lang: str):
     """Получить данные диагностики по методу номограмм"""
-    model_status_key = "diag_c_forecast_3d"
-    data_key = "c_forecast_3d"
+    model_status_key, data_key = FORECAST_3D_KEYS
 
     last_data, status = MeteringsManager.get_last_meterings(
         asset,
@@ -368,8 +553,13 @@ def get_forecast_3d(asset: AssetDesc, lang: str):
 @get_asset_desc
 def get_hysteresis(asset: AssetDesc,
                    date_start: str | None, date_end: str | None,
-                   tab: str, lang: str):
-    """Получить гистерезис сигналов для актива с asset_id за временной диапазон"""
+                   tab: str, lang: str,
+                   downsampling: Downsampling | None = None):
+    """
+    Получить гистерезис сигналов для актива с asset_id за временной диапазон.
+
+    Если задан 'downsampling', точки кривой гистерезиса прореживаются.
+    """
     signals_codes_by_tabs = {
         "humidity": ["t_bt", "rs"]
     }
@@ -379,11 +569,12 @@ def get_hysteresis(asset: AssetDesc,
 
     date_start, date_end = time_func.define_date_interval(date_start, date_end)
 
-    meterings, meter_status = MeteringsManager.get_meterings(
+    series, meter_status = MeteringsManager.get_meterings_columnar(
         asset,
         SignalDesc.get_codes_by_source(signals, False),
         date_start.timestamp(), date_end.timestamp())
-    return (formatters.to_hysteresis(signals, data_keys, meterings),
+    return (formatters.to_hysteresis(signals, data_keys, series, downsampling,
+                                     date_start.timestamp(), date_end.timestamp()),
             meter_status)
 
 
@@ -464,23 +655,94 @@ def get_diag_sett_data(asset: AssetDesc, lang: str):
     return result, last_data_status
 
 
+def _merge_period_windows(windows: dict[tuple[float, float], set]):
+    """
+    Объединить окна (period, last_date) одного периода в группы для общего запроса.
+
+    Окна объединяются, пока разброс last_date в группе не превышает
+    доли WIDGETS_WINDOW_MERGE_SLACK от периода, т.е. общий запрос
+    возвращает не более чем на эту долю больше точек, чем запросы по окнам.
+
+    Return:
+    ---
+    - [(date_start, date_end, [(period, last_date, links), ...]), ...]
+    """
+    by_periods: dict[float, list[tuple[float, set]]] = dict()
+    for (period, last_date), links in windows.items():
+        by_periods.setdefault(period, []).append((last_date, links))
+    groups = []
+    for period, items in by_periods.items():
+        items.sort(key=lambda x: x[0])
+        group = []
+        for last_date, links in items:
+            if group and last_date - group[0][1] > period * WIDGETS_WINDOW_MERGE_SLACK:
+                groups.append((group[0][1] - period, group[-1][1], group))
+                group = []
+            group.append((period, last_date, links))
+        if group:
+            groups.append((group[0][1] - period, group[-1][1], group))
+    return groups
+
+
+def _query_period_window_group(asset: AssetDesc, date_start: float, date_end: float,
+                               group: list[tuple[float, float, set]],
+                               period_signals_by_codes: dict[str, SignalDesc]):
+    """
+    Выполнить общий запрос для группы окон и разделить результат по ссылкам.
+
+    Return:
+    ---
+    - ([(code, period, meterings), ...], status)
+    """
+    code_by_sources = dict()
+    for _, _, links in group:
+        for link in links:
+            sgn = period_signals_by_codes[link.code]
+            code_by_sources.setdefault(sgn._storage, set()).add(sgn._code)
+    meterings, status = MeteringsManager.get_meterings(
+        asset, code_by_sources, date_start, date_end)
+    by_codes = dict()
+    for record in meterings:
+        by_codes.setdefault(record[0], []).append(record)
+    result = []
+    for period, last_date, links in group:
+        for link in links:
+            records = [record for record in by_codes.get(link.code, ())
+                       if last_date - period <= record[1] <= last_date]
+            result.append((link.code, period, records))
+    return result, status
+
+
 @time_func.runtime_in_log
 def __get_period_data_for_widgets(
         block_manager: BlockManager, period_signals: list[SignalDesc], asset: AssetDesc):
+    """
+    Получить значения сигналов виджетов за их периоды.
+
+    Ссылки группируются по окнам (period, last_date), для каждой группы окон
+    выполняется один запрос по всем ее сигналам, группы запрашиваются параллельно.
+    """
     period_data = dict()
     period_data_status = True
     period_signals_by_codes = {sgn._code: sgn for sgn in period_signals}
-    for link in block_manager.period_data_links.links:
-        if (sgn := period_signals_by_codes.get(link.code)):
-            sgn_data, query_status = MeteringsManager.get_meterings(
-                asset,
-                {sgn._storage: set((sgn._code, ))},
-                link.last_date - link.period, link.last_date,
-                )
-            sgn_data = formatters.get_meterings_by_codes(sgn_data)
+    windows = {
+        window: window_links
+        for window, links in block_manager.period_data_links.get_dict_by_windows().items()
+        if (window_links := {link for link in links if link.code in period_signals_by_codes})
+    }
+    groups = _merge_period_windows(windows)
+    results = run_concurrently(
+        (_query_period_window_group,
+         {"asset": asset, "date_start": date_start, "date_end": date_end,
+          "group": group, "period_signals_by_codes": period_signals_by_codes})
+        for date_start, date_end, group in groups
+    )
+    for links_data, query_status in results:
+        for code, period, records in links_data:
+            sgn_data = formatters.get_meterings_by_codes(records)
             for code, data in sgn_data.items():
                 if code not in period_data:
                     period_data[code] = dict()
-                period_data[code][link.period] = data
-            period_data_status = period_data_status or query_status
+                period_data[code][period] = data
+        period_data_status = period_data_status and query_status
     return period_data, period_data_status
@@ -0,0 +1,174 @@
+"""
+Компактный колоночный формат ответов с временными рядами.
+
+Формат выбирается параметром запроса 'format=columnar' или заголовком
+'Accept: application/vnd.columnar+json'. По умолчанию ответ не меняется.
+
+В колоночном формате:
+- ряд [[datetime, value], ...] передается как
+{"t0": epoch ms, "step": ms, "n": кол-во точек, "v": [value, ...]}
+при равномерном шаге или {"t0": epoch ms, "dt": [ms, ...], "v": [value, ...]},
+где dt - разности соседних меток времени;
+- для рядов [[datetime, v1, v2, ...], ...] "v" - список столбцов [[v1, ...], [v2, ...], ...];
+- список меток времени [datetime, ...] передается как {"t0", "step", "n"} или {"t0", "dt"}.
+
+Тело ответа сжимается gzip/deflate, если клиент поддерживает сжатие (Accept-Encoding
+с учетом весов q: "gzip;q=0" запрещает gzip).
+"""
+import gzip
+import json
+import zlib
+from bisect import bisect_right
+from datetime import datetime, timedelta
+from itertools import repeat
+from operator import floordiv, itemgetter, sub
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse, JsonResponse
+
+from dashboard.utils import time_func
+from .columnar import get_offset_segments
+
+
+COLUMNAR_FORMAT = "columnar"
+COLUMNAR_CONTENT_TYPE = "application/vnd.columnar+json"
+# Минимальный размер тела ответа (байт), начиная с которого оно сжимается
+COMPRESS_MIN_SIZE = 1024
+# Поддерживаемые способы сжатия в порядке предпочтения при равных весах
+_ENCODINGS = ("gzip", "deflate")
+
+_EPOCH = datetime(1970, 1, 1)
+_MILLISECOND = timedelta(milliseconds=1)
+_MS_IN_SECOND = 1000
+
+
+def is_columnar_requested(request) -> bool:
+    """Запрошен ли колоночный формат ответа"""
+    return (request.GET.get("format") == COLUMNAR_FORMAT
+            or COLUMNAR_CONTENT_TYPE in request.headers.get("Accept", ""))
+
+
+def _to_epoch_ms(dates: list) -> list[int]:
+    """
+    Преобразовать локальные datetime без tzinfo в epoch ms.
+
+    Неоднозначное локальное время (перевод часов назад) относится
+    к первому наступлению, как при datetime.timestamp() с fold=0.
+    """
+    tz = time_func.get_tz()
+    local_ms = list(map(floordiv, map(sub, dates, repeat(_EPOCH)), repeat(_MILLISECOND)))
+    # участки смещения часового пояса с запасом в сутки на разницу локального времени и UTC
+    bounds, offsets = get_offset_segments(tz, min(local_ms) // _MS_IN_SECOND - 86400,
+                                          max(local_ms) // _MS_IN_SECOND + 86400)
+    offsets_ms = [offset // _MILLISECOND for offset in offsets]
+    if not bounds:
+        return list(map(sub, local_ms, repeat(offsets_ms[0])))
+    # границы участков в локальном времени: пропущенное при переводе вперед время
+    # относится к участку до перевода, повторяющееся - к первому участку
+    local_bounds = [bound * _MS_IN_SECOND + max(offsets_ms[i], offsets_ms[i + 1])
+                    for i, bound in enumerate(bounds)]
+    segments = map(bisect_right, repeat(local_bounds), local_ms)
+    return list(map(sub, local_ms, map(offsets_ms.__getitem__, segments)))
+
+
+def _encode_times(dates: list) -> dict:
+    """Получить представление списка меток времени: t0 и шаг или разности"""
+    epoch_ms = _to_epoch_ms(dates)
+    deltas = list(map(sub, epoch_ms[1:], epoch_ms[:-1]))
+    if len(set(deltas)) <= 1:
+        return {"t0": epoch_ms[0], "step": deltas[0] if deltas else 0, "n": len(epoch_ms)}
+    return {"t0": epoch_ms[0], "dt": deltas}
+
+
+def _is_series(rows: list) -> bool:
+    """Является ли список рядом [[datetime, value, ...], ...] с одинаковой длиной строк"""
+    return (set(map(type, rows)) <= {list, tuple}
+            and len(widths := set(map(len, rows))) == 1 and widths.pop() >= 2
+            and set(map(type, map(itemgetter(0), rows))) == {datetime}
+            and rows[0][0].tzinfo is None)
+
+
+def _encode_series(rows: list) -> dict:
+    result = _encode_times(list(map(itemgetter(0), rows)))
+    width = len(rows[0])
+    if width == 2:
+        result["v"] = list(map(itemgetter(1), rows))
+    else:
+        result["v"] = [list(map(itemgetter(column), rows)) for column in range(1, width)]
+    return result
+
+
+def to_columnar(data):
+    """Преобразовать временные ряды в структуре ответа в колоночный формат"""
+    if isinstance(data, dict):
+        return {key: to_columnar(value) for key, value in data.items()}
+    if isinstance(data, (list, tuple)) and data:
+        if set(map(type, data)) == {datetime} and data[0].tzinfo is None:
+            return _encode_times(data)
+        if _is_series(data):
+            return _encode_series(data)
+        return [to_columnar(item) for item in data]
+    return data
+
+
+def _get_encoding_weights(accept_encoding: str) -> dict[str, float]:
+    """Получить веса (q) способов сжатия из заголовка Accept-Encoding"""
+    weights = {}
+    for item in accept_encoding.split(","):
+        coding, *params = item.split(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        weight = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[coding] = weight
+    return weights
+
+
+def _get_encoding(accept_encoding: str) -> str | None:
+    """
+    Получить способ сжатия ответа по заголовку Accept-Encoding: поддерживаемый способ
+    с наибольшим весом (q), '*' задает вес не перечисленных способов. None - без сжатия.
+    """
+    weights = _get_encoding_weights(accept_encoding)
+    default = weights.get("*", 0.0)
+    encoding = max(_ENCODINGS, key=lambda item: weights.get(item, default))
+    return encoding if weights.get(encoding, default) > 0 else None
+
+
+def _compress(request, body: bytes):
+    """Сжать тело ответа поддерживаемым клиентом способом"""
+    if len(body) < COMPRESS_MIN_SIZE:
+        return body, None
+    encoding = _get_encoding(request.headers.get("Accept-Encoding", ""))
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=5), encoding
+    if encoding == "deflate":
+        return zlib.compress(body, 5), encoding
+    return body, None
+
+
+def timeseries_response(request, result: dict, status: int = 200) -> HttpResponse:
+    """
+    Получить ответ с данными 'result' в запрошенном формате:
+    колоночном (см. 'is_columnar_requested') или JSON по умолчанию.
+    """
+    if not is_columnar_requested(request):
+        return JsonResponse(result, json_dumps_params={'ensure_ascii': False}, status=status)
+
+    result = to_columnar(result)
+    result["format"] = COLUMNAR_FORMAT
+    body = json.dumps(result, cls=DjangoJSONEncoder, ensure_ascii=False,
+                      separators=(",", ":")).encode()
+    body, encoding = _compress(request, body)
+    response = HttpResponse(body, content_type=f"{COLUMNAR_CONTENT_TYPE}; charset=utf-8", status=status)
+    response["Vary"] = "Accept, Accept-Encoding"
+    if encoding:
+        response["Content-Encoding"] = encoding
+    return response
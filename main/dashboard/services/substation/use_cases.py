@@ -9,6 +9,7 @@ from dashboard.services.commons.conclusion_table_line import CONCLUS_TABLE_LINES
 from dashboard.services.commons.meterings_manager import MeteringsManager
 from dashboard.services.commons.signal_desc import SignalDesc
 from dashboard.services.commons.status import get_status_name, txt_status_to_number100
+from dashboard.services.meterings import delta
 from dashboard.services.meterings.formatters import get_meterings_by_codes
 from dashboard.utils.number import Numeric
 from localization.services.translation.asset import AssetDescTralslation
@@ -64,8 +65,14 @@ def get_all_assets_with_statuses(lang: str):
     return result, status
 
 
-def get_subst_assets(subst_id: int, lang: str):
-    """Получить данные об оборудовании подстанции."""
+def get_subst_assets(subst_id: int, lang: str, since: float | None = None):
+    """
+    Получить данные об оборудовании подстанции.
+
+    Если задан watermark 'since' (сек.), возвращается только оборудование
+    с обновленными после 'since' значениями, а 'tci_period' содержит только
+    точки новее 'since' (с запасом, см. delta.get_threshold). В результат добавляется новый watermark (epoch ms).
+    """
     tci_code = "hi_updated"
     status_code = "condition"
     sgn_last_codes = (tci_code, status_code)
@@ -91,39 +98,33 @@ def get_subst_assets(subst_id: int, lang: str):
     period_signals = SignalDesc.get_signals_from_codes((tci_code,))
     signals_by_source = SignalDesc.get_codes_by_source(period_signals, False)
 
-    queries_params = []
+    intervals = {}
     for asset in assets:
         timestamp_end = asset_last_values.get(asset.guid, {}).get(tci_code, {}).get("timestamp")
         if timestamp_end is None:
             continue
         timestamp_end = int(timestamp_end)
         timestamp_start = timestamp_end - 86400 * 30
-        queries_params.append(
-            {
-                "asset_id": asset,
-                "code_by_sources": signals_by_source,
-                "date_start": timestamp_start,
-                "date_end": timestamp_end,
-                "is_reduced": True,
-                "count_points": 30
-            }
-        )
-
-    queries_results = []
+        intervals[asset.guid] = (timestamp_start, timestamp_end)
 
-    for query_params in queries_params:
-        res = MeteringsManager.get_meterings(**query_params)
-        queries_results.append(res[0])
-        res_status = res_status and res[1]
+    queries_results, query_status = MeteringsManager.get_meterings_by_assets(
+        intervals, signals_by_source, True, 30, delta.get_threshold(since))
+    res_status = res_status and query_status
 
     assets_info = {}
-    for i, asset in enumerate(assets):
+    timestamps = []
+    for asset in assets:
         last_values = asset_last_values.get(asset.guid, {})
         try:
-            period_values = get_meterings_by_codes(queries_results[i])
+            period_values = get_meterings_by_codes(queries_results.get(asset.guid, []))
         except Exception as ex:
             logger.error(f"Ошибка обработки данных за период для guid актива {asset.guid}. {ex}")
             period_values = {}
+        last_timestamps = [value.get("timestamp") for value in last_values.values()]
+        if (since is not None and not period_values.get(tci_code)
+                and not any(delta.is_newer(timestamp, since) for timestamp in last_timestamps)):
+            continue
+        timestamps.extend(last_timestamps)
         assets_info[asset.id] = {
             "asset_id": asset.id,
             "asset_type": asset.type_code,
@@ -140,6 +141,7 @@ def get_subst_assets(subst_id: int, lang: str):
     result["assets"] = sorted(
         assets_info.values(),
         key=lambda x: (x.get("asset_type", ""), x.get("name", "")))
+    result["watermark"] = delta.get_watermark(timestamps, since)
     return result, res_status
 
 
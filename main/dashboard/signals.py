@@ -0,0 +1,38 @@
+from django.db.models.signals import post_save, post_delete
+
+from dashboard.models import (SignalsGuide, SignalsGuideFront, SignalsChartTabs,
+                              MeasureUnits, SignalСategories, DynamicStorages,
+                              SignalTypes, ChartTabs, AssetsTypeChartTabs,
+                              Assets, AssetsType, Substations)
+from dashboard.services.commons.assets_registry import AssetsRegistry
+from dashboard.services.commons.signals_registry import SignalsRegistry
+
+
+# Модели, изменение которых требует перезагрузки справочника сигналов
+SIGNALS_REGISTRY_MODELS = (SignalsGuide, SignalsGuideFront, SignalsChartTabs,
+                           MeasureUnits, SignalСategories, DynamicStorages,
+                           SignalTypes, ChartTabs, AssetsTypeChartTabs)
+# Модели, изменение которых требует перезагрузки справочника активов
+ASSETS_REGISTRY_MODELS = (Assets, AssetsType, Substations)
+
+
+def invalidate_signals_registry(sender, **kwargs):
+    SignalsRegistry.invalidate()
+
+
+def invalidate_assets_registry(sender, **kwargs):
+    AssetsRegistry.invalidate()
+
+
+def connect_signals():
+    """Подключить обработчики сигналов сохранения/удаления моделей"""
+    for model in SIGNALS_REGISTRY_MODELS:
+        post_save.connect(invalidate_signals_registry, sender=model,
+                          dispatch_uid=f"signals_registry_save_{model.__name__}")
+        post_delete.connect(invalidate_signals_registry, sender=model,
+                            dispatch_uid=f"signals_registry_delete_{model.__name__}")
+    for model in ASSETS_REGISTRY_MODELS:
+        post_save.connect(invalidate_assets_registry, sender=model,
+                          dispatch_uid=f"assets_registry_save_{model.__name__}")
+        post_delete.connect(invalidate_assets_registry, sender=model,
+                            dispatch_uid=f"assets_registry_delete_{model.__name__}")
@@ -0,0 +1,62 @@
+from array import array
+
+from django.test import SimpleTestCase
+
+from dashboard.services.commons.series import SignalSeries
+from dashboard.services.meterings.alignment import align_by_codes, merge_join
+
+
+def _series(signal: str, points: list[tuple[int, float]]):
+    return SignalSeries(signal, array("q", (ts for ts, _ in points)), array("d", (value for _, value in points)))
+
+
+class MergeJoinTest(SimpleTestCase):
+    def test_exact(self):
+        first = _series("a", [(1, 1.0), (2, 2.0), (4, 4.0), (5, 5.0)])
+        second = _series("b", [(2, 20.0), (3, 30.0), (5, 50.0)])
+        self.assertEqual(merge_join([first, second]), ([2, 5], [[2.0, 5.0], [20.0, 50.0]]))
+
+    def test_exact_duplicates_take_last_value(self):
+        first = _series("a", [(1, 1.0), (2, 2.0), (2, 2.5)])
+        second = _series("b", [(2, 20.0), (1, 10.0)])
+        self.assertEqual(merge_join([first, second]), ([1, 2], [[1.0, 2.5], [10.0, 20.0]]))
+
+    def test_tolerance(self):
+        first = _series("a", [(100, 1.0), (200, 2.0), (300, 3.0)])
+        second = _series("b", [(103, 10.0), (195, 20.0), (330, 30.0)])
+        self.assertEqual(merge_join([first, second], 5), ([100, 200], [[1.0, 2.0], [10.0, 20.0]]))
+        self.assertEqual(merge_join([first, second], 30),
+                         ([100, 200, 300], [[1.0, 2.0, 3.0], [10.0, 20.0, 30.0]]))
+
+    def test_tolerance_uses_each_point_once(self):
+        first = _series("a", [(100, 1.0), (101, 1.1), (102, 1.2)])
+        second = _series("b", [(100, 10.0)])
+        self.assertEqual(merge_join([first, second], 5), ([100], [[1.0], [10.0]]))
+
+    def test_tolerance_duplicates_take_last_value(self):
+        first = _series("a", [(100, 1.0), (100, 1.5), (200, 2.0)])
+        second = _series("b", [(101, 10.0), (201, 20.0), (201, 25.0)])
+        self.assertEqual(merge_join([first, second], 2), ([100, 200], [[1.5, 2.0], [10.0, 25.0]]))
+
+    def test_tolerance_unsorted_input(self):
+        first = _series("a", [(300, 3.0), (100, 1.0), (200, 2.0)])
+        second = _series("b", [(201, 20.0), (99, 10.0)])
+        self.assertEqual(merge_join([first, second], 2), ([100, 200], [[1.0, 2.0], [10.0, 20.0]]))
+
+    def test_three_series(self):
+        first = _series("a", [(10, 1.0), (20, 2.0), (30, 3.0)])
+        second = _series("b", [(11, 10.0), (30, 30.0)])
+        third = _series("c", [(10, 100.0), (21, 200.0), (31, 300.0)])
+        self.assertEqual(merge_join([first, second, third], 1),
+                         ([10, 30], [[1.0, 3.0], [10.0, 30.0], [100.0, 300.0]]))
+
+    def test_empty(self):
+        self.assertEqual(merge_join([]), ([], []))
+        first = _series("a", [(1, 1.0)])
+        self.assertEqual(merge_join([first, SignalSeries("b")], 5), ([], [[], []]))
+
+    def test_align_by_codes(self):
+        first = _series("a", [(1, 1.0), (2, 2.0)])
+        second = _series("b", [(2, 20.0)])
+        self.assertEqual(align_by_codes(["b", "a"], [first, second]), ([2], [[20.0], [2.0]]))
+        self.assertEqual(align_by_codes(["a", "c"], [first, second]), ([], [[], []]))
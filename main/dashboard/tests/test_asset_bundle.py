@@ -0,0 +1,54 @@
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from dashboard.services.asset_bundle import use_cases
+from dashboard.services.asset_bundle.use_cases import SECTIONS, _parse_sections, get_asset_bundle
+from dashboard.services.commons.meterings_manager import MeteringsManager
+
+
+class ParseSectionsTest(SimpleTestCase):
+    def test_parse_sections(self):
+        self.assertEqual(_parse_sections(None), list(SECTIONS))
+        self.assertEqual(_parse_sections(""), list(SECTIONS))
+        with self.assertLogs(use_cases.logger, "ERROR"):
+            self.assertEqual(_parse_sections(" tabs,rdTable,unknown,,tabs"), ["tabs", "rdTable"])
+
+
+class AssetBundleTest(SimpleTestCase):
+    def setUp(self):
+        self.asset = mock.Mock(id=1, guid="guid")
+        for target, name, kwargs in (
+                (use_cases.AssetsManager, "get_by_id", {"return_value": self.asset}),
+                (MeteringsManager, "get_last_meterings", {"return_value": ([], True)}),
+                (use_cases.meter_use_cases, "get_rd_table", {"return_value": ({"rd": 1}, True)}),
+                (use_cases.meter_use_cases, "get_forecast_3d", {"side_effect": RuntimeError("ошибка")}),
+                (use_cases.subst_use_cases, "get_asset_type_tabs", {"return_value": ["main"]})):
+            patcher = mock.patch.object(target, name, **kwargs)
+            setattr(self, name, patcher.start())
+            self.addCleanup(patcher.stop)
+
+    def test_asset_not_found(self):
+        self.get_by_id.return_value = None
+        self.assertEqual(get_asset_bundle(99, None, {}, "ru"), ({}, False))
+
+    def test_section_status(self):
+        with self.assertLogs(use_cases.logger, "ERROR"):
+            result, status = get_asset_bundle(1, "rdTable,3dforecast,tabs", {}, "ru")
+        self.assertTrue(status)
+        # ошибка одного раздела не влияет на остальные разделы
+        self.assertEqual(result, {"rdTable": ({"rd": 1}, True), "3dforecast": ({}, False), "tabs": (["main"], True)})
+        self.get_rd_table.assert_called_once_with(self.asset, lang="ru")
+
+    def test_last_values_are_requested_once(self):
+        get_asset_bundle(1, "rdTable,tabs", {}, "ru")
+        self.get_last_meterings.assert_called_once_with(self.asset, {use_cases.meter_use_cases.RD_TABLE_KEY})
+        self.get_last_meterings.reset_mock()
+        get_asset_bundle(1, "tabs", {}, "ru")
+        self.get_last_meterings.assert_not_called()
+
+    def test_charts_without_tab(self):
+        with self.assertLogs(use_cases.logger, "ERROR"):
+            result, status = get_asset_bundle(1, "charts,tabs", {}, "ru")
+        self.assertTrue(status)
+        self.assertEqual(result, {"tabs": (["main"], True)})
@@ -0,0 +1,49 @@
+import threading
+
+from django.test import SimpleTestCase
+
+from dashboard.utils.async_func import run_concurrently
+
+
+def _wait(barrier: threading.Barrier, value):
+    """Вызовы завершаются, только если выполняются одновременно"""
+    barrier.wait(timeout=5)
+    return value
+
+
+def _nested(value):
+    barrier = threading.Barrier(2)
+    return run_concurrently(((_wait, {"barrier": barrier, "value": value}),
+                             (_wait, {"barrier": barrier, "value": value + 1})))
+
+
+def _sequential(value):
+    return run_concurrently(((round, {"number": value}), (round, {"number": value + 1})))
+
+
+def _deep(value):
+    return run_concurrently(((_sequential, {"value": value}), (_sequential, {"value": value + 10})))
+
+
+class RunConcurrentlyTest(SimpleTestCase):
+    def test_results_in_call_order(self):
+        barrier = threading.Barrier(3)
+        self.assertEqual(run_concurrently((_wait, {"barrier": barrier, "value": i}) for i in range(3)), [0, 1, 2])
+        self.assertEqual(run_concurrently([]), [])
+
+    def test_exception_is_raised(self):
+        def fail():
+            raise ValueError("ошибка")
+
+        with self.assertRaises(ValueError):
+            run_concurrently(((fail, {}), (dict, {})))
+
+    def test_nested_calls_are_concurrent(self):
+        # вызовы из потоков пула (разделы страницы актива) выполняются параллельно в пуле вложенных вызовов
+        self.assertEqual(run_concurrently(((_nested, {"value": 0}), (_nested, {"value": 10}))),
+                         [[0, 1], [10, 11]])
+
+    def test_deep_nesting_does_not_block(self):
+        # на третьем уровне вызовы выполняются последовательно
+        calls = [(_deep, {"value": i}) for i in range(20)]
+        self.assertEqual(run_concurrently(calls), [[[i, i + 1], [i + 10, i + 11]] for i in range(20)])
@@ -0,0 +1,40 @@
+import threading
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from dashboard.services.commons.meterings_manager import AssetDesc, MeteringsManager
+from dashboard.services.meterings import use_cases
+from dashboard.services.meterings.use_cases import ChartsSignals
+
+
+class ChartsQueriesTest(SimpleTestCase):
+    def get_meterings_for_charts(self, period_status: bool, off_period_status: bool, last_status: bool):
+        # запросы завершаются, только если выполняются одновременно
+        barrier = threading.Barrier(3)
+
+        def get_last(asset, codes):
+            barrier.wait(timeout=5)
+            return {}, last_status
+
+        def get_meterings(asset_id, code_by_sources, date_start, date_end, is_reduced, since):
+            barrier.wait(timeout=5)
+            return [["a" if is_reduced else "off", 1.0, 2.0]], period_status if is_reduced else off_period_status
+
+        charts = ChartsSignals([], [], [], [], [], set())
+        with mock.patch.object(MeteringsManager, "get_last_meterings_by_codes_sync", get_last), \
+                mock.patch.object(MeteringsManager, "get_meterings", get_meterings), \
+                mock.patch.object(use_cases.formatters, "to_charts_page", return_value={}) as to_charts_page:
+            _, status = use_cases.get_meterings_for_charts(
+                mock.Mock(spec=AssetDesc), None, None, "", None, "ru", charts=charts)
+        return to_charts_page.call_args.args[2], status
+
+    def test_queries_run_concurrently(self):
+        data_for_period, status = self.get_meterings_for_charts(True, True, True)
+        self.assertEqual(data_for_period, [["a", 1.0, 2.0], ["off", 1.0, 2.0]])
+        self.assertTrue(status)
+
+    def test_status(self):
+        self.assertTrue(self.get_meterings_for_charts(False, True, False)[1])
+        self.assertTrue(self.get_meterings_for_charts(False, False, True)[1])
+        self.assertFalse(self.get_meterings_for_charts(False, False, False)[1])
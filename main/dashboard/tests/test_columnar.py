@@ -0,0 +1,72 @@
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+from django.test import SimpleTestCase
+
+from dashboard.services.meterings import columnar, formatters
+from dashboard.utils import time_func
+from dashboard.utils.number import Numeric
+from main.settings import ROUND_NDIGIT
+
+
+TZ = ZoneInfo("Europe/Berlin")
+
+
+def _local(timestamp, tz=TZ):
+    return datetime.fromtimestamp(timestamp, tz).replace(tzinfo=None)
+
+
+class LocalDatetimesTest(SimpleTestCase):
+    def test_same_as_fromtimestamp_around_dst(self):
+        # переводы часов 2024-03-31 и 2024-10-27 по Берлину
+        for start in (datetime(2024, 3, 31, tzinfo=TZ), datetime(2024, 10, 27, tzinfo=TZ)):
+            timestamps = [start.timestamp() + 600*i + 0.25 for i in range(30)]
+            errors = {}
+            self.assertEqual(columnar.local_datetimes(timestamps, errors, TZ), list(map(_local, timestamps)))
+            self.assertEqual(errors, {})
+
+    def test_several_offsets(self):
+        start = datetime(2023, 1, 1, tzinfo=TZ).timestamp()
+        timestamps = [start + 7*3600*i for i in range(3000)]
+        self.assertEqual(columnar.local_datetimes(timestamps, {}, TZ), list(map(_local, timestamps)))
+
+    def test_invalid_elements(self):
+        errors = {}
+        result = columnar.local_datetimes([1700000000, "x", None, float("inf")], errors, TZ)
+        self.assertEqual(result[0], _local(1700000000))
+        self.assertEqual(result[1:], [columnar.INVALID] * 3)
+        self.assertEqual(sum(errors.values()), 3)
+        self.assertEqual(columnar.local_datetimes([], {}, TZ), [])
+
+
+class ColumnsTest(SimpleTestCase):
+    def test_split_columns(self):
+        errors = {}
+        self.assertEqual(columnar.split_columns([["a", 1, 2.0], ("b", 3, 4.0, "extra")], 3, errors),
+                         [("a", "b"), (1, 3), (2.0, 4.0)])
+        self.assertEqual(columnar.split_columns([["a", 1, 2.0], ["b"], None], 3, errors),
+                         [("a",), (1,), (2.0,)])
+        self.assertEqual(sum(errors.values()), 2)
+        self.assertEqual(columnar.split_columns([], 2, {}), [(), ()])
+
+    def test_iter_runs(self):
+        self.assertEqual(list(columnar.iter_runs(("a", "a", "b", "a"))), [("a", 0, 2), ("b", 2, 3), ("a", 3, 4)])
+
+    def test_round_values(self):
+        for values in ([1.23456, -2.5, 1e-9], [1.23456, "2.345678", None, 3]):
+            with self.subTest(values=values):
+                self.assertEqual(columnar.round_values(values),
+                                 [Numeric.round_float(value, ROUND_NDIGIT) for value in values])
+
+
+class MeteringsByCodesTest(SimpleTestCase):
+    def test_same_as_per_sample(self):
+        meterings = [["a", 1700000000 + i, 1.0 / (i + 1)] for i in range(5)]
+        meterings += [["b", 1700000000, "7.123456"], ["a", 1700000100, 2.0], ["c", "bad", 1.0]]
+        expected = {}
+        for code, timestamp, value in meterings[:-1]:
+            expected.setdefault(code, []).append([_local(timestamp, time_func.get_tz()),
+                                                  Numeric.round_float(value, ROUND_NDIGIT)])
+        with self.assertLogs(formatters.logger, "ERROR"):
+            result = formatters.get_meterings_by_codes(meterings)
+        self.assertEqual(result, expected)
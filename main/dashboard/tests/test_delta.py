@@ -0,0 +1,75 @@
+from array import array
+from types import SimpleNamespace
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from dashboard.services.commons.meterings_manager import MeteringsManager
+from dashboard.services.commons.series import SignalSeries
+from dashboard.services.meterings import delta, use_cases
+
+
+LOOKBACK = 60
+
+
+@mock.patch.object(delta, "DELTA_LOOKBACK", LOOKBACK)
+class DeltaTest(SimpleTestCase):
+    def test_parse_since(self):
+        self.assertEqual(delta.parse_since("1700000000500"), 1700000000.5)
+        for value in (None, "", "abc", "-1", "1.5"):
+            self.assertIsNone(delta.parse_since(value), value)
+
+    def test_watermark(self):
+        self.assertEqual(delta.get_watermark([10, "20.5", None, "x"]), 20500)
+        self.assertEqual(delta.get_watermark([], 30), 30000)
+        # повторно переданные значения в пределах запаса не сдвигают watermark назад
+        self.assertEqual(delta.get_watermark([70, 90], 100), 100000)
+        self.assertIsNone(delta.get_watermark([]))
+
+    def test_lookback(self):
+        self.assertIsNone(delta.get_threshold(None))
+        self.assertEqual(delta.get_threshold(100), 100 - LOOKBACK)
+        self.assertTrue(delta.is_newer(150, 100))
+        self.assertTrue(delta.is_newer(100 - LOOKBACK + 1, 100))
+        self.assertFalse(delta.is_newer(100 - LOOKBACK, 100))
+        self.assertFalse(delta.is_newer(None, 100))
+        self.assertTrue(delta.is_newer(None, None))
+
+    def test_lagging_signal_in_last_values_delta(self):
+        page = SimpleNamespace(
+            added_signals=[], period_signals=[], last_signals=[], dictionary_sgns=[], constants_sgns=[],
+            pasp_sgns=[], pasp_manager=None, units={}, back_labels={},
+            block_manager=mock.Mock(**{"get_linked_codes.return_value": set(), "get_data_to_page.return_value": {}}))
+        # сигнал 'b' отстает от 'a': его обновление старше watermark предыдущего ответа
+        last_data = [["guid", "a", 1, 100.0], ["guid", "b", 2, 90.0], ["guid", "c", 3, 10.0]]
+        timestamps = MeteringsManager.get_last_meterings_timestamp_by_codes(last_data)
+        with mock.patch.object(use_cases.formatters, "get_additional_formatted_data_to_last_values_page",
+                               return_value={}), \
+                mock.patch.object(use_cases.formatters, "get_passport_data_to_last_values_page", return_value={}):
+            result, _ = use_cases._get_last_values_delta(mock.Mock(), page, last_data, timestamps, 100.0)
+        self.assertEqual(page.block_manager.get_data_to_page.call_args.kwargs["codes"], {"a", "b"})
+        self.assertEqual(result["watermark"], 100000)
+
+
+@mock.patch.object(delta, "DELTA_LOOKBACK", LOOKBACK)
+class MeteringsSinceTest(SimpleTestCase):
+    def get(self, since: float | None):
+        calls = []
+
+        def get_range_series(asset, code_by_sources, period, date_start, date_end):
+            calls.append(date_start)
+            timestamps = [ts for ts in range(0, 1000, 60) if date_start <= ts <= date_end]
+            return [SignalSeries("a", array("q", timestamps), array("d", timestamps))], True
+
+        with mock.patch.object(MeteringsManager, "_get_range_series", get_range_series):
+            series, status = MeteringsManager.get_meterings_columnar(
+                SimpleNamespace(guid="guid"), {"": ["a"]}, 0, 960, since=delta.get_threshold(since))
+        self.assertTrue(status)
+        return calls, list(series[0].timestamps) if series else []
+
+    def test_points_within_lookback_are_returned_again(self):
+        calls, timestamps = self.get(600)
+        self.assertEqual(calls, [600 - LOOKBACK])
+        self.assertEqual(timestamps, [600, 660, 720, 780, 840, 900, 960])
+        self.assertEqual(self.get(None)[1], list(range(0, 1000, 60)))
+        self.assertEqual(self.get(2000), ([], []))
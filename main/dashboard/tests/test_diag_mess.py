@@ -0,0 +1,182 @@
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from dashboard.services.diag_mess.diag_config import CursorConfig
+from dashboard.services.diag_mess.msg_cache import DiagMsgCache, to_rfc3339
+from dashboard.utils.time_func import normalize_date
+
+
+BUCKET = 100
+CLOSED_LAG = 10
+ASSET = "guid"
+FILTER = "group:diag"
+TAIL_KEY = (ASSET, FILTER, None)
+
+
+class _Storage:
+    """Хранилище записей сообщений с временем в секундах"""
+    def __init__(self):
+        self.records = []
+        self.queries = []
+
+    def add(self, *timestamps: float):
+        for timestamp in timestamps:
+            self.records.append({"_time": to_rfc3339(timestamp), "id": len(self.records)})
+
+    def __call__(self, start: float, end: float, after: float | None):
+        self.queries.append((start, end, after))
+        return [dict(record) for record in self.records
+                if start <= self._ts(record) <= end and (after is None or self._ts(record) > after)]
+
+    @staticmethod
+    def _ts(record: dict):
+        return normalize_date(record["_time"]).timestamp()
+
+    def expected(self, start: float, end: float):
+        return sorted((record["id"] for record in self.records if start <= self._ts(record) <= end),
+                      key=lambda id: self._ts(self.records[id]))
+
+
+class DiagMsgCacheTest(SimpleTestCase):
+    def setUp(self):
+        self.cache = DiagMsgCache(max_bytes=10**6, bucket=BUCKET, closed_lag=CLOSED_LAG)
+        self.storage = _Storage()
+        self.now = 1000
+
+    def get(self, start: float, end: float | None = None):
+        end = self.now if end is None else end
+        with mock.patch("dashboard.services.diag_mess.msg_cache.time", lambda: self.now):
+            records = self.cache.get_records(
+                ASSET, FILTER, normalize_date(to_rfc3339(start)), normalize_date(to_rfc3339(end)), self.storage)
+        self.assertEqual([record["id"] for record in records], self.storage.expected(start, end))
+        return records
+
+    def test_closed_buckets_are_queried_once(self):
+        self.storage.add(610, 700, 750, 799.5, 800, 880)
+        self.get(650, 890)
+        self.storage.queries.clear()
+        self.get(600, 899.5)
+        self.get(700, 800)
+        self.assertEqual(self.storage.queries, [])
+
+    def test_tail_is_refreshed_from_high_water_mark(self):
+        self.storage.add(905, 950)
+        self.get(850)
+        self.storage.add(960, 1010)
+        # запаздывающая запись в пределах CLOSED_LAG от последней полученной
+        self.storage.add(945)
+        self.now = 1020
+        self.storage.queries.clear()
+        self.get(850)
+        self.assertEqual(self.storage.queries, [(940, 1020, 940)])
+        self.assertEqual(self.cache.get_stats()["tail_hits"], 1)
+
+    def test_tail_rollover_to_buckets(self):
+        self.storage.add(850, 905, 950, 995)
+        self.get(850)
+        self.assertEqual(self.cache._parts[TAIL_KEY].start, 900)
+
+        self.storage.add(1020, 1090, 1110)
+        self.now = 1125
+        self.storage.queries.clear()
+        self.get(850)
+        # закрытые отрезки хвоста не запрашиваются повторно, а переносятся в кеш отрезков
+        self.assertEqual(self.storage.queries, [(985, 1125, 985)])
+        self.assertEqual(self.cache._parts[TAIL_KEY].start, 1100)
+        self.assertIn((ASSET, FILTER, 900), self.cache._parts)
+        self.assertIn((ASSET, FILTER, 1000), self.cache._parts)
+
+        self.storage.add(1120)
+        self.now = 1130
+        self.storage.queries.clear()
+        self.get(850)
+        self.assertEqual(len(self.storage.queries), 1)
+        self.assertIsNotNone(self.storage.queries[0][2])
+
+    def test_unaligned_tail_rollover(self):
+        self.storage.add(905, 960, 990, 1050, 1099, 1110)
+        self.get(950)
+        self.assertEqual(self.cache._parts[TAIL_KEY].start, 950)
+
+        self.storage.add(1120)
+        self.now = 1125
+        # отрезок с началом хвоста закрылся: он запрашивается целиком, часть хвоста не дублируется
+        self.get(850)
+        self.assertEqual(self.cache._parts[TAIL_KEY].start, 1100)
+        self.assertIn((ASSET, FILTER, 900), self.cache._parts)
+        self.assertIn((ASSET, FILTER, 1000), self.cache._parts)
+        self.storage.queries.clear()
+        self.get(850)
+        # закрытые отрезки берутся из кеша, запрашивается только хвост
+        self.assertEqual(len(self.storage.queries), 1)
+
+    def test_bucket_boundary_records(self):
+        self.storage.add(800, 900, 1000)
+        self.now = 1200
+        self.get(800, 1000)
+        self.get(900, 900)
+        self.get(850, 1000)
+
+    def test_eviction(self):
+        cache = DiagMsgCache(max_bytes=20000, bucket=BUCKET, closed_lag=CLOSED_LAG)
+        self.storage.add(*range(0, 2000, 7))
+        with mock.patch("dashboard.services.diag_mess.msg_cache.time", lambda: self.now):
+            cache.get_records(ASSET, FILTER, normalize_date(to_rfc3339(0)),
+                              normalize_date(to_rfc3339(self.now)), self.storage)
+        stats = cache.get_stats()
+        self.assertGreater(stats["evicted"], 0)
+        self.assertLessEqual(stats["bytes"], 20000)
+
+
+class CursorConfigTest(SimpleTestCase):
+    def setUp(self):
+        times = ["2025-01-01T00:00:0%dZ" % second for second in (5, 5, 5, 5, 5, 4, 3, 3, 3, 2, 1, 1)]
+        # порядок ленты: время по убыванию, затем постоянный порядок записей с одинаковым временем
+        self.records = [{"_time": time, "id": i} for i, time in enumerate(times)]
+
+    def query(self, config: CursorConfig):
+        """Выборка ленты по курсору: записи не новее 'before' со смещением 'skip', на одну больше limit"""
+        before = config.get_before()
+        records = [record for record in self.records if before is None or record["_time"] <= before]
+        return records[config.get_skip():config.get_skip() + config.get_limit() + 1]
+
+    def read_all(self, limit: int):
+        result = []
+        cursor = None
+        for _ in range(len(self.records) + 1):
+            config = CursorConfig(limit=limit, cursor=cursor)
+            records = self.query(config)
+            result.extend(records[:config.get_limit()])
+            if (cursor := config.get_next_cursor(records)) is None:
+                return result
+        self.fail("Пагинация не завершилась")
+
+    def test_ties_across_pages(self):
+        for limit in range(1, len(self.records) + 2):
+            self.assertEqual([record["id"] for record in self.read_all(limit)],
+                             [record["id"] for record in self.records], f"limit={limit}")
+
+    def test_skip_accumulates_within_same_time(self):
+        config = CursorConfig(limit=2)
+        cursor = config.get_next_cursor(self.query(config))
+        config = CursorConfig(limit=2, cursor=cursor)
+        self.assertEqual((config.get_before(), config.get_skip()), ("2025-01-01T00:00:05Z", 2))
+        cursor = config.get_next_cursor(self.query(config))
+        config = CursorConfig(limit=2, cursor=cursor)
+        self.assertEqual((config.get_before(), config.get_skip()), ("2025-01-01T00:00:05Z", 4))
+
+    def test_last_page(self):
+        config = CursorConfig(limit=len(self.records))
+        self.assertIsNone(config.get_next_cursor(self.query(config)))
+
+    def test_limit(self):
+        self.assertEqual(CursorConfig().get_limit(), 100)
+        self.assertEqual(CursorConfig(limit="0").get_limit(), 100)
+        self.assertEqual(CursorConfig(limit="abc").get_limit(), 100)
+        self.assertEqual(CursorConfig(limit="5000").get_limit(), 1000)
+
+    def test_invalid_cursor(self):
+        for cursor in ("bad", "MjAyNSwx", "MjAyNS0wMS0wMVQwMDowMDowNVosLTE="):
+            with self.assertRaises(ValueError):
+                CursorConfig(cursor=cursor)
@@ -0,0 +1,167 @@
+import random
+from array import array
+
+from django.test import SimpleTestCase
+
+from dashboard.services.commons.series import SignalSeries
+from dashboard.services.meterings.downsampling import (
+    LTTB, M4, Downsampling, lttb_indices, m4_indices)
+from dashboard.services.commons.meterings_manager import MeteringsManager
+from main.settings import (
+    DOWNSAMPLING_MAX_POINTS, DOWNSAMPLING_OVERSAMPLING, RANGE_CACHE_CHUNK_POINTS, VM_MAX_POINTS_PER_SERIES)
+
+
+def _brute_force_lttb(xs, ys, threshold):
+    """LTTB по определению: площадь треугольника для каждой точки корзины"""
+    count = len(xs)
+    every = (count - 2) / (threshold - 2)
+    selected = [0]
+    a = 0
+    for i in range(threshold - 2):
+        avg_start = int((i + 1)*every) + 1
+        avg_end = min(int((i + 2)*every) + 1, count)
+        avg_x = sum(xs[avg_start:avg_end]) / (avg_end - avg_start)
+        avg_y = sum(ys[avg_start:avg_end]) / (avg_end - avg_start)
+        best, best_area = None, -1
+        for j in range(int(i*every) + 1, int((i + 1)*every) + 1):
+            area = abs((xs[a] - avg_x)*(ys[j] - ys[a]) - (xs[a] - xs[j])*(avg_y - ys[a]))
+            if area > best_area:
+                best, best_area = j, area
+        selected.append(best)
+        a = best
+    selected.append(count - 1)
+    return selected
+
+
+class LttbTest(SimpleTestCase):
+    def setUp(self):
+        rnd = random.Random(12)
+        self.xs = list(range(0, 1000, 10))
+        self.ys = [rnd.uniform(-50, 50) for _ in self.xs]
+
+    def test_keeps_endpoints_and_count(self):
+        for threshold in (3, 10, 57, 99):
+            indices = lttb_indices(self.xs, self.ys, threshold)
+            self.assertEqual(len(indices), threshold)
+            self.assertEqual(indices[0], 0)
+            self.assertEqual(indices[-1], len(self.xs) - 1)
+            self.assertEqual(indices, sorted(set(indices)))
+
+    def test_bucket_selection(self):
+        for threshold in (3, 10, 57, 99):
+            self.assertEqual(lttb_indices(self.xs, self.ys, threshold),
+                             _brute_force_lttb(self.xs, self.ys, threshold))
+
+    def test_peak_is_selected(self):
+        ys = [0.0] * len(self.xs)
+        ys[42] = 1000.0
+        self.assertIn(42, lttb_indices(self.xs, ys, 10))
+
+    def test_small_thresholds(self):
+        count = len(self.xs)
+        self.assertEqual(lttb_indices(self.xs, self.ys, 2), [0, count - 1])
+        self.assertEqual(lttb_indices(self.xs, self.ys, 1), [count - 1])
+        self.assertEqual(lttb_indices(self.xs, self.ys, 0), list(range(count)))
+
+    def test_threshold_not_less_than_count(self):
+        count = len(self.xs)
+        self.assertEqual(lttb_indices(self.xs, self.ys, count), list(range(count)))
+        self.assertEqual(lttb_indices(self.xs, self.ys, count + 100), list(range(count)))
+        self.assertEqual(lttb_indices([], [], 10), [])
+
+
+class M4Test(SimpleTestCase):
+    def test_column_selection(self):
+        xs = list(range(100))
+        ys = [float((x * 37) % 101) for x in xs]
+        indices = m4_indices(xs, 5, 0, 100, ys)
+        self.assertEqual(indices, sorted(indices))
+        for column in range(5):
+            low, high = column*20, column*20 + 20
+            column_indices = [i for i in indices if low <= i < high]
+            expected = {low, high - 1,
+                        min(range(low, high), key=ys.__getitem__),
+                        max(range(low, high), key=ys.__getitem__)}
+            self.assertEqual(set(column_indices), expected)
+
+    def test_extremes_of_all_columns(self):
+        xs = list(range(50))
+        ys = [0.0] * 50
+        zs = [0.0] * 50
+        ys[7], zs[13] = 10.0, -10.0
+        indices = m4_indices(xs, 2, 0, 50, ys, zs)
+        self.assertIn(7, indices)
+        self.assertIn(13, indices)
+
+    def test_empty_columns_and_endpoints(self):
+        xs = [0, 1, 2, 3, 4, 95, 96, 97, 98, 99]
+        ys = [float(x) for x in xs]
+        indices = m4_indices(xs, 2, 0, 100, ys)
+        self.assertEqual(indices, [0, 4, 5, 9])
+        self.assertEqual(m4_indices(xs, 10, 0, 100, ys), list(range(len(xs))))
+        self.assertEqual(m4_indices(xs, 0, 0, 100, ys), list(range(len(xs))))
+
+    def test_points_outside_range_go_to_edge_columns(self):
+        xs = list(range(-10, 110))
+        ys = [float(x % 7) for x in xs]
+        indices = m4_indices(xs, 2, 0, 100, ys)
+        self.assertEqual(indices[0], xs.index(0))
+        self.assertEqual(indices[-1], len(xs) - 1)
+
+
+class DownsamplingTest(SimpleTestCase):
+    def test_not_requested(self):
+        self.assertIsNone(Downsampling.from_params(None, None, None))
+        self.assertIsNone(Downsampling.from_params("", "", None))
+        self.assertIsNone(Downsampling.from_params("0", None, None))
+        self.assertIsNone(Downsampling.from_params("-5", "0", None))
+        self.assertIsNone(Downsampling.from_params("abc", None, None))
+        self.assertIsNone(Downsampling.from_params("100", None, "unknown"))
+
+    def test_default_mode(self):
+        self.assertEqual(Downsampling.from_params("100", None, None), Downsampling(LTTB, 100))
+        self.assertEqual(Downsampling.from_params(None, "800", None), Downsampling(M4, 800))
+        self.assertEqual(Downsampling.from_params("100", "800", None), Downsampling(M4, 800))
+
+    def test_explicit_mode(self):
+        self.assertEqual(Downsampling.from_params("100", "800", LTTB), Downsampling(LTTB, 100))
+        self.assertEqual(Downsampling.from_params("400", None, M4), Downsampling(M4, 100))
+        self.assertEqual(Downsampling.from_params(None, "800", LTTB), Downsampling(LTTB, 800))
+
+    def test_small_sizes(self):
+        self.assertEqual(Downsampling.from_params("1", None, None), Downsampling(LTTB, 1))
+        self.assertEqual(Downsampling.from_params("2", None, None), Downsampling(LTTB, 2))
+        self.assertEqual(Downsampling.from_params("2", None, M4), Downsampling(M4, 1))
+        self.assertEqual(Downsampling.from_params(None, "1", None), Downsampling(M4, 1))
+
+    def test_limits(self):
+        self.assertEqual(Downsampling.from_params(str(DOWNSAMPLING_MAX_POINTS * 10), None, None),
+                         Downsampling(LTTB, DOWNSAMPLING_MAX_POINTS))
+        self.assertEqual(Downsampling.from_params(None, str(DOWNSAMPLING_MAX_POINTS), None),
+                         Downsampling(M4, DOWNSAMPLING_MAX_POINTS // 4))
+
+    def test_apply(self):
+        series = SignalSeries("sgn", array("q", range(0, 1000, 10)), array("d", (x % 13 for x in range(100))))
+        for size in ("1", "2", "3", "50"):
+            reduced = Downsampling.from_params(size, None, None).apply(series, 0, 1000)
+            self.assertEqual(len(reduced), int(size))
+            self.assertEqual(reduced.timestamps[-1], series.timestamps[-1])
+        self.assertIs(Downsampling.from_params("1000", None, None).apply(series, 0, 1000), series)
+        reduced = Downsampling.from_params(None, "5", None).apply(series, 0, 1000)
+        self.assertLessEqual(len(reduced), 20)
+        self.assertEqual(reduced.timestamps[0], 0)
+        self.assertEqual(reduced.timestamps[-1], 990)
+
+    def test_fetch_points_within_vm_limit(self):
+        date_end = 1_700_000_000
+        for mode, size in ((LTTB, str(DOWNSAMPLING_MAX_POINTS)), (M4, str(DOWNSAMPLING_MAX_POINTS))):
+            downsampling = Downsampling.from_params(size, None, mode)
+            self.assertLess(downsampling.fetch_points, VM_MAX_POINTS_PER_SERIES)
+            for days in (1, 7, 30, 365):
+                date_start = date_end - days*86400
+                period = MeteringsManager._snap_period((date_end - date_start)/downsampling.fetch_points)
+                start, end = MeteringsManager._align_range(date_start, date_end, period)
+                # запрос по отрезкам кеша расширяется не более чем на отрезок с каждой стороны
+                points = (end - start)//period + 1 + 2*RANGE_CACHE_CHUNK_POINTS
+                self.assertLessEqual(points, VM_MAX_POINTS_PER_SERIES, (mode, days))
+        self.assertEqual(Downsampling.from_params("10", None, LTTB).fetch_points, 10*DOWNSAMPLING_OVERSAMPLING)
@@ -0,0 +1,69 @@
+from unittest import mock
+
+import requests
+from django.test import SimpleTestCase
+
+from dashboard.utils import http_client
+from dashboard.utils.http_client import HttpClient
+
+
+def _response(status_code: int):
+    response = mock.Mock(spec=requests.Response)
+    response.status_code = status_code
+    return response
+
+
+class HttpClientTest(SimpleTestCase):
+    def setUp(self):
+        self.client = HttpClient("http://vm:8428/", "VM", connect_timeout=1, read_timeout=2,
+                                 retries=3, backoff=0.5, pool_size=4)
+        self.session = mock.Mock()
+        patcher = mock.patch.object(self.client, "_get_session", return_value=self.session)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = mock.patch.object(http_client, "sleep")
+        self.sleep = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_success_without_retry(self):
+        self.session.request.return_value = _response(200)
+        response = self.client.get("/api/v1/query", params={"query": "up"})
+        self.assertEqual(response.status_code, 200)
+        self.session.request.assert_called_once_with(
+            "GET", "http://vm:8428/api/v1/query", params={"query": "up"}, timeout=(1, 2))
+        self.sleep.assert_not_called()
+
+    def test_retry_with_exponential_backoff(self):
+        self.session.request.side_effect = [
+            requests.ConnectionError("refused"), requests.Timeout("timeout"), _response(503), _response(200)]
+        response = self.client.get("/api/v1/query_range")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.session.request.call_count, 4)
+        self.assertEqual([c.args[0] for c in self.sleep.call_args_list], [0.5, 1.0, 2.0])
+        stats = self.client.get_stats()["/api/v1/query_range"]
+        self.assertEqual((stats["count"], stats["errors"]), (4, 3))
+
+    def test_retries_exhausted(self):
+        self.session.request.side_effect = requests.ConnectionError("refused")
+        with self.assertRaises(requests.ConnectionError):
+            self.client.get("/api/v1/query")
+        self.assertEqual(self.session.request.call_count, 4)
+        self.assertEqual(self.sleep.call_count, 3)
+
+    def test_last_retry_status_is_returned(self):
+        self.session.request.return_value = _response(502)
+        self.assertEqual(self.client.get("/api/v1/query").status_code, 502)
+        self.assertEqual(self.session.request.call_count, 4)
+
+    def test_client_errors_are_not_retried(self):
+        self.session.request.return_value = _response(400)
+        self.assertEqual(self.client.get("/api/v1/query", endpoint="query").status_code, 400)
+        self.session.request.assert_called_once()
+        self.assertEqual(self.client.get_stats()["query"]["errors"], 1)
+
+    def test_not_idempotent_request_is_not_retried(self):
+        self.session.request.side_effect = requests.ConnectionError("refused")
+        with self.assertRaises(requests.ConnectionError):
+            self.client.post("/insert", idempotent=False)
+        self.session.request.assert_called_once()
+        self.sleep.assert_not_called()
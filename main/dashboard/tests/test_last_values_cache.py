@@ -0,0 +1,141 @@
+import threading
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from dashboard.services.commons import last_values_cache
+from dashboard.services.commons.last_values_cache import FULL_LOOKBACK, LastValuesCache
+
+
+class _Storage:
+    """Хранилище последних значений: запросы записываются, значения задаются в 'values'"""
+    def __init__(self, values: dict):
+        self.values = values
+        self.calls = []
+        self.status = True
+
+    def query(self, keys, lookback):
+        self.calls.append((sorted(keys), lookback))
+        return [[guid, code, self.values[guid, code], 100] for guid, code in keys
+                if (guid, code) in self.values], self.status
+
+
+class LastValuesCacheTest(SimpleTestCase):
+    def setUp(self):
+        self.now = 1000.0
+        patcher = mock.patch.object(last_values_cache, "time", lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.storage = _Storage({("g", "a"): 1, ("g", "b"): 2})
+        self.cache = LastValuesCache(ttl=5, lookback_margin=30, full_sync_interval=3600)
+
+    def get(self, keys):
+        return self.cache.get_many(keys, self.storage.query)
+
+    def test_hit_within_ttl(self):
+        result, status = self.get([("g", "a"), ("g", "c")])
+        self.assertTrue(status)
+        self.assertEqual(result, {("g", "a"): ["g", "a", 1, 100], ("g", "c"): None})
+        self.now += 4
+        self.assertEqual(self.get([("g", "a"), ("g", "c")])[0], result)
+        self.assertEqual(len(self.storage.calls), 1)
+        self.assertEqual(self.cache.get_stats()["hits"], 2)
+
+    def test_partial_hit_queries_missing_keys(self):
+        self.get([("g", "a")])
+        result, _ = self.get([("g", "a"), ("g", "b")])
+        self.assertEqual(result[("g", "b")], ["g", "b", 2, 100])
+        self.assertEqual(self.storage.calls, [([("g", "a")], FULL_LOOKBACK), ([("g", "b")], FULL_LOOKBACK)])
+
+    def test_failed_query_is_not_cached(self):
+        self.storage.status = False
+        self.assertFalse(self.get([("g", "a")])[1])
+        self.storage.status = True
+        self.assertTrue(self.get([("g", "a")])[1])
+        self.assertEqual(len(self.storage.calls), 2)
+
+    def test_disabled(self):
+        cache = LastValuesCache(ttl=0)
+        for _ in range(2):
+            cache.get_many([("g", "a")], self.storage.query)
+        self.assertEqual(len(self.storage.calls), 2)
+
+    def get_while_querying(self, keys, in_flight_keys, in_flight_result):
+        """
+        Запросить 'keys', пока другой поток запрашивает 'in_flight_keys',
+        получая от хранилища 'in_flight_result'.
+        """
+        started, release = threading.Event(), threading.Event()
+
+        def slow_query(keys, lookback):
+            started.set()
+            release.wait(timeout=5)
+            return in_flight_result
+
+        thread = threading.Thread(target=self.cache.get_many, args=(in_flight_keys, slow_query))
+        thread.start()
+        self.assertTrue(started.wait(timeout=5))
+        results = []
+        waiter = threading.Thread(target=lambda: results.append(self.get(keys)))
+        waiter.start()
+        while not self.cache.get_stats()["coalesced"] and waiter.is_alive():
+            waiter.join(timeout=0.01)
+        release.set()
+        thread.join(timeout=5)
+        waiter.join(timeout=5)
+        return results[0]
+
+    def test_concurrent_requests_are_coalesced(self):
+        result = self.get_while_querying([("g", "a"), ("g", "b")], [("g", "a")], ([["g", "a", 1, 100]], True))
+        self.assertEqual(result, ({("g", "a"): ["g", "a", 1, 100], ("g", "b"): ["g", "b", 2, 100]}, True))
+        # ключ ('g', 'a') запрашивается только первым потоком
+        self.assertEqual(self.storage.calls, [([("g", "b")], FULL_LOOKBACK)])
+        self.assertEqual(self.cache.get_stats()["coalesced"], 1)
+
+    def test_waiter_queries_again_after_failure(self):
+        result = self.get_while_querying([("g", "a")], [("g", "a")], ([], False))
+        self.assertEqual(result, ({("g", "a"): ["g", "a", 1, 100]}, True))
+        self.assertEqual(self.storage.calls, [([("g", "a")], FULL_LOOKBACK)])
+
+
+class IncrementalSyncTest(SimpleTestCase):
+    def setUp(self):
+        self.now = 1000.0
+        patcher = mock.patch.object(last_values_cache, "time", lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.storage = _Storage({("g", "a"): 1})
+        self.cache = LastValuesCache(ttl=5, lookback_margin=30, full_sync_interval=3600)
+
+    def get(self, keys):
+        return self.cache.get_many(keys, self.storage.query)
+
+    def test_expired_values_are_synced_with_short_window(self):
+        self.get([("g", "a"), ("g", "b")])
+        self.now += 10
+        self.storage.values[("g", "a")] = 5
+        result, _ = self.get([("g", "a"), ("g", "b")])
+        self.assertEqual(result, {("g", "a"): ["g", "a", 5, 100], ("g", "b"): None})
+        # окно - от прошлой синхронизации с запасом lookback_margin
+        self.assertEqual(self.storage.calls[-1], ([("g", "a"), ("g", "b")], "40s"))
+
+    def test_known_value_is_kept_without_new_values(self):
+        self.get([("g", "a")])
+        self.now += 10
+        del self.storage.values[("g", "a")]
+        self.assertEqual(self.get([("g", "a")])[0], {("g", "a"): ["g", "a", 1, 100]})
+
+    def test_new_and_indexed_keys(self):
+        self.get([("g", "a")])
+        self.now += 10
+        self.storage.values[("g", "b")] = 2
+        result, _ = self.get([("g", "a"), ("g", "b")])
+        self.assertEqual(result[("g", "b")], ["g", "b", 2, 100])
+        self.assertEqual(sorted(self.storage.calls[1:]), [([("g", "a")], "40s"), ([("g", "b")], FULL_LOOKBACK)])
+
+    def test_full_sync_after_interval(self):
+        self.get([("g", "a")])
+        self.now += 3601
+        self.get([("g", "a")])
+        self.assertEqual(self.storage.calls[-1], ([("g", "a")], FULL_LOOKBACK))
+        self.assertEqual(self.cache.get_stats()["full_queries"], 2)
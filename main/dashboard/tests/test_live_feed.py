@@ -0,0 +1,82 @@
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from dashboard.services.commons.asset_desc import AssetDesc
+from dashboard.services.live_feed import feed
+from dashboard.services.live_feed.feed import DIAG_MSG_EVENT, VALUES_EVENT, LiveFeed, Subscription
+
+
+class _Loop:
+    """Цикл событий клиента: события передаются в очередь сразу"""
+    def call_soon_threadsafe(self, callback, *args):
+        callback(*args)
+
+
+def _events(subscription: Subscription):
+    events = []
+    while not subscription.queue.empty():
+        events.append(subscription.queue.get_nowait())
+    return events
+
+
+@mock.patch.object(feed.AssetsManager, "dict_by_guid", lambda assets: {})
+@mock.patch.object(feed.diagmsg_use_cases, "to_latest_messages",
+                   lambda records, assets, lang, use_template: [
+                       {"asset_id": 1, "message": record["message"]} for record in records])
+class LiveFeedPollTest(SimpleTestCase):
+    def setUp(self):
+        self.feed = LiveFeed(messages_limit=2)
+        self.subscription = Subscription([AssetDesc(id=1, guid="g1")], ["a", "b"], "ru", _Loop())
+        self.last_values = ([], True)
+        self.messages = []
+        self.since_queries = []
+
+    def get_by_assets_since(self, guids, since, count, offset, use_template):
+        self.since_queries.append((since, offset))
+        records = [record for record in self.messages if record["_time"] >= since]
+        return records[offset:offset + count], True
+
+    def poll(self):
+        latest = ([{"timestamp": 100.0}], True)
+        with mock.patch.object(feed.MeteringsManager, "get_last_meterings_by_keys", return_value=self.last_values), \
+                mock.patch.object(feed.diagmsg_use_cases, "get_latest_by_assets", return_value=latest), \
+                mock.patch.object(feed.diagmsg_use_cases, "get_by_assets_since", self.get_by_assets_since):
+            self.feed._poll([self.subscription])
+        return _events(self.subscription)
+
+    def test_values_are_pushed_once(self):
+        self.last_values = ([("g1", "a", 1, 10), ("g1", "b", 2, 10)], True)
+        events = self.poll()
+        self.assertEqual(events, [(VALUES_EVENT, {"assets": [
+            {"asset_id": 1, "values": {"a": {"value": 1, "timestamp": 10}, "b": {"value": 2, "timestamp": 10}}}]})])
+        self.assertEqual(self.poll(), [])
+        self.last_values = ([("g1", "a", 1, 10), ("g1", "b", 3, 20)], True)
+        self.assertEqual(self.poll(), [(VALUES_EVENT, {"assets": [
+            {"asset_id": 1, "values": {"b": {"value": 3, "timestamp": 20}}}]})])
+
+    def test_failed_query_keeps_snapshot(self):
+        self.last_values = ([("g1", "a", 1, 10), ("g1", "b", 2, 10)], True)
+        self.poll()
+        # значение 'b' не получено из-за ошибки запроса: оно не считается изменившимся
+        self.last_values = ([("g1", "a", 1, 10)], False)
+        self.assertEqual(self.poll(), [])
+        self.last_values = ([("g1", "a", 1, 10), ("g1", "b", 2, 10)], True)
+        self.assertEqual(self.poll(), [])
+        self.assertEqual(self.feed.get_stats()["errors"], 1)
+
+    def test_messages_are_paged_without_duplicates(self):
+        self.poll()
+        times = ["2025-01-01T00:00:01Z", "2025-01-01T00:00:02Z", "2025-01-01T00:00:02Z",
+                 "2025-01-01T00:00:02Z", "2025-01-01T00:00:03Z"]
+        self.messages = [{"asset": "g1", "_time": time, "timestamp": 1.0, "message": str(i)}
+                         for i, time in enumerate(times)]
+        self.feed._messages_since = times[0]
+        self.since_queries.clear()
+        events = self.poll()
+        self.assertEqual(events, [(DIAG_MSG_EVENT, {"diag_msg": [
+            {"asset_id": 1, "message": str(i)} for i in range(len(times))]})])
+        self.assertEqual([offset for _, offset in self.since_queries], [0, 2, 4])
+        # метка сдвигается на время последнего сообщения, повторно полученные сообщения пропускаются
+        self.messages.append({"asset": "g1", "_time": "2025-01-01T00:00:04Z", "timestamp": 1.0, "message": "5"})
+        self.assertEqual(self.poll(), [(DIAG_MSG_EVENT, {"diag_msg": [{"asset_id": 1, "message": "5"}]})])
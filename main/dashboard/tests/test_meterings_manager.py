@@ -0,0 +1,143 @@
+import json
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from dashboard.services.commons import meterings_manager
+from dashboard.services.commons.meterings_manager import MeteringsManager
+
+
+def _range_body(series: dict[tuple[str, str], list[tuple[int, float]]]) -> bytes:
+    """Ответ query_range с рядами max/tmax для точек (timestamp, value) по (asset, signal)"""
+    result = []
+    for (asset, signal), points in series.items():
+        for name, values in (("max", [str(value) for _, value in points]),
+                             ("tmax", [str(ts) for ts, _ in points])):
+            result.append({"metric": {"__name__": name, "asset": asset, "signal": signal},
+                           "values": [[ts, value] for (ts, _), value in zip(points, values)]})
+    return json.dumps({"status": "success", "data": {"resultType": "matrix", "result": result}}).encode()
+
+
+class MeteringsByAssetsTest(SimpleTestCase):
+    def query(self, intervals: dict, **kwargs):
+        points = [(ts, ts / 10) for ts in range(0, 3001, 500)]
+        body = _range_body({("g1", "s"): points, ("g2", "s"): points, ("g3", "s"): points})
+        with mock.patch.object(MeteringsManager, "_query_prometheus_range_raw", return_value=body) as query_range:
+            result = MeteringsManager.get_meterings_by_assets(intervals, {"": ["s"]}, **kwargs)
+        return result, query_range
+
+    def test_one_query_for_all_assets(self):
+        (meterings, status), query_range = self.query({"g1": (0, 1000), "g2": (1500, 2600)})
+        self.assertTrue(status)
+        query_range.assert_called_once()
+        query, start, end, step = query_range.call_args.args
+        self.assertIn('asset=~"g1|g2"', query)
+        self.assertEqual((start, end, step), (0, 2640, "60s"))
+        # значения каждого актива - в пределах его интервала, ряды других активов отбрасываются
+        self.assertEqual(meterings, {
+            "g1": [("s", 0, 0.0), ("s", 500, 50.0), ("s", 1000, 100.0)],
+            "g2": [("s", 1500, 150.0), ("s", 2000, 200.0), ("s", 2500, 250.0)],
+        })
+
+    def test_reduced_step_by_longest_interval(self):
+        _, query_range = self.query({"g1": (0, 1000), "g2": (0, 3000)}, is_reduced=True, count_points=10)
+        self.assertEqual(query_range.call_args.args[3], f"{MeteringsManager._snap_period(300)}s")
+
+    def test_since(self):
+        (meterings, _), query_range = self.query({"g1": (0, 1000), "g2": (1500, 2600)}, since=1000)
+        self.assertEqual(query_range.call_args.args[1], 1500)
+        self.assertEqual(meterings, {"g2": [("s", 1500, 150.0), ("s", 2000, 200.0), ("s", 2500, 250.0)]})
+
+    def test_empty(self):
+        self.assertEqual(MeteringsManager.get_meterings_by_assets({}, {"": ["s"]}), ({}, True))
+        self.assertEqual(MeteringsManager.get_meterings_by_assets({"g1": (0, 1)}, {}), ({}, True))
+
+
+class _VictoriaLogs:
+    """VictoriaLogs с сообщениями {message_id: строка ответа}, запросы записываются в 'queries'"""
+    def __init__(self, rows: dict, failed_ids: set = frozenset()):
+        self.rows = rows
+        self.failed_ids = failed_ids
+        self.queries = []
+
+    def post(self, path, data):
+        self.queries.append(data)
+        ids = data["query"].split("message_id:in(")[1].split(")")[0].split(",")
+        response = mock.Mock()
+        if self.failed_ids & set(ids):
+            response.raise_for_status.side_effect = Exception("503")
+        response.iter_lines.return_value = [json.dumps(self.rows[i]).encode() for i in ids if i in self.rows] + [b""]
+        return response
+
+
+@mock.patch.object(meterings_manager, "VML_RESOLVE_TIME_MARGIN", 1)
+@mock.patch.object(meterings_manager, "VML_RESOLVE_CHUNK_SIZE", 2)
+class ResolveIndexedValuesTest(SimpleTestCase):
+    indexes = [["g", f"s{i}", i, str(1000 + 100*i), ["g", f"s{i}", 0.0, 1000 + 100*i] if i == 3 else None]
+               for i in range(5)]
+
+    def resolve(self, vml: _VictoriaLogs):
+        with mock.patch.object(meterings_manager, "VML_CLIENT", vml):
+            return MeteringsManager._resolve_indexed_values(self.indexes)
+
+    def get_hash(self, i: int):
+        return MeteringsManager._get_msg_hash("g", f"s{i}", 1000 + 100*i)
+
+    def get_rows(self, *numbers):
+        return {self.get_hash(i): {"message_id": self.get_hash(i), "asset": "g", "signal": f"s{i}",
+                                   "_msg": f"value{i}", "_time": "2024-01-01T00:00:00.5Z"}
+                for i in numbers}
+
+    def test_chunks_bounded_by_timestamps(self):
+        vml = _VictoriaLogs(self.get_rows(0, 1, 2, 4))
+        meterings, status = self.resolve(vml)
+        self.assertTrue(status)
+        self.assertEqual([(q["start"], q["end"], q["limit"]) for q in vml.queries],
+                         [(999, 1102, 4), (1199, 1302, 4), (1399, 1402, 2)])
+        self.assertEqual(sorted(record[1:3] for record in meterings),
+                         [["s0", "value0"], ["s1", "value1"], ["s2", "value2"], ["s3", 0.0], ["s4", "value4"]])
+        # время с долями секунды
+        self.assertEqual(meterings[0][3], 1704067200.5)
+
+    def test_unresolved_without_fallback_are_dropped(self):
+        before = MeteringsManager.get_indexed_stats()
+        meterings, status = self.resolve(_VictoriaLogs(self.get_rows(0)))
+        self.assertTrue(status)
+        # значение s3 берется из signals_value
+        self.assertEqual(sorted(record[1] for record in meterings), ["s0", "s3"])
+        after = MeteringsManager.get_indexed_stats()
+        self.assertEqual((after["requested"] - before["requested"], after["unresolved"] - before["unresolved"],
+                          after["queries"] - before["queries"]), (5, 4, 3))
+
+    def test_failed_chunk(self):
+        meterings, status = self.resolve(_VictoriaLogs(self.get_rows(0, 1, 2, 4), {self.get_hash(2)}))
+        self.assertFalse(status)
+        self.assertEqual(sorted(record[1] for record in meterings), ["s0", "s1", "s3", "s4"])
+
+
+@mock.patch.object(meterings_manager, "VM_STEP_LADDER", (1, 5, 60, 300, 3600))
+class StepAlignmentTest(SimpleTestCase):
+    def test_snap_period(self):
+        self.assertEqual([MeteringsManager._snap_period(period) for period in (0.2, 1, 1.5, 59, 60, 61, 3600)],
+                         [1, 1, 5, 60, 60, 300, 3600])
+        # шаг больше максимального значения лестницы кратен ему
+        self.assertEqual(MeteringsManager._snap_period(3601), 7200)
+        self.assertEqual(MeteringsManager._snap_period(3 * 3600), 3 * 3600)
+
+    def test_align_range(self):
+        # моменты вычисления t, интервалы (t - period, t] которых содержат границы
+        self.assertEqual(MeteringsManager._align_range(601, 1199, 300), (900, 1200))
+        self.assertEqual(MeteringsManager._align_range(600, 1200, 300), (600, 1200))
+        self.assertEqual(MeteringsManager._align_range(600.5, 1200.5, 300), (900, 1500))
+
+    def test_same_query_for_shifted_windows(self):
+        week = 7 * 86400
+        calls = []
+        for shift in (1, 6):
+            with mock.patch.object(MeteringsManager, "_query_prometheus_range_raw",
+                                   return_value=_range_body({})) as query_range:
+                MeteringsManager.get_meterings_by_assets(
+                    {"g": (1_000_000 + shift, 1_000_000 + week + shift)}, {"": ["s"]}, is_reduced=True)
+            calls.append(query_range.call_args.args)
+        self.assertEqual(calls[0], calls[1])
+        self.assertEqual(calls[0][1:], (1_000_200, 1_000_200 + week, "300s"))
@@ -0,0 +1,85 @@
+from array import array
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from dashboard.services.commons.range_cache import RangeCache
+from dashboard.services.commons.series import SignalSeries
+
+
+PERIOD = 60
+CHUNK_POINTS = 10
+CHUNK_LEN = PERIOD * CHUNK_POINTS
+NOW = 100_000
+
+
+class _Storage:
+    """Хранилище: значение сигнала в момент вычисления t (кратный шагу) равно t"""
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, signals: list[str], start: int, end: int):
+        self.queries.append((tuple(signals), start, end))
+        timestamps = range(start, end + 1, PERIOD)
+        return {signal: SignalSeries(signal, array("q", timestamps), array("d", timestamps))
+                for signal in signals}, True
+
+
+def _expected(date_start: float, date_end: float):
+    return [ts for ts in range(0, NOW + CHUNK_LEN, PERIOD) if date_start <= ts <= date_end]
+
+
+@mock.patch("dashboard.services.commons.range_cache.time", lambda: NOW)
+class RangeCacheTest(SimpleTestCase):
+    def setUp(self):
+        self.cache = RangeCache(max_bytes=10**6, chunk_points=CHUNK_POINTS, closed_lag=0)
+        self.storage = _Storage()
+
+    def get(self, date_start, date_end, signals=("a",)):
+        result, status = self.cache.get_series("guid", list(signals), PERIOD, date_start, date_end, self.storage)
+        self.assertTrue(status)
+        return result
+
+    def test_series_across_chunk_boundaries(self):
+        result = self.get(1000, 2500)
+        self.assertEqual(list(result["a"].timestamps), _expected(1000, 2500))
+        self.assertEqual(self.storage.queries, [(("a",), 600, 5*CHUNK_LEN - PERIOD)])
+
+    def test_boundary_points_are_not_duplicated(self):
+        result = self.get(CHUNK_LEN, 3*CHUNK_LEN)
+        self.assertEqual(list(result["a"].timestamps), _expected(CHUNK_LEN, 3*CHUNK_LEN))
+        result = self.get(CHUNK_LEN - PERIOD, 3*CHUNK_LEN + PERIOD)
+        self.assertEqual(list(result["a"].timestamps), _expected(CHUNK_LEN - PERIOD, 3*CHUNK_LEN + PERIOD))
+
+    def test_sliding_window_reuses_chunks(self):
+        self.get(1000, 2500)
+        self.storage.queries.clear()
+        result = self.get(1100, 2600)
+        self.assertEqual(list(result["a"].timestamps), _expected(1100, 2600))
+        result = self.get(1300, 3100)
+        self.assertEqual(list(result["a"].timestamps), _expected(1300, 3100))
+        stats = self.cache.get_stats()
+        self.assertGreater(stats["chunk_hits"], 0)
+
+    def test_partially_cached_signals(self):
+        self.get(1000, 2500, ("a",))
+        self.storage.queries.clear()
+        result = self.get(1000, 2500, ("a", "b"))
+        self.assertEqual(list(result["a"].timestamps), list(result["b"].timestamps))
+        self.assertEqual([signals for signals, _, _ in self.storage.queries], [("b",)])
+
+    def test_open_chunk_is_queried_every_time(self):
+        date_end = NOW - 10
+        self.get(date_end - 2*CHUNK_LEN, date_end)
+        self.storage.queries.clear()
+        result = self.get(date_end - 2*CHUNK_LEN, date_end)
+        self.assertEqual(list(result["a"].timestamps), _expected(date_end - 2*CHUNK_LEN, date_end))
+        self.assertEqual(len(self.storage.queries), 1)
+        self.assertEqual(self.storage.queries[0][1], NOW // CHUNK_LEN * CHUNK_LEN)
+
+    def test_eviction(self):
+        cache = RangeCache(max_bytes=2000, chunk_points=CHUNK_POINTS, closed_lag=0)
+        cache.get_series("guid", ["a"], PERIOD, 0, 20*CHUNK_LEN, self.storage)
+        stats = cache.get_stats()
+        self.assertGreater(stats["evicted"], 0)
+        self.assertLessEqual(stats["bytes"], 2000)
@@ -0,0 +1,171 @@
+from contextlib import nullcontext
+from operator import attrgetter
+from types import SimpleNamespace
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from dashboard.models import SignalsRollup, SignalsRollupState
+from dashboard.services.commons import rollup
+from dashboard.services.commons.rollup import SignalsRollupManager
+
+
+HOUR = 3600
+DAY = 86400
+
+
+class _QuerySet:
+    """Запросы к таблице в памяти: поддерживаются используемые менеджером агрегатов операции"""
+    _operators = {"": lambda a, b: a == b, "in": lambda a, b: a in b,
+                  "lt": lambda a, b: a < b, "lte": lambda a, b: a <= b, "gt": lambda a, b: a > b}
+
+    def __init__(self, table: list, items: list | None = None):
+        self.table = table
+        self.items = table if items is None else items
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def filter(self, **lookups):
+        def match(item):
+            for lookup, value in lookups.items():
+                field, _, operator = lookup.partition("__")
+                if not self._operators[operator](getattr(item, field), value):
+                    return False
+            return True
+        return _QuerySet(self.table, [item for item in self.items if match(item)])
+
+    def order_by(self, *fields):
+        return _QuerySet(self.table, sorted(self.items, key=attrgetter(*fields)))
+
+    def values_list(self, *fields):
+        return [tuple(getattr(item, field) for field in fields) for item in self.items]
+
+    def delete(self):
+        deleted = set(map(id, self.items))
+        self.table[:] = [item for item in self.table if id(item) not in deleted]
+
+    def update(self, **values):
+        for item in self.items:
+            for field, value in values.items():
+                setattr(item, field, value)
+
+    def bulk_create(self, rows, batch_size=None, ignore_conflicts=False):
+        keys = {(row.asset, row.period, row.signal, row.timestamp) for row in self.table}
+        self.table.extend(row for row in rows if (row.asset, row.period, row.signal, row.timestamp) not in keys)
+
+
+def _aggregates(signal: str, timestamp: int) -> dict:
+    """Агрегаты сигнала за интервал, оканчивающийся в 'timestamp'"""
+    base = timestamp / HOUR + (100 if signal == "b" else 0)
+    return {"min": base, "max": base + 0.5, "tmin": timestamp - 1000, "tmax": timestamp - 10,
+            "avg": base + 0.25, "last": base + 0.1, "tlast": timestamp - 5}
+
+
+class _RollupTestCase(SimpleTestCase):
+    def setUp(self):
+        self.rows, self.states = [], []
+        for target, name, value in (
+                (SignalsRollup, "objects", _QuerySet(self.rows)),
+                (SignalsRollupState, "objects", _QuerySet(self.states)),
+                (SignalsRollupState, "save", lambda state: state in self.states or self.states.append(state)),
+                (rollup, "transaction", SimpleNamespace(atomic=nullcontext)),
+                (rollup, "ROLLUP_PERIODS", [HOUR, DAY]),
+                (rollup, "ROLLUP_HISTORY_DAYS", 2),
+                (rollup, "ROLLUP_CHUNK_POINTS", 10),
+                (rollup, "ROLLUP_CLOSED_LAG", 600),
+                (SignalsRollupManager, "_stats", {"routed": 0, "rollup_points": 0, "errors": 0}),
+                (SignalsRollupManager, "get_rollup_signals", lambda: {"g": ["a", "b"]})):
+            patcher = mock.patch.object(target, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.queries = []
+
+    def query(self, guid, signals, period, start, end):
+        self.queries.append((guid, tuple(signals), period, start, end))
+        return {signal: {timestamp: _aggregates(signal, timestamp) for timestamp in range(start, end + 1, period)}
+                for signal in signals}
+
+    def get_state(self, signal: str, period: int):
+        return [(state.start, state.end) for state in self.states if state.signal == signal and state.period == period]
+
+
+class MaterializeTest(_RollupTestCase):
+    now = 100 * DAY + 1800
+
+    def test_closed_intervals_within_history(self):
+        result = SignalsRollupManager.materialize(self.query, self.now)
+        # часовые интервалы от начала истории (2 суток) до последнего закрытого (с учетом ROLLUP_CLOSED_LAG)
+        history_start = 98 * DAY
+        self.assertEqual(result, {HOUR: 2 * 48, DAY: 2 * 2})
+        self.assertEqual(self.get_state("a", HOUR), [(history_start, 100 * DAY)])
+        self.assertEqual(self.get_state("b", DAY), [(history_start, 100 * DAY)])
+        # интервалы запрашиваются частями по ROLLUP_CHUNK_POINTS моментов
+        hour_queries = [query for query in self.queries if query[2] == HOUR]
+        self.assertEqual(hour_queries[0], ("g", ("a", "b"), HOUR, history_start + HOUR, history_start + 10 * HOUR))
+        self.assertEqual(len(hour_queries), 5)
+        row = next(row for row in self.rows if (row.signal, row.period, row.timestamp) == ("b", HOUR, 99 * DAY))
+        self.assertEqual((row.min_value, row.max_value, row.tmin, row.tmax, row.avg_value, row.last_value, row.tlast),
+                         tuple(_aggregates("b", 99 * DAY).values()))
+
+    def test_incremental(self):
+        SignalsRollupManager.materialize(self.query, self.now)
+        self.queries.clear()
+        result = SignalsRollupManager.materialize(self.query, self.now + 2 * HOUR)
+        self.assertEqual(result, {HOUR: 4, DAY: 0})
+        self.assertEqual(self.queries, [("g", ("a", "b"), HOUR, 100 * DAY + HOUR, 100 * DAY + 2 * HOUR)])
+        # агрегаты старше истории удаляются, начало рассчитанного периода сдвигается
+        self.assertEqual(min(row.timestamp for row in self.rows if row.period == HOUR), 98 * DAY + 3 * HOUR)
+        self.assertEqual(self.get_state("a", HOUR), [(98 * DAY + 2 * HOUR, 100 * DAY + 2 * HOUR)])
+
+    def test_signals_grouped_by_state(self):
+        SignalsRollupManager.materialize(self.query, self.now)
+        with mock.patch.object(SignalsRollupManager, "get_rollup_signals", lambda: {"g": ["a", "b", "c"]}):
+            self.queries.clear()
+            SignalsRollupManager.materialize(self.query, self.now + HOUR)
+        hour_queries = [query for query in self.queries if query[2] == HOUR]
+        self.assertEqual(hour_queries[0], ("g", ("a", "b"), HOUR, 100 * DAY + HOUR, 100 * DAY + HOUR))
+        self.assertEqual(hour_queries[1][1:4], (("c",), HOUR, 98 * DAY + 2 * HOUR))
+
+    def test_failed_query(self):
+        def failed_query(*args):
+            raise ConnectionError("VictoriaMetrics недоступна")
+
+        with self.assertLogs(rollup.logger, "ERROR"):
+            self.assertEqual(SignalsRollupManager.materialize(failed_query, self.now), {HOUR: 0, DAY: 0})
+        self.assertEqual(SignalsRollupManager.get_stats()["errors"], 2)
+        self.assertEqual(self.states, [])
+
+
+class GetSeriesTest(_RollupTestCase):
+    def setUp(self):
+        super().setUp()
+        SignalsRollupManager.materialize(self.query, 100 * DAY + 1800)
+
+    def test_route(self):
+        self.assertEqual(SignalsRollupManager.route(HOUR), HOUR)
+        self.assertEqual(SignalsRollupManager.route(6 * HOUR), HOUR)
+        self.assertEqual(SignalsRollupManager.route(2 * DAY), DAY)
+        self.assertIsNone(SignalsRollupManager.route(1800))
+        self.assertIsNone(SignalsRollupManager.route(5400))
+
+    def test_step_regrouping(self):
+        date_start, date_end = 99 * DAY, 101 * DAY
+        result, split = SignalsRollupManager.get_series("g", ["a"], 4 * HOUR, date_start, date_end)
+        self.assertEqual(split, 100 * DAY)
+        series = result["a"]
+        # на шаг запроса 4 часа приходится 4 часовых агрегата: min - первого, max - последнего
+        expected = []
+        for step_end in range(99 * DAY + 4 * HOUR, 100 * DAY + 1, 4 * HOUR):
+            first, last = _aggregates("a", step_end - 3 * HOUR), _aggregates("a", step_end)
+            expected += [(first["tmin"], first["min"]), (last["tmax"], last["max"])]
+        self.assertEqual(list(zip(series.timestamps, series.values)), expected)
+        self.assertEqual(SignalsRollupManager.get_stats()["routed"], 1)
+
+    def test_not_applicable(self):
+        # шаг не кратен интервалу агрегатов
+        self.assertEqual(SignalsRollupManager.get_series("g", ["a"], 5400, 99 * DAY, 101 * DAY), ({}, None))
+        # агрегаты рассчитаны не с начала периода
+        self.assertEqual(SignalsRollupManager.get_series("g", ["a"], HOUR, 97 * DAY, 101 * DAY), ({}, None))
+        # нет рассчитанных агрегатов сигнала
+        self.assertEqual(SignalsRollupManager.get_series("g", ["x"], HOUR, 99 * DAY, 101 * DAY), ({}, None))
@@ -0,0 +1,105 @@
+import json
+import re
+from itertools import product
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from dashboard.services.commons.asset_desc import AssetDesc
+from dashboard.services.diag_mess.use_cases import _get_processed_msg_record
+from dashboard.services.diag_mess.search_index import EMPTY_MSG_REGEXP, DiagMsgSearchIndex, _get_params_regexp
+from localization.services.translation import diag_msg
+
+
+class ParamsRegexpTest(SimpleTestCase):
+    def assertMatch(self, search: str, params: list, expected: bool):
+        regexp = _get_params_regexp(search)
+        for ensure_ascii in (True, False):
+            text = json.dumps(params, ensure_ascii=ensure_ascii)
+            self.assertEqual(bool(re.search(regexp, text)), expected, f"{search!r} in {text}")
+
+    def test_string_values(self):
+        self.assertMatch("тест", [["Тестовый режим"]], True)
+        self.assertMatch("abc", [["xABCx"], [1]], True)
+        self.assertMatch('a"b', [['a"b']], True)
+        self.assertMatch("a\nb", [["xa\nbx"]], True)
+
+    def test_json_markup_is_not_matched(self):
+        self.assertMatch("0442", [["т"]], False)
+        self.assertMatch("u04", [["т"]], False)
+        self.assertMatch("n", [["a\nb"]], False)
+        self.assertMatch('",', [["a", "b"]], False)
+        self.assertMatch("[", [["x"]], False)
+        self.assertMatch("key", [[{"key": "value"}]], False)
+        self.assertMatch("value", [[{"key": "value"}]], True)
+
+    def test_numbers(self):
+        self.assertMatch("1.5", [[21.5, 3]], True)
+        self.assertMatch("12", [[5, 12]], True)
+        self.assertMatch("2, 3", [[2, 3]], False)
+        self.assertMatch("true", [[True]], False)
+
+
+class DiagMsgSearchIndexTest(SimpleTestCase):
+    def setUp(self):
+        self.index = DiagMsgSearchIndex({
+            1: "Температура {param1:.1f} °C",
+            2: "Объект {param1}",
+            3: "Ток {param1:d} А, фаза {param2}",
+            4: "Без параметров",
+            5: "Значение {param1!s:>5}",
+            6: "Некорректный шаблон {param1",
+        })
+
+    def test_resolve(self):
+        self.assertEqual(self.index.resolve("температура"), ([1], [2, 3, 5]))
+        self.assertEqual(self.index.resolve("abc"), ([], [2, 3, 5]))
+        self.assertEqual(self.index.resolve("12.5"), ([], [1, 2, 3, 5]))
+        self.assertEqual(self.index.resolve("параметров"), ([4], [2, 3, 5]))
+        self.assertEqual(self.index.resolve("шаблон {param1"), ([6], [2, 3, 5]))
+
+    def test_get_filter(self):
+        self.assertEqual(self.index.get_filter(""), "")
+        search_filter = self.index.get_filter("без")
+        self.assertIn('message_ids:~"(^|\\\\D)(4)(\\\\D|$)"', search_filter)
+        self.assertIn('message_ids:~"(^|\\\\D)(2|3|5)(\\\\D|$)" AND param_groups:~', search_filter)
+        # текст '_msg' ищется у записей без перевода, в т.ч. с пустым списком или неизвестными кодами
+        self.assertIn('(NOT message_ids:~"(^|\\\\D)(1|2|3|4|5|6)(\\\\D|$)" AND _msg:~"(?i)без")', search_filter)
+        self.assertEqual(DiagMsgSearchIndex({}).get_filter("без"), '(_msg:~"(?i)без")')
+
+    def test_untranslated_records(self):
+        regexp = json.loads(self.index._untranslated_filter.removeprefix("NOT message_ids:~"))
+        for message_ids in ("", "[]", "[7]", "[17, 60]"):
+            self.assertIsNone(re.search(regexp, message_ids), message_ids)
+        for message_ids in ("[1]", "[7, 3]", "[60,5]"):
+            self.assertIsNotNone(re.search(regexp, message_ids), message_ids)
+
+    def test_exclude_empty_filter(self):
+        self.assertEqual(
+            self.index.get_exclude_empty_filter(),
+            f'NOT ((_msg:"" OR _msg:~{EMPTY_MSG_REGEXP}) AND {self.index._untranslated_filter})')
+        self.assertEqual(DiagMsgSearchIndex({2: ""}).get_exclude_empty_filter(),
+                         f'NOT (_msg:"" OR _msg:~{EMPTY_MSG_REGEXP})')
+
+    def test_empty_msg_regexp(self):
+        regexp = json.loads(EMPTY_MSG_REGEXP)
+        for text in ("", "  ", "null", " [] ", "{}", "()\n"):
+            self.assertTrue(re.search(regexp, text), repr(text))
+        for text in ("nul", "x", "null x", "[1]"):
+            self.assertFalse(re.search(regexp, text), repr(text))
+
+    def test_exclude_empty_matches_processing(self):
+        templates = {1: "Уровень {param1}", 2: "", 3: "Отключение"}
+        index = DiagMsgSearchIndex(templates)
+        ids_regexp = json.loads(index._untranslated_filter.removeprefix("NOT message_ids:~"))
+        empty_regexp = json.loads(EMPTY_MSG_REGEXP)
+        with mock.patch.object(diag_msg.TranslationStore, "get_all", return_value=templates):
+            translator = diag_msg.DiagMsgTralslation((), "ru")
+        for message_ids, params, msg in product(("", "[]", "[1]", "[2]", "[3, 2]", "[7]"),
+                                                ("", "[[5]]"), ("", "  ", "null", " {} ", "текст")):
+            record = {"_time": "2025-01-01T00:00:00Z", "message_ids": message_ids, "param_groups": params, "_msg": msg}
+            # запись исключается условием LogsQL тогда и только тогда, когда она отбрасывается при обработке
+            excluded = bool(re.search(empty_regexp, msg)) and not re.search(ids_regexp, message_ids)
+            processed = _get_processed_msg_record(
+                record, translator.get_translation(message_ids, params), AssetDesc(), "")
+            self.assertEqual(excluded, processed is None, record)
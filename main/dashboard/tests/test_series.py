@@ -0,0 +1,53 @@
+import json
+import random
+
+from django.test import SimpleTestCase
+
+from dashboard.services.commons.series import iter_range_series
+
+
+def _body(result: list[dict]):
+    return json.dumps({"status": "success", "data": {"resultType": "matrix", "result": result},
+                       "stats": {"seriesFetched": str(len(result))}}, ensure_ascii=False).encode()
+
+
+def _chunks(body: bytes, size: int):
+    return iter([body[i:i + size] for i in range(0, len(body), size)])
+
+
+class IterRangeSeriesTest(SimpleTestCase):
+    def setUp(self):
+        rnd = random.Random(10)
+        self.result = [
+            {"metric": {"__name__": "max", "asset": "подстанция-1", "signal": f"sgn{i}"},
+             "values": [[1000 + j, str(rnd.random())] for j in range(rnd.randint(0, 200))]}
+            for i in range(7)]
+        self.expected = [(series["metric"], [v[0] for v in series["values"]], [v[1] for v in series["values"]])
+                         for series in self.result]
+
+    def parse(self, body):
+        return [(metric, list(timestamps), values) for metric, timestamps, values in iter_range_series(body)]
+
+    def test_whole_body(self):
+        self.assertEqual(self.parse(_body(self.result)), self.expected)
+        self.assertEqual(self.parse(_body(self.result).decode()), self.expected)
+
+    def test_chunked_body(self):
+        body = _body(self.result)
+        for size in (1, 3, 64, 1000, len(body)):
+            with self.subTest(size=size):
+                self.assertEqual(self.parse(_chunks(body, size)), self.expected)
+
+    def test_empty_result(self):
+        self.assertEqual(self.parse(_chunks(_body([]), 5)), [])
+
+    def test_error_response(self):
+        with self.assertRaisesRegex(ValueError, "status: error"):
+            self.parse(_chunks(b'{"status":"error","errorType":"bad_data","error":"x"}', 4))
+        with self.assertRaises(ValueError):
+            self.parse(b"")
+
+    def test_truncated_body(self):
+        body = _body(self.result)
+        with self.assertRaises(ValueError):
+            self.parse(_chunks(body[:len(body) // 2], 100))
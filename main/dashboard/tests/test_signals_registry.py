@@ -0,0 +1,84 @@
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from dashboard.services.commons import signals_registry
+from dashboard.services.commons.signals_registry import SignalRecord, SignalsRegistry, _RegistrySnapshot
+from dashboard.utils.cache_tools import SharedVersion
+
+
+LOCMEM_CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+
+def _record(id: int, code: str, sg_type: str = "t", storage: str = "") -> SignalRecord:
+    return SignalRecord(id=id, code=code, name=code, sg_type=sg_type, unit_code=None, unit_name="",
+                        storage=storage, category_id=None, category="", lim0_code=None, lim1_code=None,
+                        precision=None)
+
+
+RECORDS = [_record(1, "a"), _record(2, "b", "calc", "s1"), _record(3, "a", "calc"), _record(4, "c", storage="s1")]
+TABS = [(10, "main", 4), (10, "main", 1), (10, "gas", 2), (11, "main", 99)]
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class SharedVersionTest(SimpleTestCase):
+    def test_bump_is_seen_by_other_processes(self):
+        version, other = SharedVersion("test", 0), SharedVersion("test", 0)
+        self.assertEqual(version.get(), other.get())
+        version.bump()
+        self.assertEqual(version.get(), other.get())
+
+    def test_check_interval(self):
+        version, other = SharedVersion("test_interval", 0), SharedVersion("test_interval", 3600)
+        value = other.get()
+        version.bump()
+        self.assertEqual(other.get(), value)
+        self.assertNotEqual(version.get(), value)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class SignalsRegistryTest(SimpleTestCase):
+    def setUp(self):
+        patcher = mock.patch.object(SignalsRegistry, "_load", side_effect=lambda: _RegistrySnapshot(RECORDS, TABS))
+        self.load = patcher.start()
+        self.addCleanup(patcher.stop)
+        for name, value in (("_version", SharedVersion("test_registry", 0)), ("_snapshot", None),
+                            ("_snapshot_version", None), ("_loaded_at", 0.0)):
+            patcher = mock.patch.object(SignalsRegistry, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_indexes(self):
+        self.assertEqual([r.id for r in SignalsRegistry.get_by_codes(["a", "c", "x"])], [1, 3, 4])
+        self.assertEqual(SignalsRegistry.get_by_codes(None), [])
+        self.assertEqual(SignalsRegistry.get_by_id(2).code, "b")
+        self.assertIsNone(SignalsRegistry.get_by_id(99))
+        self.assertEqual([r.id for r in SignalsRegistry.get_by_type("calc")], [2, 3])
+        self.assertEqual([r.id for r in SignalsRegistry.get_by_storage("s1")], [2, 4])
+        self.assertEqual([r.id for r in SignalsRegistry.get_for_tab("10", "main")], [4, 1])
+        self.assertEqual(SignalsRegistry.get_for_tab(11, "main"), [])
+        self.assertEqual(SignalsRegistry.get_for_tab("x", "main"), [])
+
+    def test_loaded_once(self):
+        for _ in range(3):
+            SignalsRegistry.get_by_codes(["a"])
+            SignalsRegistry.get_by_id(1)
+        self.assertEqual(self.load.call_count, 1)
+
+    def test_reload_after_invalidate(self):
+        SignalsRegistry.get_by_id(1)
+        SignalsRegistry.invalidate()
+        SignalsRegistry.get_by_id(1)
+        self.assertEqual(self.load.call_count, 2)
+
+    def test_reload_after_other_process_invalidate(self):
+        SignalsRegistry.get_by_id(1)
+        SharedVersion("test_registry").bump()
+        SignalsRegistry.get_by_id(1)
+        self.assertEqual(self.load.call_count, 2)
+
+    def test_reload_after_ttl(self):
+        SignalsRegistry.get_by_id(1)
+        with mock.patch.object(signals_registry, "REGISTRY_TTL", 0):
+            SignalsRegistry.get_by_id(1)
+        self.assertEqual(self.load.call_count, 2)
@@ -0,0 +1,44 @@
+from collections import namedtuple
+from types import SimpleNamespace
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from dashboard.services.commons.meterings_manager import MeteringsManager
+from dashboard.services.meterings.use_cases import (
+    WIDGETS_WINDOW_MERGE_SLACK, _merge_period_windows, _query_period_window_group)
+
+
+Link = namedtuple("Link", "code")
+
+
+class PeriodWindowsTest(SimpleTestCase):
+    def test_merge_windows_within_slack(self):
+        period = 1000
+        slack = period * WIDGETS_WINDOW_MERGE_SLACK
+        windows = {
+            (period, 5000): {Link("a")},
+            (period, 5000 + slack): {Link("b")},
+            (period, 5000 + slack + 1): {Link("c")},
+            (60, 5000): {Link("d")},
+        }
+        groups = sorted(_merge_period_windows(windows))
+        self.assertEqual(groups, [
+            (4000, 5000 + slack, [(period, 5000, {Link("a")}), (period, 5000 + slack, {Link("b")})]),
+            (4000 + slack + 1, 5000 + slack + 1, [(period, 5000 + slack + 1, {Link("c")})]),
+            (4940, 5000, [(60, 5000, {Link("d")})]),
+        ])
+
+    def test_group_result_is_split_by_windows(self):
+        signals = {"a": SimpleNamespace(_storage="", _code="a"), "b": SimpleNamespace(_storage="s", _code="b")}
+        group = [(100, 1000, {Link("a")}), (100, 1050, {Link("b")})]
+        meterings = [["a", ts, 1.0] for ts in range(850, 1101, 50)] + [["b", ts, 2.0] for ts in range(900, 1101, 50)]
+        with mock.patch.object(MeteringsManager, "get_meterings", return_value=(meterings, True)) as get_meterings:
+            result, status = _query_period_window_group("asset", 900, 1050, group, signals)
+        # один запрос по всем сигналам группы
+        get_meterings.assert_called_once_with("asset", {"": {"a"}, "s": {"b"}}, 900, 1050)
+        self.assertTrue(status)
+        self.assertEqual(result, [
+            ("a", 100, [["a", 900, 1.0], ["a", 950, 1.0], ["a", 1000, 1.0]]),
+            ("b", 100, [["b", 950, 2.0], ["b", 1000, 2.0], ["b", 1050, 2.0]]),
+        ])
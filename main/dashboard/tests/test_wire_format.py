@@ -0,0 +1,74 @@
+import gzip
+import zlib
+from datetime import datetime, timedelta
+from unittest import mock
+from zoneinfo import ZoneInfo
+
+from django.test import RequestFactory, SimpleTestCase
+
+from dashboard.services.meterings import wire_format
+from dashboard.services.meterings.wire_format import COMPRESS_MIN_SIZE, _compress, _get_encoding, _to_epoch_ms
+
+
+class EncodingTest(SimpleTestCase):
+    def test_plain_tokens(self):
+        self.assertEqual(_get_encoding("gzip, deflate, br"), "gzip")
+        self.assertEqual(_get_encoding("deflate"), "deflate")
+        self.assertEqual(_get_encoding("br"), None)
+        self.assertEqual(_get_encoding(""), None)
+
+    def test_qvalues(self):
+        self.assertEqual(_get_encoding("gzip;q=0, deflate"), "deflate")
+        self.assertEqual(_get_encoding("gzip;q=0.5, deflate;q=0.8"), "deflate")
+        self.assertEqual(_get_encoding("GZIP; Q=0.9, deflate;q=0.1"), "gzip")
+        self.assertEqual(_get_encoding("gzip;q=0, deflate;q=0"), None)
+        # некорректный вес считается нулевым
+        self.assertEqual(_get_encoding("gzip;q=abc, deflate;q=0.1"), "deflate")
+
+    def test_gzip_substring_is_not_token(self):
+        self.assertEqual(_get_encoding("x-gzip-custom"), None)
+
+    def test_wildcard(self):
+        self.assertEqual(_get_encoding("*"), "gzip")
+        self.assertEqual(_get_encoding("*;q=0.5, gzip;q=0"), "deflate")
+        self.assertEqual(_get_encoding("deflate;q=0.2, *;q=0"), "deflate")
+        self.assertEqual(_get_encoding("*;q=0"), None)
+
+    def test_compress(self):
+        factory = RequestFactory()
+        body = b"x" * COMPRESS_MIN_SIZE
+        data, encoding = _compress(factory.get("/", HTTP_ACCEPT_ENCODING="gzip;q=0, deflate"), body)
+        self.assertEqual(encoding, "deflate")
+        self.assertEqual(zlib.decompress(data), body)
+        data, encoding = _compress(factory.get("/", HTTP_ACCEPT_ENCODING="gzip"), body)
+        self.assertEqual(encoding, "gzip")
+        self.assertEqual(gzip.decompress(data), body)
+        self.assertEqual(_compress(factory.get("/", HTTP_ACCEPT_ENCODING="gzip;q=0"), body), (body, None))
+        self.assertEqual(_compress(factory.get("/", HTTP_ACCEPT_ENCODING="gzip"), body[:-1]), (body[:-1], None))
+
+
+class EpochMsTest(SimpleTestCase):
+    tz = ZoneInfo("Europe/Berlin")
+
+    def assert_epoch_ms(self, dates):
+        with mock.patch.object(wire_format.time_func, "get_tz", return_value=self.tz):
+            self.assertEqual(_to_epoch_ms(dates),
+                             [round(date.replace(tzinfo=self.tz).timestamp() * 1000) for date in dates])
+
+    def test_spring_forward_gap(self):
+        # 2024-03-31 02:00-03:00 по Берлину не существует
+        start = datetime(2024, 3, 31, 1)
+        self.assert_epoch_ms([start + timedelta(minutes=15 * i) for i in range(16)])
+
+    def test_fall_back_ambiguous(self):
+        # 2024-10-27 02:00-03:00 по Берлину наступает дважды
+        start = datetime(2024, 10, 27, 1)
+        self.assert_epoch_ms([start + timedelta(minutes=15 * i) for i in range(16)])
+
+    def test_several_transitions(self):
+        start = datetime(2023, 1, 1)
+        self.assert_epoch_ms([start + timedelta(hours=7 * i, milliseconds=i) for i in range(3000)])
+
+    def test_single_offset(self):
+        start = datetime(2024, 6, 1)
+        self.assert_epoch_ms([start + timedelta(seconds=i) for i in range(10)])
@@ -7,8 +7,14 @@ urlpatterns = [
     path('', views.index, name='home'),
     # оборудование с статусами в разрезе подстанций
     path('substations', views.substations, name='substations'),
+    # поток обновлений (SSE) статусов оборудования всех подстанций
+    path('substations/live', views.substations_live_feed, name='substations_live_feed'),
     # информация о подстанции
     path('substation/<int:objId>', views.substation_info, name='substation_info'),
+    # поток обновлений (SSE) статусов и ИТС оборудования подстанции
+    path('substation/<int:objId>/live', views.substations_live_feed, name='substation_live_feed'),
+    # лента диаг. сообщений активов подстанции или организации (со входящими элементами)
+    path('substation/<int:objId>/diagmess', views.substation_diag_mess, name='substation_diag_mess'),
     # последние диаг. сообщения системы
     path('diag-messages/last', views.get_diagmsg_last, name='get_diagmsg_last'),
 
@@ -16,6 +22,8 @@ urlpatterns = [
     path('asset/<int:objId>/diagmess', views.asset_diag_mess, name='asset_diag_mess'),
     # последние значения сигналов для актива
     path('asset/<int:assetId>/meterings/last', views.last_meterings, name='last_meterings'),
+    # поток обновлений (SSE) последних значений сигналов и диаг. сообщений актива
+    path('asset/<int:assetId>/meterings/live', views.asset_live_feed, name='asset_live_feed'),
     # значения сигналов за диапазон времени для актива для графиков
     path('asset/<int:assetId>/meterings/<str:tab>/charts', views.meterings_for_charts, name='meterings_for_charts'),
     # значения сигналов за диапазон времени для актива для графика гистерезиса
@@ -30,6 +38,8 @@ urlpatterns = [
     path('asset/<int:assetId>/meterings/gases/rdnomogram', views.rd_nomogram, name='rd_nomogram'),
     # данные 3D прогноза концентраций
     path('asset/<int:assetId>/3dforecast', views.forecast_3d, name='forecast_3d'),
+    # разделы страницы актива одним запросом
+    path('asset/<int:assetId>/bundle', views.asset_bundle, name='asset_bundle'),
     # cоздание файла экспорта диаг. сообщений
     path('asset/<int:objId>/diagmsg/export/create', views.diag_mess_to_file, name='diag_mess_to_file'),
     # cоздание файла экспорта паспорта
@@ -59,4 +69,6 @@ urlpatterns = [
     path('notification-guide', views.get_notification_guide, name='get_notification_guide'),
     # список вкладок графиков в разрезе типов оборудования
     path('tabs-list', views.get_tabs_list, name='get_tabs_list'),
+    # счетчики запросов к хранилищам значений сигналов и диаг. сообщений
+    path('service-stats', views.service_stats, name='service_stats'),
 ]
@@ -1,9 +1,22 @@
 import asyncio
-from typing import Callable, Iterable, TypeAlias
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterable, TypeAlias
+
+from django.db import close_old_connections
+
+from main.settings import VM_QUERY_WORKERS
 
 
 DBQueryFunc: TypeAlias = Callable[..., tuple[Iterable, bool]]
 
+_executor = ThreadPoolExecutor(max_workers=VM_QUERY_WORKERS, thread_name_prefix="vm_query")
+# Пул вложенных вызовов из потоков основного пула (например, запросы разделов страницы актива):
+# потоки основного пула ожидают вложенные вызовы, не занимая свой же пул
+_nested_executor = ThreadPoolExecutor(max_workers=VM_QUERY_WORKERS, thread_name_prefix="vm_query_nested")
+_executors = (_executor, _nested_executor)
+_worker_state = threading.local()
+
 
 async def get_queries_results(func: DBQueryFunc, queries_params: list[dict]):
     """
@@ -26,3 +39,40 @@ async def get_queries_results(func: DBQueryFunc, queries_params: list[dict]):
         result.append(meterings)
         status = status and res_status
     return result, status
+
+
+def _run_in_worker(func: Callable, kwargs: dict, depth: int):
+    """
+    Выполнить вызов в потоке пула уровня вложенности 'depth'. Соединения с БД потока закрываются
+    после вызова, если они устарели (CONN_MAX_AGE) или неисправны, как после запроса.
+    """
+    _worker_state.depth = depth
+    try:
+        return func(**kwargs)
+    finally:
+        _worker_state.depth = 0
+        close_old_connections()
+
+
+def run_concurrently(calls: Iterable[tuple[Callable, dict]]) -> list[Any]:
+    """
+    Выполняет независимые синхронные вызовы параллельно в общем пуле потоков.
+
+    Parametrs:
+    ---
+    - calls - последовательность пар (функция, словарь именованных аргументов)
+
+    Return:
+    ---
+    - список результатов вызовов в порядке 'calls'.
+    Исключение любого вызова пробрасывается вызывающему.
+    Вызов из потока основного пула выполняется в пуле вложенных вызовов, чтобы
+    вложенные вызовы не ожидали освобождения занятого ими же пула, вызов из потока
+    пула вложенных вызовов - последовательно.
+    """
+    calls = list(calls)
+    depth = getattr(_worker_state, "depth", 0)
+    if len(calls) < 2 or depth >= len(_executors):
+        return [func(**kwargs) for func, kwargs in calls]
+    futures = [_executors[depth].submit(_run_in_worker, func, kwargs, depth + 1) for func, kwargs in calls]
+    return [future.result() for future in futures]
@@ -1,8 +1,12 @@
 import logging
+from time import monotonic
+from uuid import uuid4
 
 from django.core.cache import caches
 from django.http import JsonResponse
 
+from main.settings import REGISTRY_VERSION_CHECK_INTERVAL
+
 
 logger = logging.getLogger(__name__)
 
@@ -58,3 +62,44 @@ def success_json_response_cache(cache: str,
             return res
         return wrapper
     return decorator
+
+
+class SharedVersion:
+    """
+    Версия данных, общая для всех процессов приложения.
+
+    Значение хранится в кеше 'default' и меняется методом 'bump' при изменении данных.
+    Процесс перечитывает значение из кеша не чаще одного раза в 'check_interval' сек.
+    """
+    def __init__(self, name: str, check_interval: float = REGISTRY_VERSION_CHECK_INTERVAL):
+        self._key = f"shared_version:{name}"
+        self._check_interval = check_interval
+        self._value = None
+        self._checked_at = 0.0
+
+    def get(self):
+        """Получить текущую версию данных."""
+        now = monotonic()
+        if self._value is None or now - self._checked_at >= self._check_interval:
+            try:
+                value = caches["default"].get(self._key)
+                if value is None:
+                    value = uuid4().hex
+                    if not caches["default"].add(self._key, value, None):
+                        value = caches["default"].get(self._key, value)
+            except Exception as ex:
+                logger.error(f"Не удалось получить версию данных {self._key}. {ex}")
+                value = self._value or uuid4().hex
+            self._value = value
+            self._checked_at = now
+        return self._value
+
+    def bump(self):
+        """Сменить версию данных (для всех процессов)."""
+        value = uuid4().hex
+        try:
+            caches["default"].set(self._key, value, None)
+        except Exception as ex:
+            logger.error(f"Не удалось изменить версию данных {self._key}. {ex}")
+        self._value = value
+        self._checked_at = monotonic()
@@ -0,0 +1,145 @@
+import logging
+import os
+import threading
+from time import perf_counter, sleep
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from main.settings import (VM_ADDRESS, VML_ADDRESS, VML_PROJECT_ID,
+                           VM_CONNECT_TIMEOUT, VM_READ_TIMEOUT, VM_RETRIES,
+                           VM_RETRY_BACKOFF, VM_POOL_SIZE)
+
+
+logger = logging.getLogger(__name__)
+
+
+class HttpClient:
+    """
+    HTTP клиент с пулом keep-alive соединений.
+
+    Пул соединений создается один раз на процесс (после fork пересоздается).
+    Для каждого запроса задаются таймауты подключения и чтения.
+    Идемпотентные запросы (чтение) повторяются с экспоненциальной задержкой
+    при ошибках соединения, таймаутах и ответах со статусами из '_retry_statuses'.
+    В разрезе endpoint'ов ведутся счетчики запросов, ошибок и времени выполнения.
+    """
+    _retry_statuses = frozenset((502, 503, 504))
+
+    def __init__(self, base_url: str | None, name: str,
+                 connect_timeout: float = VM_CONNECT_TIMEOUT,
+                 read_timeout: float = VM_READ_TIMEOUT,
+                 retries: int = VM_RETRIES,
+                 backoff: float = VM_RETRY_BACKOFF,
+                 pool_size: int = VM_POOL_SIZE,
+                 headers: dict = None):
+        self._base_url = (base_url or "").rstrip("/")
+        self._name = name
+        self._timeout = (connect_timeout, read_timeout)
+        self._retries = max(retries, 0)
+        self._backoff = backoff
+        self._pool_size = pool_size
+        self._headers = headers or {}
+        self._session: requests.Session | None = None
+        self._pid: int | None = None
+        self._lock = threading.Lock()
+        self._stats: dict[str, dict] = {}
+
+    def _get_session(self):
+        """Получить сессию с пулом соединений текущего процесса."""
+        pid = os.getpid()
+        if self._session is None or self._pid != pid:
+            with self._lock:
+                if self._session is None or self._pid != pid:
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self._pool_size)
+                    session.mount("http://", adapter)
+                    session.mount("https://", adapter)
+                    session.headers.update(self._headers)
+                    self._session = session
+                    self._pid = pid
+                    self._stats = {}
+        return self._session
+
+    def request(self, method: str, path: str, endpoint: str = None,
+                idempotent: bool = True, **kwargs) -> requests.Response:
+        """
+        Выполнить HTTP запрос к 'base_url' + 'path'.
+
+        Parameters:
+        ---
+        - endpoint - имя endpoint'а для счетчиков (по умолчанию 'path');
+        - idempotent - если True, то при ошибках запрос повторяется;
+        - kwargs - аргументы requests.Session.request.
+
+        Генерирует исключение, если все попытки выполнения запроса неудачны.
+        """
+        session = self._get_session()
+        kwargs.setdefault("timeout", self._timeout)
+        url = self._base_url + path
+        endpoint = endpoint or path
+        attempts = self._retries + 1 if idempotent else 1
+        for attempt in range(1, attempts + 1):
+            start = perf_counter()
+            try:
+                response = session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as ex:
+                self._register(endpoint, perf_counter() - start, True)
+                if attempt >= attempts:
+                    raise
+                logger.warning(f"{self._name}: ошибка запроса {method} {url}, "
+                               f"попытка {attempt} из {attempts}. {ex}")
+            else:
+                self._register(endpoint, perf_counter() - start, response.status_code >= 400)
+                if response.status_code not in self._retry_statuses or attempt >= attempts:
+                    return response
+                logger.warning(f"{self._name}: {method} {url} вернул статус {response.status_code}, "
+                               f"попытка {attempt} из {attempts}.")
+                response.close()
+            sleep(self._backoff * 2 ** (attempt - 1))
+
+    def get(self, path: str, **kwargs) -> requests.Response:
+        return self.request("GET", path, **kwargs)
+
+    def post(self, path: str, **kwargs) -> requests.Response:
+        return self.request("POST", path, **kwargs)
+
+    def _register(self, endpoint: str, runtime: float, is_error: bool):
+        """Учесть запрос в счетчиках endpoint'а."""
+        with self._lock:
+            if endpoint not in self._stats:
+                self._stats[endpoint] = {"count": 0, "errors": 0, "total_time": 0.0, "max_time": 0.0}
+            stats = self._stats[endpoint]
+            stats["count"] += 1
+            stats["total_time"] += runtime
+            stats["max_time"] = max(stats["max_time"], runtime)
+            if is_error:
+                stats["errors"] += 1
+
+    def get_stats(self):
+        """
+        Получить счетчики запросов в разрезе endpoint'ов.
+
+        Return:
+        ---
+        - {endpoint: {"count": int, "errors": int, "avg_time": float, "max_time": float}, ...}
+        """
+        with self._lock:
+            return {
+                endpoint: {
+                    "count": stats["count"],
+                    "errors": stats["errors"],
+                    "avg_time": round(stats["total_time"] / stats["count"], 5) if stats["count"] else 0,
+                    "max_time": round(stats["max_time"], 5),
+                }
+                for endpoint, stats in self._stats.items()
+            }
+
+
+VM_CLIENT = HttpClient(VM_ADDRESS, "VictoriaMetrics")
+VML_CLIENT = HttpClient(VML_ADDRESS, "VictoriaLogs", headers={"projectid": str(VML_PROJECT_ID or 0)})
+
+
+def get_clients_stats():
+    """Получить счетчики запросов всех HTTP клиентов"""
+    return {client._name: client.get_stats() for client in (VM_CLIENT, VML_CLIENT)}
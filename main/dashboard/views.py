@@ -2,16 +2,29 @@ import logging
 import json
 from itertools import groupby
 
-from django.http import JsonResponse
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse, StreamingHttpResponse
 from django.shortcuts import render
 
+from dashboard.services.asset_bundle import use_cases as bundle_use_cases
 from dashboard.services.diag_mess import use_cases as diagmsg_use_cases
 from dashboard.services.export import use_cases as export_use_cases
 from dashboard.services.geomap import use_cases as geomap_use_cases
+from dashboard.services.live_feed import use_cases as live_feed_use_cases
+from dashboard.services.live_feed.feed import LIVE_FEED
 from dashboard.services.meterings import use_cases as meter_use_cases
+from dashboard.services.meterings.delta import parse_since
+from dashboard.services.meterings.downsampling import Downsampling
+from dashboard.services.meterings.wire_format import timeseries_response
 from dashboard.services.signal_stats import use_cases as stats_use_cases
 from dashboard.services.substation import use_cases as subst_use_cases
 from dashboard.utils import request_status, time_func
+from dashboard.utils.http_client import get_clients_stats
+from dashboard.services.commons.last_values_cache import LAST_VALUES_CACHE
+from dashboard.services.commons.range_cache import RANGE_CACHE
+from dashboard.services.diag_mess.msg_cache import DIAG_MSG_CACHE
+from dashboard.services.commons.rollup import SignalsRollupManager
+from dashboard.services.commons.meterings_manager import MeteringsManager
 from dashboard.utils.time_func import DATE_FORMAT_STR, datestr_to_timestamp, timestamp_to_server_datestr
 
 
@@ -20,6 +33,28 @@ logger = logging.getLogger(__name__)
 USE_DIAG_TEMPLATE = True
 
 
+def _get_downsampling(get):
+    """Получить параметры прореживания графиков из параметров запроса"""
+    return Downsampling.from_params(get.get("maxPoints"), get.get("width"), get.get("downsampling"))
+
+
+def _live_feed_response(assets: list, codes: list, status: bool, lang: str | None):
+    """Получить потоковый ответ text/event-stream с обновлениями сигналов 'codes' активов 'assets'"""
+    req_status = request_status.RequestStatus(True)
+    req_status.add(status and bool(assets), "Не удалось оформить подписку на обновления")
+    if not req_status.get_status():
+        return JsonResponse(
+                {"status": req_status.get_message()},
+                json_dumps_params={'ensure_ascii': False},
+                status=req_status.get_number_status()
+        )
+    response = StreamingHttpResponse(LIVE_FEED.stream(assets, codes, lang),
+                                     content_type="text/event-stream; charset=utf-8")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
 def index(request):
     return render(request, 'index.html')
 
@@ -48,14 +83,20 @@ def substation_info(request, objId: int) -> object:
     """Возвращает информацию о подстанции"""
     req_status = request_status.RequestStatus(True)
     get = request.GET
-    result, status = subst_use_cases.get_subst_assets(objId, lang=get.get("lng"))
+    result, status = subst_use_cases.get_subst_assets(objId, lang=get.get("lng"),
+                                                      since=parse_since(get.get("since")))
     req_status.add(status, "Ошибка формирования списка оборудования")
     result["status"] = req_status.get_message()
-    return JsonResponse(
-            result,
-            json_dumps_params={'ensure_ascii': False},
-            status=req_status.get_number_status()
-    )
+    return timeseries_response(request, result, status=req_status.get_number_status())
+
+
+async def substations_live_feed(request, objId: int | None = None) -> object:
+    """
+    Возвращает поток обновлений (SSE) статусов оборудования подстанции
+    (или всех подстанций) и их новых диаг. сообщений
+    """
+    (assets, codes), status = await sync_to_async(live_feed_use_cases.get_subst_feed_params)(objId)
+    return _live_feed_response(assets, codes, status, request.GET.get("lng"))
 
 
 @time_func.runtime_in_log
@@ -84,6 +125,27 @@ def asset_diag_mess(request, objId: int) -> object:
     )
 
 
+@time_func.runtime_in_log
+def substation_diag_mess(request, objId: int) -> object:
+    """Возвращает ленту диагностических сообщений активов подстанции или организации"""
+    req_status = request_status.RequestStatus(True)
+    get = request.GET
+    result, status = diagmsg_use_cases.get_node_diag_messages(
+        node_id=objId,
+        date_start=get.get("dateStart"),
+        date_end=get.get("dateEnd"),
+        get_params=dict(get.items())
+    )
+    req_status.add(status, "Не удалось получить диагностические сообщения")
+    result["status"] = req_status.get_message()
+
+    return JsonResponse(
+            result,
+            json_dumps_params={'ensure_ascii': False},
+            status=req_status.get_number_status()
+    )
+
+
 @time_func.runtime_in_log
 def last_meterings(request, assetId: int) -> object:
     """Возвращает последние значения сигналов для оборудования"""
@@ -95,7 +157,8 @@ def last_meterings(request, assetId: int) -> object:
     if get_api_version == "1":
         result, status = meter_use_cases.get_last_meterings_v1(assetId, get.get("lng"))
     elif get_api_version == api_actual_version:
-        result, status = meter_use_cases.get_last_meterings_v2(assetId, get.get("lng"))
+        result, status = meter_use_cases.get_last_meterings_v2(assetId, get.get("lng"),
+                                                               parse_since(get.get("since")))
     else:
         result = {}
         status = False
@@ -112,6 +175,14 @@ def last_meterings(request, assetId: int) -> object:
     )
 
 
+async def asset_live_feed(request, assetId: int) -> object:
+    """Возвращает поток обновлений (SSE) последних значений сигналов и диаг. сообщений актива"""
+    get = request.GET
+    (assets, codes), status = await sync_to_async(live_feed_use_cases.get_asset_feed_params)(
+        assetId, get.get("signals"))
+    return _live_feed_response(assets, codes, status, get.get("lng"))
+
+
 @time_func.runtime_in_log
 def meterings_for_charts(request, assetId: int, tab: str) -> object:
     """Возвращает значения сигналов за временной диапазон для графиков"""
@@ -122,16 +193,14 @@ def meterings_for_charts(request, assetId: int, tab: str) -> object:
                                                               get.get("dateEnd"),
                                                               tab,
                                                               get.get("signals"),
-                                                              get.get("lng"))
+                                                              get.get("lng"),
+                                                              _get_downsampling(get),
+                                                              parse_since(get.get("since")))
     req_status.add(status, "Не удалось получить значения сигналов "
                    f"для оборудования с {assetId = }")
     result["status"] = req_status.get_message()
 
-    return JsonResponse(
-            result,
-            json_dumps_params={'ensure_ascii': False},
-            status=req_status.get_number_status()
-    )
+    return timeseries_response(request, result, status=req_status.get_number_status())
 
 
 @time_func.runtime_in_log
@@ -165,11 +234,7 @@ def duval_triangle(request, assetId: int) -> object:
                    f"для оборудования с {assetId = }")
     result["status"] = req_status.get_message()
 
-    return JsonResponse(
-            result,
-            json_dumps_params={'ensure_ascii': False},
-            status=req_status.get_number_status()
-    )
+    return timeseries_response(request, result, status=req_status.get_number_status())
 
 
 @time_func.runtime_in_log
@@ -188,11 +253,7 @@ def duval_pentagon(request, assetId: int) -> object:
                    f"для оборудования с {assetId = }")
     result["status"] = req_status.get_message()
 
-    return JsonResponse(
-            result,
-            json_dumps_params={'ensure_ascii': False},
-            status=req_status.get_number_status()
-    )
+    return timeseries_response(request, result, status=req_status.get_number_status())
 
 
 @time_func.runtime_in_log
@@ -214,6 +275,31 @@ def rd_nomogram(request, assetId: int) -> object:
     )
 
 
+@time_func.runtime_in_log
+def asset_bundle(request, assetId: int) -> object:
+    """Возвращает разделы страницы актива (параметр sections) одним запросом"""
+    req_status = request_status.RequestStatus(True)
+    get = dict(request.GET.items())
+    get["use_template"] = USE_DIAG_TEMPLATE
+    sections, status = bundle_use_cases.get_asset_bundle(assetId,
+                                                         get.get("sections"),
+                                                         get,
+                                                         get.get("lng"),
+                                                         USE_DIAG_TEMPLATE,
+                                                         _get_downsampling(request.GET),
+                                                         parse_since(get.get("since")))
+    req_status.add(status, f"Не найдено оборудование с {assetId = }")
+    result = {"sections": {}}
+    for name, (section, section_status) in sections.items():
+        section_req_status = request_status.RequestStatus(section_status,
+                                                          f"Не удалось получить раздел '{name}'")
+        section["status"] = section_req_status.get_message()
+        result["sections"][name] = section
+    result["status"] = req_status.get_message()
+
+    return timeseries_response(request, result, status=req_status.get_number_status())
+
+
 @time_func.runtime_in_log
 def forecast_3d(request, assetId: int) -> object:
     """Возвращает данные 3D прогноза концентраций"""
@@ -241,16 +327,13 @@ def hysteresis(request, assetId: int, tab: str) -> object:
                                                     get.get("dateStart"),
                                                     get.get("dateEnd"),
                                                     tab,
-                                                    get.get("lng"))
+                                                    get.get("lng"),
+                                                    _get_downsampling(get))
     req_status.add(status, "Не удалось получить значения сигналов "
                    f"для оборудования с {assetId = }")
     result["status"] = req_status.get_message()
 
-    return JsonResponse(
-            result,
-            json_dumps_params={'ensure_ascii': False},
-            status=req_status.get_number_status()
-    )
+    return timeseries_response(request, result, status=req_status.get_number_status())
 
 
 @time_func.runtime_in_log
@@ -718,3 +801,21 @@ def get_diagmsg_last(request) -> object:
             json_dumps_params={'ensure_ascii': False},
             status=req_status.get_number_status()
     )
+
+
+def service_stats(request) -> object:
+    """Возвращает счетчики запросов к VictoriaMetrics / VictoriaLogs и кешей"""
+    req_status = request_status.RequestStatus(True)
+    result = {"http_clients": get_clients_stats(),
+              "last_values_cache": LAST_VALUES_CACHE.get_stats(),
+              "range_cache": RANGE_CACHE.get_stats(),
+              "diag_msg_cache": DIAG_MSG_CACHE.get_stats(),
+              "live_feed": LIVE_FEED.get_stats(),
+              "indexed_values": MeteringsManager.get_indexed_stats(),
+              "rollup": SignalsRollupManager.get_stats()}
+    result["status"] = req_status.get_message()
+    return JsonResponse(
+            result,
+            json_dumps_params={'ensure_ascii': False},
+            status=req_status.get_number_status()
+    )
@@ -1,7 +1,7 @@
 import logging
-import requests
 
-from main.settings import VM_ADDRESS, VM_PREFIX
+from dashboard.utils.http_client import VM_CLIENT
+from main.settings import VM_PREFIX
 
 
 logger = logging.getLogger(__name__)
@@ -18,9 +18,9 @@ def get_timestamps_of_last_processed_data():
     params = {"query": QUERY}
     result = []
     try:
-        response = requests.get(f"{VM_ADDRESS}/api/v1/query", params=params)
+        response = VM_CLIENT.get("/api/v1/query", params=params)
     except Exception as ex:
-        logger.error(f"Ошибка запроса к VictoriaMetrics {response.request.url = }, {ex}")
+        logger.error(f"Ошибка запроса к VictoriaMetrics, {params = }, {ex}")
         return result
     else:
         res = response.json()
@@ -41,9 +41,9 @@ def get_last_value_signals(
     QUERY = f"{metric_name}{{asset='{asset_guid}', signal=~'{'|'.join(codes)}', verificated=~'True|true'}} @ {timestamp_start}"
     params = {"query": QUERY, "step": step}
     try:
-        response = requests.get(f"{VM_ADDRESS}/api/v1/query", params=params)
+        response = VM_CLIENT.get("/api/v1/query", params=params)
     except Exception as ex:
-        logger.error(f"Ошибка запроса к VictoriaMetrics {VM_ADDRESS}: {ex}")
+        logger.error(f"Ошибка запроса к VictoriaMetrics: {ex}")
         return None, False
     else:
         res = response.json()
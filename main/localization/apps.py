@@ -1,3 +1,7 @@
+import os
+import sys
+from threading import Thread
+
 from django.apps import AppConfig
 
 
@@ -5,3 +9,21 @@ class LocalizationConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'localization'
     verbose_name = 'Локализация'
+
+    def ready(self):
+        from localization.signals import connect_signals
+        from localization.services.translation.store import TranslationStore
+        connect_signals()
+
+        if not self._is_runserver_or_asgi():
+            return
+        if sys.argv[1:2] == ["runserver"] and not os.environ.get('RUN_MAIN'):
+            return
+        Thread(target=TranslationStore.warm, name="translation_store_warm_thread", daemon=True).start()
+
+    def _is_runserver_or_asgi(self):
+        """Проверка, что текущая команда - runserver или ASGI"""
+        return (
+            len(sys.argv) > 1 and
+            (sys.argv[1] == "runserver" or "daphne" in sys.argv[0] or "uvicorn" in sys.argv[0])
+        )
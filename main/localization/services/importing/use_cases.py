@@ -1,6 +1,7 @@
 from typing import List
 from pathlib import Path
 from openpyxl import Workbook, load_workbook
+from localization.services.translation.store import TranslationStore
 from .manager import ImportManager
 from .import_schemes import (imports_for_signal_localization,
                              imports_all_data)
@@ -12,6 +13,7 @@ def __import_by_manager_list(wb: Workbook, manager_list: List[ImportManager]):
     for manager in manager_list:
         manager.set_cache(cache)
         manager.import_all(wb)
+    TranslationStore.invalidate()
 
 
 def import_in_migration(localization_file: Path, import_mngs: list[ImportManager]):
@@ -1,6 +1,7 @@
 import logging
 
-from localization.models import APILabelsTranslts, Langs
+from localization.models import Langs
+from .store import TranslationStore
 
 
 logger = logging.getLogger(__name__)
@@ -8,17 +9,11 @@ logger = logging.getLogger(__name__)
 
 class APITralslation:
     """Класс предоставления перевода для меток используемых backend"""
-    __translation_source = APILabelsTranslts
+    __translation_source = "api_label"
 
     @classmethod
     def get_all_translts(cls, lang: str):
-        data = (
-            cls.__translation_source.objects
-            .filter(lang__code=lang)
-            .select_related("label")
-            .only("label", "content")
-        )
-        return {rec.label.code: rec.content for rec in data}
+        return dict(TranslationStore.get_all(cls.__translation_source, lang))
 
     @classmethod
     def get_all_langs(cls):
@@ -26,13 +21,4 @@ class APITralslation:
 
     @classmethod
     def get_translts(cls, labels: list, lang: str):
-        data = (
-            cls.__translation_source.objects
-            .select_related("label")
-            .filter(
-                lang__code=lang,
-                label__code__in=labels,
-            )
-            .only("label", "content")
-        )
-        return {rec.label.code: rec.content for rec in data}
+        return TranslationStore.get(cls.__translation_source, labels, lang)
@@ -2,7 +2,7 @@ import logging
 from typing import List
 
 from dashboard.services.commons.asset_desc import AssetDesc
-from localization.models import AssetsTypeTranslts
+from .store import TranslationStore
 
 
 logger = logging.getLogger(__name__)
@@ -31,10 +31,4 @@ class AssetDescTralslation:
 
     @classmethod
     def get_asset_type_translations(cls, type_codes: set[str], lang: str):
-        return {
-            inst.a_type.code: inst.content
-            for inst in AssetsTypeTranslts.objects
-            .select_related("a_type", "lang")
-            .filter(a_type__code__in=list(type_codes), lang__code=lang)
-            .only("a_type__code", "content", "lang")
-        }
+        return TranslationStore.get("asset_type", type_codes, lang)
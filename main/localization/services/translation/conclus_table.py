@@ -2,7 +2,7 @@ import logging
 from typing import List
 
 from dashboard.services.commons.conclusion_table_line import ConclusTableLine
-from localization.models import APILabelsTranslts
+from .store import TranslationStore
 
 
 logger = logging.getLogger(__name__)
@@ -33,10 +33,4 @@ class ConclusTableLineTralslation:
 
     @classmethod
     def get_api_labels_translations(cls, api_labels: set[str], lang: str):
-        return {
-            inst.label.code: inst.content
-            for inst in APILabelsTranslts.objects
-            .select_related("label", "lang")
-            .filter(label__code__in=list(api_labels), lang__code=lang)
-            .only("label__code", "content", "lang__code")
-        }
+        return TranslationStore.get("api_label", api_labels, lang)
@@ -1,42 +1,135 @@
 import logging
+import re
 from json import loads
-from typing import List, Iterable
+from string import Formatter
+from typing import Callable, List, Iterable
 
-from localization.models import DiagMsgTranslts
+from .store import TranslationStore
 
 
 logger = logging.getLogger(__name__)
 
+# Подстановка параметра шаблона: {param<номер с 1>}
+_PARAM_FIELD = re.compile(r"param([1-9]\d*)")
+_CONVERSIONS = {None: None, "s": str, "r": repr, "a": ascii}
+
+# (параметры шаблона) -> текст. Генерирует исключение, если параметры не подходят шаблону
+TemplateRenderer = Callable[[list | tuple], str]
+
+
+def compile_template(template: str) -> TemplateRenderer:
+    """
+    Разобрать шаблон диаг. сообщения один раз и получить функцию подстановки
+    параметров, результат которой совпадает с
+    template.format(**{"param1": params[0], ...}).
+
+    Шаблоны с подстановками, отличными от {paramN[!conversion][:spec]}
+    (атрибуты, индексы, вложенные подстановки), подставляются через str.format.
+    """
+    try:
+        parsed = list(Formatter().parse(template))
+    except ValueError:
+        parsed = None
+    parts = []
+    for literal, field, spec, conversion in parsed or ():
+        if field is None:
+            parts.append((literal, None, None, None))
+            continue
+        match = _PARAM_FIELD.fullmatch(field)
+        if match is None or conversion not in _CONVERSIONS or "{" in (spec or ""):
+            parsed = None
+            break
+        parts.append((literal, int(match.group(1)) - 1, _CONVERSIONS[conversion], spec or ""))
+
+    if parsed is None:
+        def render(params):
+            return template.format(**{f"param{i}": value for i, value in enumerate(params, 1)})
+        return render
+
+    literals = "".join(literal for literal, _, _, _ in parts)
+    if all(index is None for _, index, _, _ in parts):
+        return lambda params: literals
+
+    def render(params):
+        chunks = []
+        for literal, index, convert, spec in parts:
+            chunks.append(literal)
+            if index is not None:
+                if index >= len(params):
+                    raise KeyError(f"param{index + 1}")
+                value = params[index]
+                if convert is not None:
+                    value = convert(value)
+                chunks.append(format(value, spec))
+        return "".join(chunks)
+    return render
+
+
+class _CompiledTemplates:
+    """Функции подстановки шаблонов языка, создаваемые при первом использовании шаблона"""
+    _by_lang: dict[str, "_CompiledTemplates"] = {}
+
+    def __init__(self, templates: dict):
+        self.templates = templates
+        self._renderers: dict[int, TemplateRenderer | None] = {}
+
+    @classmethod
+    def get(cls, lang: str) -> "_CompiledTemplates":
+        templates = TranslationStore.get_all("diag_msg", lang)
+        compiled = cls._by_lang.get(lang)
+        if compiled is None or compiled.templates is not templates:
+            compiled = cls(templates)
+            cls._by_lang = {**cls._by_lang, lang: compiled}
+        return compiled
+
+    def get_renderer(self, id: int) -> TemplateRenderer | None:
+        try:
+            return self._renderers[id]
+        except KeyError:
+            pass
+        except TypeError:
+            # некорректный (нехешируемый) код шаблона
+            return None
+        template = self.templates.get(id)
+        renderer = compile_template(template) if isinstance(template, str) else None
+        self._renderers[id] = renderer
+        return renderer
+
 
 class DiagMsgTralslation:
+    """
+    Перевод диаг. сообщений по шаблонам языка.
+
+    Шаблоны компилируются один раз для языка (см. compile_template).
+    Переводы одинаковых сообщений (message_ids, param_groups) запоминаются
+    на время жизни экземпляра (обработка одного набора записей).
+    """
     def __init__(self, msg_tmp_codes: Iterable, lang: str):
-        if len(msg_tmp_codes):
-            diag_msgs = (
-                DiagMsgTranslts.objects
-                .select_related("msg")
-                .filter(msg__num_code__in=msg_tmp_codes, lang__code=lang))
-        else:
-            diag_msgs = (
-                DiagMsgTranslts.objects
-                .select_related("msg")
-                .filter(lang__code=lang))
-        self._templates = {
-                diagmsg.msg.num_code: diagmsg.content
-                for diagmsg in diag_msgs}
+        self._compiled = _CompiledTemplates.get(lang)
+        # Шаблоны не копируются: словарь хранилища переводов используется только для чтения
+        self._templates = self._compiled.templates
+        self._translations: dict[tuple, str] = {}
 
     @classmethod
     def from_diag_msg(cls, diag_msg: List[dict], lang: str):
-        msg_tmp_codes = set()
-        for msg in diag_msg:
-            try:
-                codes = loads(msg.get("message_ids"))
-            except Exception as ex:
-                logger.error(f"Не удалось получить коды диаг. сообщений. {ex}")
-                continue
-            msg_tmp_codes.update(codes)
-        return cls(msg_tmp_codes, lang)
+        # шаблоны языка загружаются целиком, коды шаблонов сообщений не требуются
+        return cls((), lang)
+
+    def get_translations(self, records: Iterable[dict]) -> list[str]:
+        """Получить переводы записей диаг. сообщений (поля 'message_ids' и 'param_groups')"""
+        return [self.get_translation(record.get("message_ids"), record.get("param_groups"))
+                for record in records]
 
     def get_translation(self, template_ids: str, params: str):
+        try:
+            return self._translations[(template_ids, params)]
+        except KeyError:
+            result = self._translations[(template_ids, params)] = self._translate(template_ids, params)
+        except TypeError:
+            result = self._translate(template_ids, params)
+        return result
+
+    def _translate(self, template_ids: str, params: str):
         result = []
         if template_ids:
             try:
@@ -52,19 +145,16 @@ class DiagMsgTralslation:
                         f"Не удалось десериализовать параметры форматирования диаг. сообщений при локализации. {ex}")
                     params = []
             for i, id in enumerate(template_ids):
-                template = self._get_formatted_template(
-                    self._get_template(id),
-                    self._get_template_params(params, i))
+                template = self._get_formatted_template(id, self._get_template_params(params, i))
                 if template:
                     result.append(template)
         return " ".join(result)
 
-    @classmethod
-    def _get_formatted_template(cls, template: str, template_params: list | tuple):
+    def _get_formatted_template(self, id: int, template_params: list | tuple):
+        template = self._get_template(id)
         if template_params and template:
             try:
-                template = template.format(
-                    **{f"param{i}": value for i, value in enumerate(template_params, 1)})
+                template = self._compiled.get_renderer(id)(template_params)
             except Exception as ex:
                 logger.error(
                     f"Не удалось подставить параметры {template_params} "
@@ -73,7 +163,7 @@ class DiagMsgTralslation:
 
     @classmethod
     def _get_template_params(cls, all_params: list[list], index: int):
-        if 0 <= index < len(all_params):
+        if all_params and 0 <= index < len(all_params):
             params = all_params[index]
             if not isinstance(params, list | tuple):
                 params = [params,]
@@ -82,7 +172,10 @@ class DiagMsgTralslation:
         return params
 
     def _get_template(self, id: int):
-        template = self._templates.get(id)
+        try:
+            template = self._templates.get(id)
+        except TypeError:
+            template = None
         if not isinstance(template, str):
             template = None
         return template
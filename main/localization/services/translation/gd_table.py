@@ -2,7 +2,7 @@ import logging
 from typing import List
 
 from dashboard.services.commons.gd_table_line import GDTableLine
-from localization.models import APILabelsTranslts
+from .store import TranslationStore
 
 
 logger = logging.getLogger(__name__)
@@ -17,10 +17,11 @@ class GDTableLineTralslation:
             api_labels.add(line._defect_label)
             api_labels.add(line._example_label)
 
+        api_labels_translations = cls.get_api_labels_translations(api_labels, lang)
         for line in table_lines:
             cls.update(
                 line,
-                cls.get_api_labels_translations(api_labels, lang),
+                api_labels_translations,
             )
 
     @classmethod
@@ -32,10 +33,4 @@ class GDTableLineTralslation:
 
     @classmethod
     def get_api_labels_translations(cls, api_labels: set[str], lang: str):
-        return {
-            inst.label.code: inst.content
-            for inst in APILabelsTranslts.objects
-            .select_related("label", "lang")
-            .filter(label__code__in=list(api_labels), lang__code=lang)
-            .only("label__code", "content", "lang__code")
-        }
+        return TranslationStore.get("api_label", api_labels, lang)
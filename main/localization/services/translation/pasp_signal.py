@@ -3,7 +3,7 @@ from typing import List
 
 from config_ui.services.pasp_manager import PSignal
 from dashboard.utils.time_func import runtime_in_log
-from localization.models import PassportCategoriesTranslts
+from .store import TranslationStore
 
 logger = logging.getLogger(__name__)
 
@@ -41,9 +41,4 @@ class PaspSignalTralslation:
 
     @classmethod
     def get_sgn_category_translations(cls, category_codes: set[int], lang: str):
-        return {
-            inst.code: inst.content
-            for inst in PassportCategoriesTranslts.objects
-            .filter(lang__code=lang, code__in=list(category_codes))
-            .only("code", "content")
-        }
+        return TranslationStore.get("pasp_category", category_codes, lang)
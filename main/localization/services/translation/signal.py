@@ -3,8 +3,7 @@ from typing import List
 
 from dashboard.services.commons.signal_desc import SignalDesc
 from dashboard.utils.time_func import runtime_in_log
-from localization.models import (SignalsGuideTranslts, SignalsCategoriesTranslts,
-                                 MeasureUnitsTranslts, APILabelsTranslts)
+from .store import TranslationStore
 
 
 logger = logging.getLogger(__name__)
@@ -76,41 +75,16 @@ class SignalDescTralslation:
 
     @classmethod
     def get_sgn_guide_translations(cls, sguide_ids: set[int], lang: str):
-        return {
-            inst.sgn_guide.id: inst.content
-            for inst in SignalsGuideTranslts.objects
-            .select_related("sgn_guide", "lang")
-            .filter(sgn_guide__id__in=list(sguide_ids), lang__code=lang)
-            .only("sgn_guide__id", "content", "lang__code")
-        }
+        return TranslationStore.get("sgn_guide", sguide_ids, lang)
 
     @classmethod
     def get_sgn_category_translations(cls, category_ids: set[int], lang: str):
-        return {
-            inst.category.id: inst.content
-            for inst in SignalsCategoriesTranslts.objects
-            .select_related("category", "lang")
-            .filter(category__id__in=list(category_ids), lang__code=lang)
-            .only("category__id", "content", "lang__code")
-        }
+        return TranslationStore.get("sgn_category", category_ids, lang)
 
     @classmethod
-    @runtime_in_log
     def get_unit_translations(cls, unit_codes: set[int], lang: str):
-        return {
-            inst.unit.code: inst.content
-            for inst in MeasureUnitsTranslts.objects
-            .select_related("unit", "lang")
-            .filter(unit__code__in=list(unit_codes), lang__code=lang)
-            .only("unit__code", "content", "lang__code")
-        }
+        return TranslationStore.get("unit", unit_codes, lang)
 
     @classmethod
     def get_api_labels_translations(cls, api_labels: set[str], lang: str):
-        return {
-            inst.label.code: inst.content
-            for inst in APILabelsTranslts.objects
-            .select_related("label", "lang")
-            .filter(label__code__in=list(api_labels), lang__code=lang)
-            .only("label__code", "content", "lang__code")
-        }
+        return TranslationStore.get("api_label", api_labels, lang)
@@ -0,0 +1,94 @@
+import logging
+import threading
+from time import monotonic
+
+from dashboard.utils.cache_tools import SharedVersion
+from localization.models import (APILabelsTranslts, AssetsTypeTranslts, DiagMsgTranslts,
+                                 InterfaceTranslts, MeasureUnitsTranslts, Langs,
+                                 PassportCategoriesTranslts, SignalsCategoriesTranslts,
+                                 SignalsGuideTranslts)
+from main.settings import REGISTRY_TTL
+
+
+logger = logging.getLogger(__name__)
+
+
+# Словари переводов: имя словаря -> (модель, поле ключа)
+TRANSLATION_SOURCES = {
+    "sgn_guide": (SignalsGuideTranslts, "sgn_guide_id"),
+    "sgn_category": (SignalsCategoriesTranslts, "category_id"),
+    "unit": (MeasureUnitsTranslts, "unit__code"),
+    "api_label": (APILabelsTranslts, "label_id"),
+    "interface": (InterfaceTranslts, "label_id"),
+    "diag_msg": (DiagMsgTranslts, "msg_id"),
+    "asset_type": (AssetsTypeTranslts, "a_type__code"),
+    "pasp_category": (PassportCategoriesTranslts, "code"),
+}
+
+
+class TranslationStore:
+    """
+    Словари переводов, загруженные в память процесса по языкам.
+
+    Словари языка загружаются из БД целиком при первом обращении к языку
+    (или при прогреве 'warm') и сбрасываются для всех языков после смены общей
+    для процессов версии (см. 'invalidate') или по истечении REGISTRY_TTL сек.
+    """
+    _version = SharedVersion("translation_store")
+    _lock = threading.Lock()
+    _langs: dict[str, dict[str, dict]] = {}
+    _langs_version = None
+    _loaded_at = 0.0
+
+    @classmethod
+    def _load(cls, lang: str):
+        """Загрузить все словари переводов языка из БД"""
+        return {
+            name: dict(model.objects.filter(lang__code=lang).values_list(key_field, "content"))
+            for name, (model, key_field) in TRANSLATION_SOURCES.items()
+        }
+
+    @classmethod
+    def _get_lang(cls, lang: str) -> dict[str, dict]:
+        version = cls._version.get()
+        if cls._langs_version != version or monotonic() - cls._loaded_at >= REGISTRY_TTL:
+            with cls._lock:
+                if cls._langs_version != version or monotonic() - cls._loaded_at >= REGISTRY_TTL:
+                    cls._langs = {}
+                    cls._langs_version = version
+                    cls._loaded_at = monotonic()
+        langs = cls._langs
+        if (dictionaries := langs.get(lang)) is None:
+            with cls._lock:
+                if (dictionaries := cls._langs.get(lang)) is None:
+                    dictionaries = cls._load(lang)
+                    cls._langs = {**cls._langs, lang: dictionaries}
+                    logger.debug(f"Словари переводов языка '{lang}' загружены.")
+        return dictionaries
+
+    @classmethod
+    def get_all(cls, name: str, lang: str) -> dict:
+        """Получить словарь переводов 'name' языка 'lang' целиком (только для чтения)"""
+        return cls._get_lang(lang).get(name, {})
+
+    @classmethod
+    def get(cls, name: str, keys, lang: str) -> dict:
+        """Получить переводы ключей 'keys' из словаря 'name' языка 'lang'"""
+        dictionary = cls.get_all(name, lang)
+        return {key: dictionary[key] for key in keys if key in dictionary}
+
+    @classmethod
+    def invalidate(cls):
+        """Сбросить словари переводов во всех процессах приложения"""
+        cls._version.bump()
+        with cls._lock:
+            cls._langs = {}
+
+    @classmethod
+    def warm(cls):
+        """Загрузить словари переводов всех языков"""
+        try:
+            for lang in Langs.objects.values_list("code", flat=True):
+                cls._get_lang(lang)
+        except Exception as ex:
+            logger.error(f"Не удалось загрузить словари переводов. {ex}")
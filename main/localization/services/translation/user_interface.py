@@ -1,20 +1,18 @@
 import logging
 
-from localization.models import Interfacelabels, InterfaceTranslts, Langs
+from localization.models import Langs
+from .store import TranslationStore
 
 
 logger = logging.getLogger(__name__)
 
 
 class InterfaceTralslation:
-    __label_source = Interfacelabels
-    __translation_source = InterfaceTranslts
+    __translation_source = "interface"
 
     @classmethod
     def get_all_translts(cls, lang: str):
-        data = (cls.__translation_source.objects.select_related("label")
-                .filter(lang__code=lang).only("label", "content"))
-        return {rec.label.code: rec.content for rec in data}
+        return dict(TranslationStore.get_all(cls.__translation_source, lang))
 
     @classmethod
     def get_all_langs(cls):
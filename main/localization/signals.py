@@ -0,0 +1,27 @@
+from django.db.models.signals import post_save, post_delete
+
+from localization.models import (APILabelsTranslts, AssetsTypeTranslts, DiagMsgTranslts,
+                                 InterfaceTranslts, MeasureUnitsTranslts, Langs,
+                                 PassportCategoriesTranslts, SignalsCategoriesTranslts,
+                                 SignalsGuideTranslts)
+from localization.services.translation.store import TranslationStore
+
+
+# Модели, изменение которых требует перезагрузки словарей переводов
+TRANSLATION_STORE_MODELS = (APILabelsTranslts, AssetsTypeTranslts, DiagMsgTranslts,
+                            InterfaceTranslts, MeasureUnitsTranslts, Langs,
+                            PassportCategoriesTranslts, SignalsCategoriesTranslts,
+                            SignalsGuideTranslts)
+
+
+def invalidate_translation_store(sender, **kwargs):
+    TranslationStore.invalidate()
+
+
+def connect_signals():
+    """Подключить обработчики сигналов сохранения/удаления моделей"""
+    for model in TRANSLATION_STORE_MODELS:
+        post_save.connect(invalidate_translation_store, sender=model,
+                          dispatch_uid=f"translation_store_save_{model.__name__}")
+        post_delete.connect(invalidate_translation_store, sender=model,
+                            dispatch_uid=f"translation_store_delete_{model.__name__}")
@@ -0,0 +1,156 @@
+import json
+import random
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from dashboard.utils.cache_tools import SharedVersion
+from localization.services.translation import diag_msg, store
+from localization.services.translation.diag_msg import DiagMsgTralslation, compile_template
+from localization.services.translation.store import TranslationStore
+
+
+TEMPLATES = (
+    "Превышение уровня {param1} сигнала {param2}",
+    "Температура {param1:.1f} °C выше предела {param2!r}",
+    "Сообщение без параметров {{служебное}}",
+    "Параметр {param3} отсутствует",
+    "Индекс {param1[0]} списка",
+    "Значение {param1:>{param2}}",
+    "Выравнивание {param2:*^12} {param1!s:<6}|",
+    "Некорректный шаблон {param1",
+    "Лишняя скобка }",
+    "Неизвестная подстановка {value}",
+    "{param1}{param2}{param1}",
+    "",
+)
+PARAMS = ([], [1], [1.25, 3], ["abc", 7], [[5, 6], 2], ["x", "y", "z"], [None, True], [12.345, "предел"])
+
+
+def _format(template: str, params: list):
+    try:
+        return template.format(**{f"param{i}": value for i, value in enumerate(params, 1)})
+    except Exception as ex:
+        return type(ex)
+
+
+def _render(template: str, params: list):
+    try:
+        return compile_template(template)(params)
+    except Exception as ex:
+        return type(ex)
+
+
+class _TrackedTemplate(str):
+    """Шаблон, считающий вызовы str.format"""
+    format_calls = 0
+
+    def format(self, *args, **kwargs):
+        self.format_calls += 1
+        return super().format(*args, **kwargs)
+
+
+class CompileTemplateTest(SimpleTestCase):
+    def test_same_as_str_format(self):
+        for template in TEMPLATES:
+            for params in PARAMS:
+                with self.subTest(template=template, params=params):
+                    self.assertEqual(_render(template, params), _format(template, params))
+
+    def test_format_spec_and_conversion_are_compiled(self):
+        params = [1.25, 3]
+        for template in ("{param1:.1f}", "{param1!r}", "{param2!s:>5} {param1:.0f}", "{{x}} {param1:*^9}"):
+            with self.subTest(template=template):
+                # разобранный шаблон подставляется без str.format
+                tracked = _TrackedTemplate(template)
+                self.assertEqual(compile_template(tracked)(params), _format(template, params))
+                self.assertEqual(tracked.format_calls, 0)
+        for template in ("{param1[0]}", "{param1:>{param2}}", "{param1"):
+            with self.subTest(template=template):
+                tracked = _TrackedTemplate(template)
+                self.assertEqual(_render(tracked, [[4], 6]), _format(template, [[4], 6]))
+                self.assertEqual(tracked.format_calls, 1)
+
+    def test_random_templates(self):
+        rnd = random.Random(25)
+        fields = ("{param1}", "{param2:.2f}", "{param1!r}", "{param3:>5}", "{{", "}}", "{param2:d}", "text ")
+        for _ in range(2000):
+            template = "".join(rnd.choice(fields) for _ in range(rnd.randint(0, 5)))
+            params = [rnd.choice((1, 2.5, "s", -3)) for _ in range(rnd.randint(0, 3))]
+            self.assertEqual(_render(template, params), _format(template, params), template)
+
+
+class DiagMsgTralslationTest(SimpleTestCase):
+    templates = {1: "Уровень {param1} выше {param2}", 2: "Отключение", 3: "Значение {param1:.1f}", 4: "Ошибка {param1"}
+
+    def get_translator(self):
+        with mock.patch.object(diag_msg.TranslationStore, "get_all", return_value=self.templates):
+            return DiagMsgTralslation((), "ru")
+
+    def test_translations(self):
+        records = [
+            {"message_ids": json.dumps([1, 2]), "param_groups": json.dumps([[5, 10]])},
+            {"message_ids": json.dumps([3]), "param_groups": json.dumps([2.345])},
+            {"message_ids": json.dumps([4, 99]), "param_groups": json.dumps([[1]])},
+            {"message_ids": "not json", "param_groups": None},
+            {"message_ids": json.dumps([1]), "param_groups": "not json"},
+            {"message_ids": "", "param_groups": ""},
+        ]
+        self.assertEqual(self.get_translator().get_translations(records), [
+            "Уровень 5 выше 10 Отключение",
+            "Значение 2.3",
+            "Ошибка {param1",
+            "",
+            "Уровень {param1} выше {param2}",
+            "",
+        ])
+
+    def test_repeated_messages_are_rendered_once(self):
+        translator = self.get_translator()
+        record = {"message_ids": json.dumps([1]), "param_groups": json.dumps([[1, 2]])}
+        with mock.patch.object(translator, "_translate", wraps=translator._translate) as translate:
+            translations = translator.get_translations([record] * 5)
+        self.assertEqual(translations, ["Уровень 1 выше 2"] * 5)
+        self.assertEqual(translate.call_count, 1)
+
+
+@override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+class TranslationStoreTest(SimpleTestCase):
+    dictionaries = {
+        "ru": {"unit": {"kV": "кВ", "A": "А"}, "diag_msg": {1: "Отключение"}},
+        "en": {"unit": {"kV": "kV"}},
+    }
+
+    def setUp(self):
+        patcher = mock.patch.object(TranslationStore, "_load", side_effect=lambda lang: self.dictionaries[lang])
+        self.load = patcher.start()
+        self.addCleanup(patcher.stop)
+        for name, value in (("_version", SharedVersion("test_translation_store", 0)), ("_langs", {}),
+                            ("_langs_version", None), ("_loaded_at", 0.0)):
+            patcher = mock.patch.object(TranslationStore, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_get(self):
+        self.assertEqual(TranslationStore.get("unit", ["kV", "V"], "ru"), {"kV": "кВ"})
+        self.assertEqual(TranslationStore.get_all("unit", "en"), {"kV": "kV"})
+        self.assertEqual(TranslationStore.get_all("diag_msg", "en"), {})
+
+    def test_language_loaded_once(self):
+        for _ in range(3):
+            TranslationStore.get("unit", ["kV"], "ru")
+            TranslationStore.get_all("diag_msg", "ru")
+        TranslationStore.get_all("unit", "en")
+        self.assertEqual([c.args[0] for c in self.load.call_args_list], ["ru", "en"])
+
+    def test_reload_after_other_process_invalidate(self):
+        TranslationStore.get_all("unit", "ru")
+        SharedVersion("test_translation_store").bump()
+        TranslationStore.get_all("unit", "ru")
+        self.assertEqual(self.load.call_count, 2)
+
+    def test_reload_after_ttl(self):
+        TranslationStore.get_all("unit", "ru")
+        with mock.patch.object(store, "REGISTRY_TTL", 0):
+            TranslationStore.get_all("unit", "ru")
+        self.assertEqual(self.load.call_count, 2)
@@ -101,6 +101,63 @@ VM_ADDRESS = os.getenv("VM_ADDRESS")
 VM_PREFIX = os.getenv("VM_PREFIX")
 VML_ADDRESS = os.getenv("VML_ADDRESS")
 VML_PROJECT_ID = os.getenv("VML_PROJECT_ID", "0")
+# Кол-во идентификаторов сообщений в одном запросе значений индексированных сигналов к VictoriaLogs
+VML_RESOLVE_CHUNK_SIZE = int(os.getenv("VML_RESOLVE_CHUNK_SIZE", 200))
+# Запас окна запроса значений индексированных сигналов к VictoriaLogs относительно
+# временных меток значений из VictoriaMetrics (расхождение времени записи), сек.
+VML_RESOLVE_TIME_MARGIN = float(os.getenv("VML_RESOLVE_TIME_MARGIN", 300))
+# Параметры HTTP клиента запросов к VictoriaMetrics / VictoriaLogs
+VM_CONNECT_TIMEOUT = float(os.getenv("VM_CONNECT_TIMEOUT", 3))
+VM_READ_TIMEOUT = float(os.getenv("VM_READ_TIMEOUT", 30))
+VM_RETRIES = int(os.getenv("VM_RETRIES", 2))
+VM_RETRY_BACKOFF = float(os.getenv("VM_RETRY_BACKOFF", 0.3))
+VM_POOL_SIZE = int(os.getenv("VM_POOL_SIZE", 20))
+# Допустимые шаги (сек.) запросов min/max с уменьшением кол-ва точек: шаг округляется
+# вверх до значения из списка, чтобы одинаковые запросы попадали в кеш VictoriaMetrics
+VM_STEP_LADDER = sorted(int(step) for step in os.getenv(
+    "VM_STEP_LADDER", "1,5,10,30,60,120,300,600,900,1800,3600,7200,10800,21600,43200,86400").split(","))
+# Максимальное кол-во точек ряда в ответе query_range (-search.maxPointsPerTimeseries VictoriaMetrics)
+VM_MAX_POINTS_PER_SERIES = int(os.getenv("VM_MAX_POINTS_PER_SERIES", 30000))
+# Кол-во потоков для параллельного выполнения независимых запросов
+VM_QUERY_WORKERS = int(os.getenv("VM_QUERY_WORKERS", 8))
+# Время жизни (сек.) кеша последних значений сигналов, 0 - кеш отключен
+LAST_VALUES_CACHE_TTL = float(os.getenv("LAST_VALUES_CACHE_TTL", 5))
+# Запас (сек.) окна досинхронизации последних значений на запаздывающие записи
+LAST_VALUES_LOOKBACK_MARGIN = float(os.getenv("LAST_VALUES_LOOKBACK_MARGIN", 60))
+# Период (сек.) полной синхронизации последних значений (с окном 10 лет)
+LAST_VALUES_FULL_SYNC_INTERVAL = float(os.getenv("LAST_VALUES_FULL_SYNC_INTERVAL", 86400))
+# Максимальный объем (байт) кеша значений сигналов по отрезкам времени, 0 - кеш отключен
+RANGE_CACHE_MAX_BYTES = int(os.getenv("RANGE_CACHE_MAX_BYTES", 128*1024*1024))
+# Кол-во интервалов min/max в отрезке кеша значений сигналов
+RANGE_CACHE_CHUNK_POINTS = int(os.getenv("RANGE_CACHE_CHUNK_POINTS", 512))
+# Задержка (сек.) после окончания отрезка, после которой отрезок считается закрытым и кешируется
+RANGE_CACHE_CLOSED_LAG = float(os.getenv("RANGE_CACHE_CLOSED_LAG", 600))
+# Максимальный объем (байт) кеша записей диаг. сообщений активов, 0 - кеш отключен
+DIAG_MSG_CACHE_MAX_BYTES = int(os.getenv("DIAG_MSG_CACHE_MAX_BYTES", 64*1024*1024))
+# Длительность (сек.) отрезка кеша диаг. сообщений
+DIAG_MSG_CACHE_BUCKET = int(os.getenv("DIAG_MSG_CACHE_BUCKET", 86400))
+# Задержка (сек.) после окончания отрезка, после которой отрезок диаг. сообщений считается закрытым
+DIAG_MSG_CACHE_CLOSED_LAG = float(os.getenv("DIAG_MSG_CACHE_CLOSED_LAG", 600))
+# Период (сек.) опроса последних значений и диаг. сообщений для потоков обновлений (SSE)
+LIVE_FEED_INTERVAL = float(os.getenv("LIVE_FEED_INTERVAL", 5))
+# Период (сек.) отправки keep-alive комментариев в поток обновлений
+LIVE_FEED_KEEPALIVE = float(os.getenv("LIVE_FEED_KEEPALIVE", 15))
+# Максимальная длительность (сек.) потока обновлений, после которой клиент переподключается
+LIVE_FEED_MAX_DURATION = float(os.getenv("LIVE_FEED_MAX_DURATION", 600))
+# Размер страницы запроса новых диаг. сообщений в цикле опроса
+LIVE_FEED_MESSAGES_LIMIT = int(os.getenv("LIVE_FEED_MESSAGES_LIMIT", 50))
+# Максимальное кол-во неотправленных событий потока, при превышении клиент получает полный снимок
+LIVE_FEED_QUEUE_SIZE = int(os.getenv("LIVE_FEED_QUEUE_SIZE", 100))
+# Длительности интервалов (сек.) агрегатов значений сигналов вкладок графиков через ',', пусто - агрегаты не используются
+ROLLUP_PERIODS = sorted(int(period) for period in os.getenv("ROLLUP_PERIODS", "3600,86400").split(",") if period.strip())
+# Глубина (сут.) истории, для которой рассчитываются агрегаты значений сигналов
+ROLLUP_HISTORY_DAYS = int(os.getenv("ROLLUP_HISTORY_DAYS", 730))
+# Кол-во интервалов агрегатов в одном запросе к VictoriaMetrics при расчете агрегатов
+ROLLUP_CHUNK_POINTS = int(os.getenv("ROLLUP_CHUNK_POINTS", 720))
+# Задержка (сек.) после окончания интервала, после которой для него рассчитывается агрегат
+ROLLUP_CLOSED_LAG = float(os.getenv("ROLLUP_CLOSED_LAG", 600))
+# Период (сек.) расчета агрегатов командой 'rollup_signals --loop'
+ROLLUP_INTERVAL = float(os.getenv("ROLLUP_INTERVAL", 600))
 
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
@@ -130,6 +187,10 @@ CACHES = {
         "TIMEOUT": None
     }
 }
+# Период проверки (сек.) актуальности справочников, загруженных в память процесса
+REGISTRY_VERSION_CHECK_INTERVAL = float(os.getenv("REGISTRY_VERSION_CHECK_INTERVAL", 2))
+# Максимальное время (сек.) жизни справочников в памяти процесса
+REGISTRY_TTL = float(os.getenv("REGISTRY_TTL", 3600))
 
 KAFKA = os.getenv("KAFKA")
 TOPICS = {
@@ -173,6 +234,15 @@ USE_TZ = True
 
 
 ROUND_NDIGIT = int(os.getenv("ROUND_NDIGIT", 2))
+# Максимальное кол-во точек ряда графика при прореживании (параметры maxPoints / width)
+DOWNSAMPLING_MAX_POINTS = int(os.getenv("DOWNSAMPLING_MAX_POINTS", 20000))
+# Во сколько раз интервалов min/max запрашивается больше, чем точек после прореживания
+DOWNSAMPLING_OVERSAMPLING = int(os.getenv("DOWNSAMPLING_OVERSAMPLING", 4))
+# Допуск (сек.) совмещения по времени значений сигналов треугольника/пятиугольника Дюваля и гистерезиса
+SYNC_TIME_TOLERANCE = float(os.getenv("SYNC_TIME_TOLERANCE", 0))
+# Запас (сек.) до watermark 'since' дельта-режима: значения с метками в пределах запаса передаются повторно,
+# чтобы не терялись запаздывающие значения и значения отстающих сигналов
+DELTA_LOOKBACK = float(os.getenv("DELTA_LOOKBACK", 60))
 
 # Static files (CSS, JavaScript, Images)
 # https://docs.djangoproject.com/en/4.2/howto/static-files/
@@ -1985,6 +1985,10 @@ def main():
 
         print("result_to_log")
     update_map_center()
+    if to_db:
+        # Справочник сигналов в памяти процессов приложения перезагружается
+        from dashboard.services.commons.signals_registry import SignalsRegistry
+        SignalsRegistry.invalidate()
 
     # Логирование результатов
     for result in results: